@@ -43,6 +43,9 @@ def create_app():
     app.config['SESSION_COOKIE_HTTPONLY'] = True
     app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 
+    # Let a fronting proxy (Apache/lighttpd mod_xsendfile) send image files
+    app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
+
     # Printify configuration
     app.config['PRINTIFY_API_TOKEN'] = os.getenv('PRINTIFY_API_TOKEN')
     app.config['PRINTIFY_SHOP_ID'] = os.getenv('PRINTIFY_SHOP_ID', None)  # Auto-detect from API
@@ -65,6 +68,15 @@ def create_app():
     # migrate.init_app(app, db)
     CORS(app)
 
+    # <picture>/srcset markup for the build-time image renditions (python -m app.image_assets)
+    from app import image_assets
+    app.jinja_env.globals['responsive_image'] = image_assets.responsive_image
+
+    # Fingerprinted static URLs, served precompressed and immutable ahead of Flask (python -m app.static_assets)
+    from app import static_assets
+    app.url_defaults(static_assets.hashed_url_defaults)
+    app.wsgi_app = static_assets.wrap(app.wsgi_app)
+
     # Register blueprints
     from app.routes import main, projects, api, webhooks
     app.register_blueprint(main.bp)
@@ -72,4 +84,12 @@ def create_app():
     app.register_blueprint(api.bp)
     app.register_blueprint(webhooks.bp)
 
+    # Requeue months left 'processing' by workers that were killed mid-generation
+    from app.services import generation_leases
+    generation_leases.start_reaper()
+
+    # Remove expired/abandoned sessions from the volume and worker memory
+    from app import session_janitor
+    session_janitor.start_janitor()
+
     return app
@@ -0,0 +1,208 @@
+"""
+Responsive renditions of the landing page's static images
+Build time (Dockerfile):  python -m app.image_assets
+  Encodes each source image in SOURCES to AVIF, WebP and JPEG (PNG if it has
+  transparency) at several widths, with content-hashed filenames under
+  static/build/images/, and writes static/build/images.json.
+
+Templates:  {{ responsive_image('assets/images/examples/1.png', alt='January', sizes='384px') }}
+  Emits a <picture> with srcset/sizes per format, intrinsic width/height and
+  lazy loading. Falls back to a plain <img> of the original when the build
+  hasn't run (local dev).
+"""
+import io
+import json
+import hashlib
+from pathlib import Path
+from markupsafe import Markup, escape
+from flask import url_for
+from PIL import Image
+
+try:
+    import pillow_avif  # noqa: F401 - registers the AVIF encoder with Pillow < 11.3
+except ImportError:
+    pass
+Image.init()
+AVIF_ENABLED = 'AVIF' in Image.SAVE  # Otherwise WebP + JPEG only
+
+STATIC_DIR = Path(__file__).parent / 'static'
+BUILD_DIR = STATIC_DIR / 'build' / 'images'
+MANIFEST_PATH = STATIC_DIR / 'build' / 'images.json'
+
+# Source glob (relative to static/) -> rendition widths in px (capped at the source width)
+SOURCES = {
+    'assets/images/hero/DesktopHero.png': (640, 960, 1280, 1920, 2560),
+    'assets/images/hero/MobileHero.png': (375, 750, 1125),
+    'assets/images/examples/[0-9]*.png': (384, 576, 768),   # 384px cards (1x, 1.5x, 2x)
+    'assets/images/march-preview.jpg': (300, 600),
+}
+
+# Encoder settings per output format (best first - <source> order matters)
+FORMATS = {
+    'avif': {'quality': 50},
+    'webp': {'quality': 75, 'method': 6},
+    'jpeg': {'quality': 80, 'optimize': True, 'progressive': True},
+    'png': {'optimize': True},
+}
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+def _encode(img, width, fmt):
+    height = round(img.height * width / img.width)
+    resized = img.resize((width, height), Image.LANCZOS) if width < img.width else img
+    if fmt == 'jpeg':
+        resized = resized.convert('RGB')
+    output = io.BytesIO()
+    resized.save(output, format=fmt.upper(), **FORMATS[fmt])
+    return output.getvalue()
+
+
+def _build_one(rel_path, widths, previous):
+    """Renditions for one source image (reused from the previous manifest if the source is unchanged)"""
+    source = STATIC_DIR / rel_path
+    source_digest = hashlib.sha256(source.read_bytes()).hexdigest()[:16]
+    if previous and previous['source_digest'] == source_digest and \
+            all((STATIC_DIR / url).exists() for renditions in previous['renditions'].values()
+                for _, url in renditions):
+        return previous
+
+    img = Image.open(source)
+    img.load()
+    has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+    fallback = 'png' if has_alpha else 'jpeg'
+    formats = (['avif'] if AVIF_ENABLED else []) + ['webp', fallback]
+    sizes = sorted({min(width, img.width) for width in widths})
+
+    renditions = {}
+    for fmt in formats:
+        renditions[fmt] = []
+        for width in sizes:
+            data = _encode(img, width, fmt)
+            name = f"{source.stem}-{width}w.{hashlib.sha256(data).hexdigest()[:10]}.{'jpg' if fmt == 'jpeg' else fmt}"
+            (BUILD_DIR / name).write_bytes(data)
+            renditions[fmt].append([width, f'build/images/{name}'])
+
+    smallest = {fmt: min(len((STATIC_DIR / url).read_bytes()) for _, url in r) for fmt, r in renditions.items()}
+    print(f"  🖼️  {rel_path} ({source.stat().st_size / 1024:.0f} KB) -> "
+          + ", ".join(f"{fmt} from {size / 1024:.0f} KB" for fmt, size in smallest.items()))
+    return {
+        'source_digest': source_digest,
+        'width': img.width,
+        'height': img.height,
+        'fallback': fallback,
+        'renditions': renditions
+    }
+
+
+def build():
+    """Encode every image in SOURCES and write the manifest (unchanged sources are skipped)"""
+    BUILD_DIR.mkdir(exist_ok=True, parents=True)
+    try:
+        previous = json.loads(MANIFEST_PATH.read_text())
+    except (FileNotFoundError, ValueError):
+        previous = {}
+
+    manifest = {}
+    for pattern, widths in SOURCES.items():
+        for source in sorted(STATIC_DIR.glob(pattern)):
+            rel_path = source.relative_to(STATIC_DIR).as_posix()
+            manifest[rel_path] = _build_one(rel_path, widths, previous.get(rel_path))
+
+    # Drop renditions no longer referenced (old hashes)
+    referenced = {Path(url).name for entry in manifest.values()
+                  for renditions in entry['renditions'].values() for _, url in renditions}
+    for stale in BUILD_DIR.iterdir():
+        if stale.name not in referenced:
+            stale.unlink()
+
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    print(f"✓ Built responsive renditions for {len(manifest)} images"
+          f"{'' if AVIF_ENABLED else ' (AVIF encoder not installed - WebP/JPEG only)'}")
+    return manifest
+
+
+# ============================================================================
+# TEMPLATE HELPER
+# ============================================================================
+
+_manifest = None
+
+
+def _get_manifest():
+    global _manifest
+    if _manifest is None:
+        try:
+            _manifest = json.loads(MANIFEST_PATH.read_text())
+        except (FileNotFoundError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def _by_preference(entry):
+    """(format, renditions) pairs in FORMATS order (the manifest's JSON key order is alphabetical)"""
+    return [(fmt, entry['renditions'][fmt]) for fmt in FORMATS if fmt in entry['renditions']]
+
+
+def _srcset(renditions):
+    return ', '.join(f"{url_for('static', filename=url)} {width}w" for width, url in renditions)
+
+
+def _attrs(attrs):
+    return ''.join(f' {escape(name)}="{escape(value)}"' for name, value in attrs.items() if value is not None)
+
+
+def responsive_image(src, alt, sizes='100vw', eager=False, art=None, **attrs):
+    """
+    <picture> markup for a static image built by build()
+
+    Args:
+        src: Source path relative to static/ (a key in SOURCES)
+        alt: Alt text
+        sizes: The img sizes attribute (rendered width per breakpoint)
+        eager: Above-the-fold image (LCP): no lazy loading, high fetch priority
+        art: Optional art direction {media query: (other src, sizes)}, e.g. a mobile crop
+        **attrs: Extra <img> attributes (class, style, ...)
+
+    Returns:
+        Markup
+    """
+    manifest = _get_manifest()
+    entry = manifest.get(src)
+    img_attrs = {
+        'alt': alt,
+        'loading': None if eager else 'lazy',
+        'decoding': 'async',
+        'fetchpriority': 'high' if eager else None,
+        **attrs
+    }
+
+    if entry is None:
+        return Markup(f'<img src="{url_for("static", filename=src)}"{_attrs(img_attrs)}>')
+
+    sources = []
+    for media, (art_src, art_sizes) in (art or {}).items():
+        art_entry = manifest.get(art_src)
+        if art_entry is None:
+            continue
+        for fmt, renditions in _by_preference(art_entry):
+            sources.append(f'<source media="{escape(media)}" type="{MIME_TYPES[fmt]}" '
+                           f'srcset="{_srcset(renditions)}" sizes="{escape(art_sizes)}" '
+                           f'width="{art_entry["width"]}" height="{art_entry["height"]}">')
+    for fmt, renditions in _by_preference(entry):
+        if fmt != entry['fallback']:
+            sources.append(f'<source type="{MIME_TYPES[fmt]}" srcset="{_srcset(renditions)}" sizes="{escape(sizes)}">')
+
+    fallback = entry['renditions'][entry['fallback']]
+    default_url = fallback[len(fallback) // 2][1]
+    img = (f'<img src="{url_for("static", filename=default_url)}" srcset="{_srcset(fallback)}" '
+           f'sizes="{escape(sizes)}" width="{entry["width"]}" height="{entry["height"]}"{_attrs(img_attrs)}>')
+    # display: contents - the <img> keeps its layout (percentage heights) as if unwrapped
+    return Markup(f'<picture style="display: contents">{"".join(sources)}{img}</picture>')
+
+
+if __name__ == '__main__':
+    build()
@@ -4,12 +4,41 @@ API routes for AJAX calls and image serving
 from flask import Blueprint, jsonify, send_file, Response, request, url_for
 from app import session_storage
 from app.routes.main import get_current_project
-from app.services import stripe_service
+from app.services import stripe_service, face_detection_service, generation_scheduler, single_flight, generation_leases
+from app.services import gemini_resilience, image_derivatives
 import io
+import os
+import asyncio
+import hashlib
 import threading
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 
+# Candidate variants generated concurrently per regenerate click. 1 keeps one Gemini call
+# per click; the UI opts in with a JSON {'candidates': N} body, or this enables it for all
+REGENERATE_CANDIDATES = int(os.getenv('REGENERATE_CANDIDATES', 1))
+REGENERATE_MAX_CANDIDATES = int(os.getenv('REGENERATE_MAX_CANDIDATES', 4))
+
+# Internal nginx location aliased to session_storage.IMAGES_DIR (e.g. '/protected-images/').
+# When set, image routes answer with X-Accel-Redirect and the proxy sends the file.
+IMAGE_ACCEL_REDIRECT_PREFIX = os.getenv('IMAGE_ACCEL_REDIRECT_PREFIX')
+
+def _send_image(path):
+    """
+    Serve an image file without reading it into Python
+
+    send_file(path) hands the open file to the WSGI server's wsgi.file_wrapper
+    (sendfile under gunicorn); with IMAGE_ACCEL_REDIRECT_PREFIX or
+    USE_X_SENDFILE a fronting proxy sends it instead.
+    """
+    if IMAGE_ACCEL_REDIRECT_PREFIX:
+        response = Response(mimetype='image/jpeg')
+        response.headers['X-Accel-Redirect'] = (
+            IMAGE_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + path.relative_to(session_storage.IMAGES_DIR).as_posix()
+        )
+        return response
+    return send_file(path, mimetype='image/jpeg')
+
 def _pregenerate_delivery_image_async(internal_session_id, cart_items):
     """
     Pre-generate delivery worker image in background thread.
@@ -46,7 +75,7 @@ def _pregenerate_delivery_image_async(internal_session_id, cart_items):
                 return
 
             # Generate delivery worker image
-            delivery_image_data = generate_delivery_worker_image(reference_image_data)
+            delivery_image_data = generate_delivery_worker_image(reference_image_data, session_id=internal_session_id)
 
             # Convert PNG to JPEG for smaller file size
             img = PILImage.open(io.BytesIO(delivery_image_data))
@@ -91,10 +120,7 @@ def get_thumbnail(image_id):
     if not image or not image.get('thumbnail_data'):
         return jsonify({'error': 'Image not found'}), 404
 
-    return send_file(
-        io.BytesIO(image['thumbnail_data']),
-        mimetype='image/jpeg'
-    )
+    return _send_image(session_storage.payload_path(image, 'thumbnail_data'))
 
 @bp.route('/image/month/<int:month_id>')
 def get_month_image(month_id):
@@ -103,23 +129,14 @@ def get_month_image(month_id):
     if not project:
         return jsonify({'error': 'Unauthorized'}), 401
 
-    # Check for variant parameter
+    # Check for variant parameter (None = current selected variant)
     variant_index = request.args.get('variant', type=int)
 
-    if variant_index is not None:
-        # Get specific variant
-        image_data = session_storage.get_month_variant_image(month_id, variant_index)
-    else:
-        # Get current selected variant
-        image_data = session_storage.get_month_image_data(month_id)
-
-    if not image_data:
+    path = session_storage.get_month_image_path(month_id, variant_index)
+    if not path:
         return jsonify({'error': 'Image not found'}), 404
 
-    return send_file(
-        io.BytesIO(image_data),
-        mimetype='image/jpeg'
-    )
+    return _send_image(path)
 
 @bp.route('/month/<int:month_id>/select-variant', methods=['POST'])
 def select_variant(month_id):
@@ -149,29 +166,69 @@ def select_variant(month_id):
 
 @bp.route('/month/<int:month_id>/regenerate', methods=['POST'])
 def regenerate_month(month_id):
-    """Regenerate a month's image (create new variant)"""
-    from app.services.gemini_service import generate_calendar_image
-    from app.services.monthly_themes import get_enhanced_prompt
-    from PIL import Image as PILImage
-    import traceback
+    """
+    Regenerate a month's image (create new variants)
 
+    JSON body (optional): {'candidates': N} - N variants are generated
+    concurrently and each is stored as soon as it arrives; one click counts
+    as one retry whatever N is
+    """
     project = get_current_project()
     if not project:
         return jsonify({'error': 'Unauthorized'}), 401
 
+    # Get month record
+    month = session_storage.get_month_by_id(month_id)
+    if not month:
+        return jsonify({'error': 'Month not found'}), 404
+
+    # Check retry count
+    retry_count = month.get('retry_count', 0)
+    if retry_count >= 2:
+        return jsonify({'error': 'Maximum retries reached (2/2)'}), 400
+
     try:
-        # Get month record
-        month = session_storage.get_month_by_id(month_id)
-        if not month:
-            return jsonify({'error': 'Month not found'}), 404
+        session_storage.check_storage_quota()
+    except session_storage.StorageQuotaExceeded as e:
+        return jsonify({'success': False, 'error': str(e), 'error_type': 'StorageQuotaExceeded'}), 507
 
-        # Check retry count
-        retry_count = month.get('retry_count', 0)
-        if retry_count >= 2:
-            return jsonify({'error': 'Maximum retries reached (2/2)'}), 400
+    data = request.get_json(silent=True) or {}
+    try:
+        candidates = int(data.get('candidates', REGENERATE_CANDIDATES))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid candidates count'}), 400
+    candidates = max(1, min(candidates, REGENERATE_MAX_CANDIDATES))
 
+    # Gemini must answer before gunicorn would kill this request
+    deadline = gemini_resilience.request_deadline()
+
+    # Duplicate clicks for the same retry share one new variant
+    flight_key = single_flight.make_key(
+        session_storage._get_session_id(), project['id'], month_id, f'regenerate:{retry_count}'
+    )
+    try:
+        body, status = single_flight.do(
+            flight_key, lambda: _regenerate_month(month_id, month['month_number'], retry_count, deadline, candidates)
+        )
+    except single_flight.SingleFlightTimeout as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+
+    return jsonify(body), status
+
+def _regenerate_month(month_id, month_number, retry_count, deadline=None, candidates=1):
+    """
+    Generate and store new variants (runs once per flight - see regenerate_month)
+
+    Returns:
+        tuple: (JSON-serializable response body, HTTP status)
+    """
+    from app.services.gemini_service import generate_calendar_image, run_async, COMPACT_PROMPTS
+    from app.services.monthly_themes import get_enhanced_prompt
+    import traceback
+
+    try:
         print(f"\n{'='*70}")
-        print(f"🔄 REGENERATE Month {month['month_number']} - Retry {retry_count + 1}/2")
+        print(f"🔄 REGENERATE Month {month_number} - Retry {retry_count + 1}/2")
         print(f"{'='*70}")
 
         # Get reference images
@@ -179,43 +236,63 @@ def regenerate_month(month_id):
         reference_image_data = [img['file_data'] for img in uploaded_images]
 
         if not reference_image_data:
-            return jsonify({'error': 'No reference images found'}), 400
+            return {'error': 'No reference images found'}, 400
 
         print(f"✓ Found {len(reference_image_data)} reference images")
 
         # Generate new image with same prompt
-        month_number = month['month_number']
-        enhanced_prompt = get_enhanced_prompt(month_number)
+        enhanced_prompt = get_enhanced_prompt(month_number, compact=COMPACT_PROMPTS)
+
+        if candidates > 1:
+            print(f"🎨 Generating {candidates} candidates concurrently...")
+            variant_indexes, errors = run_async(_stream_candidates(
+                month_id, enhanced_prompt, reference_image_data, candidates, deadline,
+                session_storage._get_session_id()
+            ))
+            if not variant_indexes:
+                raise errors[0]
+
+            print(f"💾 Saved {len(variant_indexes)}/{candidates} candidate variants {variant_indexes}")
+            print(f"{'='*70}\n")
+
+            return {
+                'success': True,
+                'variant_index': variant_indexes[0],
+                'variant_indexes': variant_indexes,
+                'failed_candidates': len(errors),
+                'retry_count': retry_count + 1,
+                'message': f'{len(variant_indexes)} new variants generated for month {month_number}'
+            }, 200
+
         print(f"🎨 Starting Gemini API call for regeneration...")
 
-        image_data = generate_calendar_image(enhanced_prompt, reference_image_data)
+        # Bypass the generation cache - the user explicitly wants a different image
+        image_data = generate_calendar_image(
+            enhanced_prompt, reference_image_data,
+            use_cache=False,
+            priority=generation_scheduler.PRIORITY_REGENERATE,
+            session_id=session_storage._get_session_id(),
+            deadline=deadline
+        )
         print(f"✅ Regeneration succeeded! Size: {len(image_data)} bytes")
 
-        # Convert PNG to JPEG
-        img = PILImage.open(io.BytesIO(image_data))
-        img_io = io.BytesIO()
-        img.convert('RGB').save(img_io, format='JPEG', quality=80, optimize=True)
-        jpeg_data = img_io.getvalue()
-
-        # Clear memory
+        # Convert PNG to JPEG and detect the face box while decoded
+        jpeg_data, face_box = _encode_generated_month(image_data)
         del image_data
-        del img
-        del img_io
-        import gc
-        gc.collect()
 
         # Save as new variant
-        new_variant_index = session_storage.add_month_variant(month_id, jpeg_data)
+        new_variant_index = session_storage.add_month_variant(month_id, jpeg_data, face_box=face_box)
 
         print(f"💾 Saved new variant {new_variant_index}, total size: {len(jpeg_data)} bytes")
         print(f"{'='*70}\n")
 
-        return jsonify({
+        return {
             'success': True,
             'variant_index': new_variant_index,
+            'variant_indexes': [new_variant_index],
             'retry_count': retry_count + 1,
             'message': f'New variant generated for month {month_number}'
-        })
+        }, 200
 
     except Exception as e:
         error_msg = str(e)
@@ -224,11 +301,60 @@ def regenerate_month(month_id):
         traceback.print_exc()
         print(f"{'='*70}\n")
 
-        return jsonify({
+        return {
             'success': False,
             'error': error_msg,
             'error_type': type(e).__name__
-        }), 500
+        }, 500
+
+async def _stream_candidates(month_id, prompt, reference_image_data, candidates, deadline, session_id):
+    """
+    Generate candidate variants concurrently, storing each one the moment it arrives
+
+    Gemini's image model returns one image per call, so candidates are
+    separate concurrent calls (each waits for its own scheduler slot).
+    The first stored candidate is selected and counts the retry.
+
+    Runs on the shared generation loop: encoding and the (flock + fsync)
+    session write happen in worker threads, which inherit the request
+    context through the task's contextvars.
+
+    Returns:
+        tuple: (stored variant indexes in arrival order, list of candidate errors)
+    """
+    from app.services.gemini_service import agenerate_calendar_image
+
+    generations = [
+        agenerate_calendar_image(
+            prompt, reference_image_data,
+            use_cache=False,
+            priority=generation_scheduler.PRIORITY_REGENERATE,
+            session_id=session_id,
+            timeout=None,
+            deadline=deadline
+        )
+        for _ in range(candidates)
+    ]
+
+    variant_indexes = []
+    errors = []
+    for next_done in asyncio.as_completed(generations):
+        try:
+            image_data = await next_done
+        except Exception as e:
+            print(f"⚠️  Candidate failed: {str(e) or type(e).__name__}")
+            errors.append(e)
+            continue
+
+        jpeg_data, face_box = await asyncio.to_thread(_encode_generated_month, image_data)
+        first = not variant_indexes
+        variant_indexes.append(await asyncio.to_thread(
+            session_storage.add_month_variant,
+            month_id, jpeg_data, face_box=face_box, increment_retry=first, select=first
+        ))
+        print(f"💾 Candidate {len(variant_indexes)}/{candidates} stored as variant {variant_indexes[-1]}")
+
+    return variant_indexes, errors
 
 @bp.route('/project/status')
 def project_status():
@@ -237,8 +363,8 @@ def project_status():
     if not project:
         return jsonify({'error': 'No active project'}), 404
 
-    # Get generation status from session
-    months = session_storage.get_all_months()
+    # Blob-free month summaries (no image bytes in the response)
+    months = session_storage.get_month_summaries()
 
     return jsonify({
         'project_id': project['id'],
@@ -273,15 +399,124 @@ def delete_all_images():
 
     return jsonify({'success': True, 'deleted_count': deleted_count})
 
+def _encode_generated_month(image_data):
+    """
+    Encode a generated PNG to the variant's master JPEG and detect the face box while decoded
+
+    The master is the only stored copy: the browser is served it directly and
+    print/grid outputs are derived from it once (see image_derivatives).
+
+    Returns:
+        tuple: (jpeg bytes, face box dict or None)
+    """
+    from PIL import Image as PILImage
+    import gc
+
+    img = PILImage.open(io.BytesIO(image_data))
+    jpeg_data = image_derivatives.encode_master(img)
+
+    # Detect face once while decoded - stored with the variant for print padding
+    face_box = face_detection_service.detect_face_box(img)
+
+    # Clear decoded image from memory immediately
+    del img
+    gc.collect()
+
+    return jpeg_data, face_box
+
+def _print_images(product_type):
+    """
+    Print-ready images of the active project for a Printify product
+
+    Each one is the selected variant's cached print derivative: padded and
+    watermarked from the master once, then reused by every later mockup or order.
+
+    Returns:
+        dict: {month number (0 = cover): JPEG bytes} for months that have an image
+    """
+    images = {}
+    for month_num in range(0, 13):  # Include month 0 (cover)
+        purpose = image_derivatives.print_purpose(month_num, product_type)
+        image_data = session_storage.get_month_derivative(session_storage.get_month_by_number(month_num), purpose)
+        if image_data:
+            images[month_num] = image_data
+    return images
+
+def _after_month_completed(project):
+    """Advance the generation stage after a month completes (mockups at 13/13, speculative run at 3/3)"""
+    # Check if all months are now complete
+    all_months = session_storage.get_month_summaries()
+    completed_count = sum(1 for m in all_months if m['generation_status'] == 'completed')
+
+    # Only set to fully_generated when ALL 13 months are complete
+    if len(all_months) == 13 and completed_count == 13:
+        print(f"🎉 All 13 months complete! Updating stage to fully_generated")
+        session_storage.set_generation_stage('fully_generated')
+
+        # Trigger Printify mockup generation automatically
+        print(f"\n{'='*70}")
+        print(f"🎨 AUTO-GENERATING PRINTIFY MOCKUPS")
+        print(f"{'='*70}\n")
+
+        try:
+            # NOTE: Wall calendars do NOT support back_cover placeholder
+            # Blueprint 1253 only has 13 placeholders: front_cover + 12 months
+            # Back cover removed as it doesn't exist in Printify's wall calendar template
+
+            # Create Printify products for wall calendar only
+            from app.services import printify_service
+
+            product_types = ['wall_calendar']
+            total_mockups = 0
+
+            for product_type in product_types:
+                try:
+                    print(f"\n{'─'*50}")
+                    print(f"📸 Creating mockup for: {product_type}")
+
+                    # Print-ready cover (month 0) and all 12 months
+                    month_image_data = _print_images(product_type)
+                    print(f"✓ Collected {len(month_image_data)} images for mockups (cover + 12 months)")
+
+                    mockup_result = printify_service.create_product_for_preview(
+                        month_image_data=month_image_data,
+                        product_type=product_type
+                    )
+
+                    # Save mockup data to session (one per product type)
+                    session_storage.save_preview_mockup_data(mockup_result, product_type)
+                    mockup_count = len(mockup_result.get('mockup_images', []))
+                    total_mockups += mockup_count
+                    print(f"✅ {product_type}: {mockup_count} mockup images created")
+
+                except Exception as product_error:
+                    print(f"⚠️ Failed to create mockup for {product_type}: {product_error}")
+                    # Continue with other products - don't fail the month generation
+
+            print(f"\n{'='*70}")
+            print(f"✅ Mockup generation complete: {total_mockups} total images")
+            print(f"{'='*70}\n")
+
+        except Exception as mockup_error:
+            print(f"\n❌ Mockup generation failed (non-fatal): {mockup_error}")
+            import traceback
+            traceback.print_exc()
+            print(f"{'='*70}\n")
+            # Don't fail the entire month generation if mockups fail
+
+    elif len(all_months) == 3 and completed_count == 3:
+        print(f"✅ Preview complete (3/3 months) - keeping stage as preview_only to show payment gate")
+        # Don't change stage - stay at preview_only to show payment gate
+
+        # Start pre-generating Apr-Dec while the user looks at the payment gate
+        from app.services import speculative_generation
+        speculative_generation.start(session_storage._get_session_id(), project['id'])
+    else:
+        print(f"📊 Progress: {completed_count}/{len(all_months)} months complete")
+
 @bp.route('/generate/month/<int:month_num>', methods=['POST'])
 def generate_month(month_num):
     """Generate a single month's image with AI face-swapping (0=Cover, 1-12=Months)"""
-    from app.services.gemini_service import generate_calendar_image
-    from app.services.monthly_themes import get_enhanced_prompt
-    from PIL import Image as PILImage
-    import io
-    import traceback
-
     print(f"\n{'='*70}")
     print(f"🚀 GENERATE MONTH {month_num} - START {'(COVER)' if month_num == 0 else ''}")
     print(f"{'='*70}")
@@ -295,6 +530,35 @@ def generate_month(month_num):
         print(f"❌ Month {month_num}: Invalid month number (must be 0-12)")
         return jsonify({'error': 'Invalid month number'}), 400
 
+    # Duplicate requests for this month (double-click, refresh, retry - any worker)
+    # wait for the in-flight generation and share its response
+    session_id = session_storage._get_session_id()
+    flight_key = single_flight.make_key(session_id, project['id'], month_num, 'generate')
+    deadline = gemini_resilience.request_deadline()
+
+    def generate_leased():
+        # Lease lets the reaper requeue the month if this worker is killed mid-generation
+        with generation_leases.acquire(session_id, project['id'], month_num):
+            return _generate_month(month_num, project, deadline)
+
+    try:
+        body, status = single_flight.do(flight_key, generate_leased)
+    except single_flight.SingleFlightTimeout as e:
+        return jsonify({'success': False, 'status': 'processing', 'month': month_num, 'error': str(e)}), 409
+
+    return jsonify(body), status
+
+def _generate_month(month_num, project, deadline=None):
+    """
+    Generate and store one month (runs once per flight - see generate_month)
+
+    Returns:
+        tuple: (JSON-serializable response body, HTTP status)
+    """
+    from app.services.gemini_service import generate_calendar_image, COMPACT_PROMPTS
+    from app.services.monthly_themes import get_enhanced_prompt
+    import traceback
+
     try:
         # Get the month record from session
         print(f"📋 Month {month_num}: Getting month record from session...")
@@ -302,18 +566,18 @@ def generate_month(month_num):
 
         if not month:
             print(f"❌ Month {month_num}: Month not found in session storage")
-            return jsonify({'error': 'Month not found'}), 404
+            return {'error': 'Month not found'}, 404
 
         print(f"✓ Month {month_num}: Found month record, status={month.get('generation_status')}")
 
         # Check if already completed
         if month['generation_status'] == 'completed':
             print(f"✓ Month {month_num}: Already completed, skipping")
-            return jsonify({
+            return {
                 'success': True,
                 'status': 'completed',
                 'message': f'Month {month_num} already generated'
-            })
+            }, 200
 
         # Mark as processing
         print(f"📝 Month {month_num}: Marking as processing...")
@@ -330,145 +594,58 @@ def generate_month(month_num):
             error_msg = 'No reference images found'
             print(f"❌ Month {month_num}: {error_msg}")
             session_storage.update_month_status(month_num, 'failed', error=error_msg)
-            return jsonify({'error': error_msg}), 400
+            return {'error': error_msg}, 400
 
         print(f"✓ Month {month_num}: Prepared {len(reference_image_data)} reference images")
 
         # SPECIAL HANDLING: Use static cover image for cover (month 0)
         if month_num == 0:
-            print(f"📸 Month {month_num}: Using static cover image for cover (no AI generation)")
-            import os
-            from flask import current_app
-
-            # Get path to cover image file
-            cover_path = os.path.join(current_app.root_path, 'static', 'assets', 'images', 'cover.png')
-
-            if not os.path.exists(cover_path):
-                error_msg = f'Cover image file not found at {cover_path}'
-                print(f"❌ Month {month_num}: {error_msg}")
-                session_storage.update_month_status(month_num, 'failed', error=error_msg)
-                return jsonify({'error': error_msg}), 500
-
-            # Load cover image file
-            with open(cover_path, 'rb') as f:
-                cover_data = f.read()
+            print(f"📸 Month {month_num}: Using shared cover image (no AI generation)")
 
-            print(f"✅ Month {month_num}: Loaded cover image! Size: {len(cover_data)} bytes")
-
-            # Convert to JPEG format
-            img = PILImage.open(io.BytesIO(cover_data))
-            img_io = io.BytesIO()
-            img.convert('RGB').save(img_io, format='JPEG', quality=95, optimize=True)
-            jpeg_data = img_io.getvalue()
+            # Encoded once per process and referenced by every project - nothing is copied
+            jpeg_data = session_storage.shared_image('cover')
+            image_size = jpeg_data.size
+            face_box = None  # Static cover art - no face to protect
 
         else:
             # Generate image with AI for months 1-12
             print(f"📸 Month {month_num}: Getting enhanced prompt...")
-            enhanced_prompt = get_enhanced_prompt(month_num)
+            enhanced_prompt = get_enhanced_prompt(month_num, compact=COMPACT_PROMPTS)
             print(f"✓ Month {month_num}: Prompt length: {len(enhanced_prompt)} chars")
 
+            # Paid remaining months jump ahead of free previews in the generation queue
+            if session_storage.get_payment_method_id():
+                priority = generation_scheduler.PRIORITY_PAID
+            else:
+                priority = generation_scheduler.PRIORITY_PREVIEW
+
             print(f"🎨 Month {month_num}: Starting Gemini API call...")
-            image_data = generate_calendar_image(enhanced_prompt, reference_image_data)
+            image_data = generate_calendar_image(
+                enhanced_prompt, reference_image_data,
+                priority=priority,
+                session_id=session_storage._get_session_id(),
+                deadline=deadline
+            )
             print(f"✅ Month {month_num}: Generation succeeded! Size: {len(image_data)} bytes")
 
-            # Convert PNG to JPEG for smaller file size
-            # Quality 80 optimized for memory: good quality, smaller files, less RAM
-            img = PILImage.open(io.BytesIO(image_data))
-            img_io = io.BytesIO()
-            img.convert('RGB').save(img_io, format='JPEG', quality=80, optimize=True)
-            jpeg_data = img_io.getvalue()
-
-        # Clear image data from memory immediately
-        if month_num != 0:  # Only for AI-generated images
-            del image_data
-        del img
-        del img_io
-        import gc
-        gc.collect()
+            jpeg_data, face_box = _encode_generated_month(image_data)
+            image_size = len(jpeg_data)
+            del image_data  # Clear image data from memory immediately
 
         # Save to session storage
-        session_storage.update_month_status(month_num, 'completed', image_data=jpeg_data)
-
-        print(f"💾 Month {month_num}: Saved {len(jpeg_data)} bytes")
+        session_storage.update_month_status(month_num, 'completed', image_data=jpeg_data, face_box=face_box)
 
-        # Check if all months are now complete
-        all_months = session_storage.get_all_months()
-        completed_count = sum(1 for m in all_months if m['generation_status'] == 'completed')
+        print(f"💾 Month {month_num}: Saved {image_size} bytes")
 
-        # Only set to fully_generated when ALL 13 months are complete
-        if len(all_months) == 13 and completed_count == 13:
-            print(f"🎉 All 13 months complete! Updating stage to fully_generated")
-            session_storage.set_generation_stage('fully_generated')
+        _after_month_completed(project)
 
-            # Trigger Printify mockup generation automatically
-            print(f"\n{'='*70}")
-            print(f"🎨 AUTO-GENERATING PRINTIFY MOCKUPS")
-            print(f"{'='*70}\n")
-
-            try:
-                # Collect month image data for cover (month 0) and all 12 months
-                month_image_data = {}
-                for month_num in range(0, 13):  # Include month 0 (cover)
-                    image_data = session_storage.get_month_image_data(month_num)
-                    if image_data:
-                        month_image_data[month_num] = image_data
-
-                # NOTE: Wall calendars do NOT support back_cover placeholder
-                # Blueprint 1253 only has 13 placeholders: front_cover + 12 months
-                # Back cover removed as it doesn't exist in Printify's wall calendar template
-
-                print(f"✓ Collected {len(month_image_data)} images for mockups (cover + 12 months)")
-
-                # Create Printify products for wall calendar only
-                from app.services import printify_service
-
-                product_types = ['wall_calendar']
-                total_mockups = 0
-
-                for product_type in product_types:
-                    try:
-                        print(f"\n{'─'*50}")
-                        print(f"📸 Creating mockup for: {product_type}")
-
-                        mockup_result = printify_service.create_product_for_preview(
-                            month_image_data=month_image_data,
-                            product_type=product_type
-                        )
-
-                        # Save mockup data to session (one per product type)
-                        session_storage.save_preview_mockup_data(mockup_result, product_type)
-                        mockup_count = len(mockup_result.get('mockup_images', []))
-                        total_mockups += mockup_count
-                        print(f"✅ {product_type}: {mockup_count} mockup images created")
-
-                    except Exception as product_error:
-                        print(f"⚠️ Failed to create mockup for {product_type}: {product_error}")
-                        # Continue with other products - don't fail the month generation
-
-                print(f"\n{'='*70}")
-                print(f"✅ Mockup generation complete: {total_mockups} total images")
-                print(f"{'='*70}\n")
-
-            except Exception as mockup_error:
-                print(f"\n❌ Mockup generation failed (non-fatal): {mockup_error}")
-                import traceback
-                traceback.print_exc()
-                print(f"{'='*70}\n")
-                # Don't fail the entire month generation if mockups fail
-
-        elif len(all_months) == 3 and completed_count == 3:
-            print(f"✅ Preview complete (3/3 months) - keeping stage as preview_only to show payment gate")
-            # Don't change stage - stay at preview_only to show payment gate
-        else:
-            print(f"📊 Progress: {completed_count}/{len(all_months)} months complete")
-
-        return jsonify({
+        return {
             'success': True,
             'status': 'completed',
             'month': month_num,
             'message': f'Month {month_num} generated successfully',
-            'image_size': len(jpeg_data)
-        })
+            'image_size': image_size
+        }, 200
 
     except Exception as e:
         # Mark as failed
@@ -482,13 +659,114 @@ def generate_month(month_num):
 
         session_storage.update_month_status(month_num, 'failed', error=error_msg)
 
-        return jsonify({
+        return {
             'success': False,
             'status': 'failed',
             'month': month_num,
             'error': error_msg,
             'error_type': type(e).__name__
-        }), 500
+        }, 500
+
+@bp.route('/generate/months', methods=['POST'])
+def generate_months():
+    """
+    Generate several AI months concurrently on the worker's shared event loop
+
+    JSON body: {'months': [4, 5, ...]} - defaults to every AI month (1-12) that
+    isn't completed or already processing. Each generation has its own timeout
+    and is cancelled if Gemini doesn't answer in time; failures are recorded
+    per month without affecting the others.
+    """
+    from app.services.gemini_service import agenerate_batch, run_async, COMPACT_PROMPTS, ASYNC_TIMEOUT_SECONDS
+    from app.services.monthly_themes import get_enhanced_prompt
+
+    deadline = gemini_resilience.request_deadline()
+
+    project = get_current_project()
+    if not project:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    data = request.get_json(silent=True) or {}
+    summaries = {m['month_number']: m for m in session_storage.get_month_summaries()}
+    requested = data.get('months') or [
+        n for n, m in summaries.items()
+        if n != 0 and m['generation_status'] not in ('completed', 'processing')
+    ]
+
+    month_nums = [n for n in requested if n in summaries and n != 0
+                  and summaries[n]['generation_status'] != 'completed']
+
+    reference_image_data = [img['file_data'] for img in session_storage.get_uploaded_images()]
+    if month_nums and not reference_image_data:
+        return jsonify({'error': 'No reference images found'}), 400
+
+    # Lead the same single-flight as /generate/month/<n>, so duplicates of either wait
+    # for this batch; months already in flight elsewhere are skipped
+    session_id = session_storage._get_session_id()
+    flights = {}
+    for month_num in month_nums:
+        flight = single_flight.try_lead(single_flight.make_key(session_id, project['id'], month_num, 'generate'))
+        if flight is not None:
+            flights[month_num] = flight
+    month_nums = list(flights)
+
+    if not month_nums:
+        return jsonify({'success': True, 'results': {}, 'message': 'Nothing to generate'})
+
+    if session_storage.get_payment_method_id():
+        priority = generation_scheduler.PRIORITY_PAID
+    else:
+        priority = generation_scheduler.PRIORITY_PREVIEW
+
+    results = {}
+    leases = []
+    try:
+        for month_num in month_nums:
+            leases.append(generation_leases.acquire(session_id, project['id'], month_num))
+            session_storage.update_month_status(month_num, 'processing')
+
+        print(f"🚀 [Async] Generating months {month_nums} concurrently")
+        outcomes = run_async(agenerate_batch(
+            [{'prompt': get_enhanced_prompt(n, compact=COMPACT_PROMPTS), 'reference_image_data_list': reference_image_data}
+             for n in month_nums],
+            timeout=ASYNC_TIMEOUT_SECONDS,
+            priority=priority,
+            session_id=session_id,
+            deadline=deadline
+        ))
+
+        for month_num, outcome in zip(month_nums, outcomes):
+            if isinstance(outcome, BaseException):
+                error_msg = str(outcome) or type(outcome).__name__
+                session_storage.update_month_status(month_num, 'failed', error=error_msg)
+                results[month_num] = {'status': 'failed', 'error': error_msg}
+                flights[month_num].finish([{
+                    'success': False, 'status': 'failed', 'month': month_num,
+                    'error': error_msg, 'error_type': type(outcome).__name__
+                }, 500])
+                continue
+
+            jpeg_data, face_box = _encode_generated_month(outcome)
+            session_storage.update_month_status(month_num, 'completed', image_data=jpeg_data, face_box=face_box)
+            results[month_num] = {'status': 'completed', 'image_size': len(jpeg_data)}
+            flights[month_num].finish([{
+                'success': True, 'status': 'completed', 'month': month_num,
+                'message': f'Month {month_num} generated successfully', 'image_size': len(jpeg_data)
+            }, 200])
+            print(f"💾 [Async] Month {month_num}: Saved {len(jpeg_data)} bytes")
+
+    finally:
+        for lease in leases:
+            lease.release()
+        for flight in flights.values():
+            flight.abandon()  # No-op for finished flights
+
+    _after_month_completed(project)
+
+    return jsonify({
+        'success': all(r['status'] == 'completed' for r in results.values()),
+        'results': results
+    })
 
 @bp.route('/test/gemini', methods=['GET'])
 def test_gemini():
@@ -531,7 +809,7 @@ def debug_session():
 
     if project:
         uploaded_images = session_storage.get_uploaded_images()
-        months = session_storage.get_all_months()
+        months = session_storage.get_month_summaries()
 
         debug_info.update({
             'uploaded_images_count': len(uploaded_images),
@@ -565,48 +843,45 @@ def calendar_grid_image():
         # Grid configuration
         COLUMNS = 4
         ROWS = 3
-        THUMB_WIDTH = 400
-        THUMB_HEIGHT = 533  # 3:4 aspect ratio
+        THUMB_WIDTH, THUMB_HEIGHT = image_derivatives.TILE_SIZE  # 400x533 (3:4 aspect ratio)
         GRID_WIDTH = THUMB_WIDTH * COLUMNS  # 1600px
         GRID_HEIGHT = THUMB_HEIGHT * ROWS    # 1599px
 
-        # Create blank canvas
-        grid_image = PILImage.new('RGB', (GRID_WIDTH, GRID_HEIGHT), color='white')
+        calendar_months = sorted((m for m in months if 1 <= m['month_number'] <= 12), key=lambda m: m['month_number'])
 
-        # Paste each month image into the grid
-        for month in months:
-            month_num = month['month_number']
-            image_data = session_storage.get_month_image_data(month_num)
+        def render_grid():
+            # Create blank canvas
+            grid_image = PILImage.new('RGB', (GRID_WIDTH, GRID_HEIGHT), color='white')
 
-            if not image_data:
-                print(f"⚠ Warning: Month {month_num} has no image data")
-                continue
+            # Paste each month's cached grid tile (rendered from its master once)
+            for month in calendar_months:
+                month_num = month['month_number']
+                tile_path = session_storage.get_month_derivative_path(month, 'tile')
 
-            # Load and resize month image
-            month_img = PILImage.open(io.BytesIO(image_data))
-            month_img = month_img.resize((THUMB_WIDTH, THUMB_HEIGHT), PILImage.Resampling.LANCZOS)
-
-            # Calculate position in grid (0-indexed, left to right, top to bottom)
-            index = month_num - 1
-            col = index % COLUMNS
-            row = index // COLUMNS
-            x = col * THUMB_WIDTH
-            y = row * THUMB_HEIGHT
-
-            # Paste into grid
-            grid_image.paste(month_img, (x, y))
-
-        # Save grid to bytes
-        grid_io = io.BytesIO()
-        grid_image.save(grid_io, format='JPEG', quality=85, optimize=True)
-        grid_io.seek(0)
-
-        return send_file(
-            grid_io,
-            mimetype='image/jpeg',
-            as_attachment=False,
-            download_name='calendar_preview.jpg'
-        )
+                if not tile_path:
+                    print(f"⚠ Warning: Month {month_num} has no image data")
+                    continue
+
+                # Calculate position in grid (0-indexed, left to right, top to bottom)
+                index = month_num - 1
+                col = index % COLUMNS
+                row = index // COLUMNS
+                x = col * THUMB_WIDTH
+                y = row * THUMB_HEIGHT
+
+                # Paste into grid
+                with PILImage.open(tile_path) as tile:
+                    grid_image.paste(tile, (x, y))
+
+            # Save grid to bytes
+            grid_io = io.BytesIO()
+            grid_image.save(grid_io, format='JPEG', quality=85, optimize=True)
+            return grid_io.getvalue()
+
+        # The grid itself is cached by the selected variants it shows
+        digests = '-'.join(str(session_storage.get_month_summary(m)['image_digest']) for m in calendar_months)
+        grid_key = hashlib.sha256(digests.encode()).hexdigest()[:16]
+        return _send_image(session_storage.derived_image_path(grid_key, 'grid', render_grid))
 
     except Exception as e:
         print(f"❌ Grid generation error: {e}")
@@ -644,20 +919,10 @@ def generate_mockup():
 
         print(f"✓ All 12 months confirmed completed")
 
-        # Collect month image data (including cover)
-        month_image_data = {}
-        for month_num in range(0, 13):  # Include month 0 (cover)
-            image_data = session_storage.get_month_image_data(month_num)
-            if not image_data:
-                raise Exception(f"Missing image data for month {month_num}")
-            month_image_data[month_num] = image_data
-
         # NOTE: Wall calendars do NOT support back_cover placeholder
         # Blueprint 1253 only has 13 placeholders: front_cover + 12 months
         # Back cover removed as it doesn't exist in Printify's wall calendar template
 
-        print(f"✓ Collected {len(month_image_data)} images (cover + 12 months)")
-
         # Create Printify products for wall calendar only
         from app.services import printify_service
 
@@ -671,6 +936,13 @@ def generate_mockup():
                 print(f"\n{'─'*50}")
                 print(f"📸 Creating mockup for: {product_type}")
 
+                # Print-ready cover (month 0) and all 12 months
+                month_image_data = _print_images(product_type)
+                missing = [month_num for month_num in range(0, 13) if month_num not in month_image_data]
+                if missing:
+                    raise Exception(f"Missing image data for months {missing}")
+                print(f"✓ Collected {len(month_image_data)} images (cover + 12 months)")
+
                 mockup_result = printify_service.create_product_for_preview(
                     month_image_data=month_image_data,
                     product_type=product_type
@@ -770,7 +1042,7 @@ def add_to_cart():
 
     try:
         # Verify all months are completed
-        months = session_storage.get_all_months()
+        months = session_storage.get_month_summaries()
         if not all(m['generation_status'] == 'completed' for m in months):
             return jsonify({'error': 'Calendar not fully generated yet'}), 400
 
@@ -954,12 +1226,9 @@ def get_cart_project_cover(project_id):
             return jsonify({'error': 'Project not found'}), 404
 
         # Get cover image (month 0)
-        for month in project.get('months', []):
-            if month['month_number'] == 0 and month.get('master_image_data'):
-                return send_file(
-                    io.BytesIO(month['master_image_data']),
-                    mimetype='image/jpeg'
-                )
+        month = project.month(0)
+        if month and month.get('master_image_data'):
+            return _send_image(session_storage.payload_path(month, 'master_image_data'))
 
         return jsonify({'error': 'Cover image not found'}), 404
 
@@ -973,6 +1242,7 @@ def get_delivery_image():
     try:
         # Get stripe_session_id from URL parameter
         stripe_session_id = request.args.get('stripe_session_id')
+        owner_session_id = None  # None = current session
 
         if stripe_session_id:
             # Look up internal session ID from Stripe metadata
@@ -984,6 +1254,7 @@ def get_delivery_image():
                 if internal_session_id:
                     print(f"🔍 Looking up delivery image for internal session: {internal_session_id}")
                     delivery_image_data = session_storage.get_delivery_image_by_session_id(internal_session_id)
+                    owner_session_id = internal_session_id
                 else:
                     print(f"⚠️  No internal_session_id in Stripe metadata")
                     delivery_image_data = session_storage.get_delivery_image()
@@ -999,10 +1270,7 @@ def get_delivery_image():
             return jsonify({'error': 'Delivery image not found'}), 404
 
         print(f"✅ Serving delivery image ({len(delivery_image_data)} bytes)")
-        return send_file(
-            io.BytesIO(delivery_image_data),
-            mimetype='image/jpeg'
-        )
+        return _send_image(session_storage.image_path(delivery_image_data, owner_session_id))
 
     except Exception as e:
         print(f"❌ Get delivery image error: {e}")
@@ -1029,9 +1297,12 @@ def authorize_payment():
     print(f"{'='*70}")
 
     try:
+        from app.services import speculative_generation
+
         # Check if preview expired
         if session_storage.is_preview_expired():
             print(f"❌ Preview expired")
+            speculative_generation.discard_for_project(session_storage._get_session_id(), project['id'])
             return jsonify({'error': 'Preview expired. Please start over.'}), 400
 
         # Check if already authorized
@@ -1056,6 +1327,9 @@ def authorize_payment():
         # Save setup intent ID
         session_storage.save_setup_intent(setup_intent['setup_intent_id'])
 
+        # Make sure remaining months are pre-generating while the card is entered
+        speculative_generation.start(internal_session_id, project['id'])
+
         print(f"✅ Setup Intent created: {setup_intent['setup_intent_id']}")
         print(f"{'='*70}\n")
 
@@ -1119,6 +1393,7 @@ def generation_progress():
 
     try:
         status = session_storage.get_generation_status()
+        queue = generation_scheduler.get_queue_status(session_storage._get_session_id())
 
         return jsonify({
             'success': True,
@@ -1127,7 +1402,10 @@ def generation_progress():
             'completed_months': status['completed_months'],
             'total_months': status['total_months'],
             'is_complete': status['stage'] == 'fully_generated',
-            'has_payment_method': status['has_payment_method']
+            'has_payment_method': status['has_payment_method'],
+            'queue_depth': queue['queue_depth'],
+            'queue_position': queue['position'],
+            'estimated_wait_seconds': queue['estimated_wait_seconds']
         })
 
     except Exception as e:
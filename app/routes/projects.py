@@ -6,8 +6,7 @@ from werkzeug.utils import secure_filename
 from app import session_storage
 from app.routes.main import get_current_project
 from app.services.monthly_themes import get_all_themes, get_theme, get_enhanced_prompt
-from PIL import Image, ImageOps
-import io
+from app.services import upload_decode
 
 # Register HEIC support for iPhone photos
 try:
@@ -48,44 +47,19 @@ def upload():
                 flash(f'Maximum 5 photos allowed. You currently have {current_count} photo(s). Please remove some before uploading more.', 'warning')
                 return redirect(url_for('projects.upload'))
 
+            try:
+                session_storage.check_storage_quota()
+            except session_storage.StorageQuotaExceeded as e:
+                flash(str(e), 'warning')
+                return redirect(url_for('projects.upload'))
+
             processed_count = 0
             for file in files:
                 if file and file.filename:
                     try:
-                        # Read image data
-                        original_data = file.read()
-
-                        # Open image (supports JPEG, PNG, HEIC, etc.)
-                        img = Image.open(io.BytesIO(original_data))
-
-                        # Auto-rotate based on EXIF orientation (iPhone photos)
-                        img = ImageOps.exif_transpose(img)
-
-                        # Convert to RGB if necessary (handles RGBA, grayscale, etc.)
-                        if img.mode != 'RGB':
-                            img = img.convert('RGB')
-
-                        # Optimize: Resize if too large while preserving quality for AI
-                        # Target max dimension: 2560px (high quality for AI face analysis)
-                        # Gemini limit: 20MB total, ~6MB per image with 3 references
-                        max_dimension = 2560
-                        if max(img.size) > max_dimension:
-                            # Resize maintaining aspect ratio
-                            ratio = max_dimension / max(img.size)
-                            new_size = tuple(int(dim * ratio) for dim in img.size)
-                            img = img.resize(new_size, Image.Resampling.LANCZOS)
-
-                        # Save with maximum quality (strips EXIF for privacy)
-                        # Quality 95: Near-lossless, optimal for AI reference images
-                        optimized_io = io.BytesIO()
-                        img.save(optimized_io, format='JPEG', quality=95, optimize=True)
-                        img_data = optimized_io.getvalue()
-
-                        # Create thumbnail for preview
-                        img.thumbnail((200, 200))
-                        thumb_io = io.BytesIO()
-                        img.save(thumb_io, format='JPEG', quality=85)
-                        thumb_data = thumb_io.getvalue()
+                        # Decode at reduced resolution (JPEG DCT scaling / HEIC thumbnails),
+                        # downscale to 2560px and make the 200px preview thumbnail
+                        img_data, thumb_data = upload_decode.prepare_upload(file.read())
 
                         # Save to session storage
                         image_id = session_storage.add_uploaded_image(
@@ -168,7 +142,7 @@ def generate():
         return redirect(url_for('main.start'))
 
     # Check if themes are confirmed (now only creates 3 months for preview)
-    months = session_storage.get_all_months()
+    months = session_storage.get_month_summaries()
     if len(months) < 3:  # Only 3 months preview (Jan, Feb, Mar - no cover)
         # No flash message - just redirect
         return redirect(url_for('projects.themes'))
@@ -198,8 +172,8 @@ def preview():
         if not project:
             return redirect(url_for('main.start'))
 
-        # Get all months from session storage
-        months = session_storage.get_all_months()
+        # Blob-free month summaries (the page loads images via api.get_month_image)
+        months = session_storage.get_month_summaries()
 
         # Check if generation is complete
         if not all(m['generation_status'] == 'completed' for m in months):
@@ -275,8 +249,8 @@ def calendar_preview():
     if not project:
         return redirect(url_for('main.start'))
 
-    # Get all months from session storage
-    months = session_storage.get_all_months()
+    # Month summaries are enough to check completion
+    months = session_storage.get_month_summaries()
 
     # Check if all months are generated
     if not all(m['generation_status'] == 'completed' for m in months):
@@ -328,6 +302,12 @@ def cart_page():
 @bp.route('/create-another')
 def create_another():
     """Create a new calendar project"""
+    try:
+        session_storage.check_storage_quota()
+    except session_storage.StorageQuotaExceeded as e:
+        flash(str(e), 'warning')
+        return redirect(url_for('projects.cart'))
+
     # Create new project and make it active
     new_project_id = session_storage.create_new_project()
 
@@ -5,7 +5,7 @@ Currently handles Stripe payment confirmation webhooks
 from flask import Blueprint, request, jsonify
 import stripe
 from datetime import datetime
-from app.services import stripe_service, printify_service, image_padding_service
+from app.services import stripe_service, printify_service, image_derivatives
 from app import session_storage
 
 bp = Blueprint('webhooks', __name__, url_prefix='/webhooks')
@@ -114,6 +114,7 @@ def stripe_webhook():
 
                 # DEBUG: Check if session exists
                 session_storage._load_storage()
+                session_storage._refresh_if_stale(internal_session_id)  # Sessions are loaded lazily
                 if internal_session_id in session_storage._storage:
                     session_data = session_storage._storage[internal_session_id]
                     print(f"   ✓ Session found in storage")
@@ -296,6 +297,7 @@ def create_printify_order(internal_session_id, stripe_session_id, payment_intent
         print(f"   Found {len(months)} months in session storage")
 
         # Upload all images to Printify (cover + 12 months, with smart padding)
+        # Print derivatives are cached per variant - usually already rendered for the preview mockup
         print("\n📤 Uploading images to Printify with face-safe padding...")
         month_names = ["january", "february", "march", "april", "may", "june",
                        "july", "august", "september", "october", "november", "december"]
@@ -304,16 +306,12 @@ def create_printify_order(internal_session_id, stripe_session_id, payment_intent
 
         # Check for cover image (month_number = 0)
         cover_data = next((m for m in months if m['month_number'] == 0), None)
-        if cover_data and cover_data.get('master_image_data'):
+        # Skip watermark for wall calendar cover only (cover IS the logo)
+        padded_cover = session_storage.get_month_derivative(
+            cover_data, image_derivatives.print_purpose(0, product_type), internal_session_id
+        )
+        if padded_cover:
             print(f"  📸 Processing Cover image...")
-            # Skip watermark for wall calendar cover only (cover IS the logo)
-            # Desktop calendar covers still get watermark
-            skip_logo = (product_type == 'wall_calendar')
-            padded_cover = image_padding_service.add_safe_padding(
-                cover_data['master_image_data'],
-                use_face_detection=False,
-                skip_watermark=skip_logo
-            )
             upload_data = printify_service.upload_image(
                 padded_cover,
                 filename="cover.jpg"
@@ -328,16 +326,14 @@ def create_printify_order(internal_session_id, stripe_session_id, payment_intent
             month_num = i + 1
             month_data = next((m for m in months if m['month_number'] == month_num), None)
 
-            if not month_data or not month_data.get('master_image_data'):
-                raise Exception(f"Missing image data for month {month_num}")
-
             print(f"  📸 Processing {month_name.capitalize()}...")
 
-            # Apply smart padding to ensure face is fully visible
-            padded_image_data = image_padding_service.add_safe_padding(
-                month_data['master_image_data'],
-                use_face_detection=False  # Set to True if OpenCV installed
+            # Selected variant, padded with its stored face box so the face is fully visible
+            padded_image_data = session_storage.get_month_derivative(
+                month_data, image_derivatives.print_purpose(month_num, product_type), internal_session_id
             )
+            if not padded_image_data:
+                raise Exception(f"Missing image data for month {month_num}")
 
             # Upload padded image to Printify
             upload_data = printify_service.upload_image(
@@ -470,7 +466,7 @@ def create_printify_order(internal_session_id, stripe_session_id, payment_intent
             reference_image_data = [img['file_data'] for img in uploaded_images] if uploaded_images else None
 
             # Generate delivery worker image
-            delivery_image_data = generate_delivery_worker_image(reference_image_data)
+            delivery_image_data = generate_delivery_worker_image(reference_image_data, session_id=internal_session_id)
 
             # Convert PNG to JPEG for smaller file size
             img = PILImage.open(io.BytesIO(delivery_image_data))
@@ -0,0 +1,299 @@
+"""
+Tail-latency and failure guards for Gemini calls
+- Deadlines: a request's deadline is passed down to the scheduler wait and
+  the Gemini HTTP timeout, so a call never outlives gunicorn's 300s kill
+- Hedging: if a call runs past the learned p90 latency (timed from when it
+  got its scheduler slot), a duplicate is launched and whichever finishes
+  first wins; the loser is cancelled. Hedges are limited by a budget (a
+  fraction of primary calls) and only use spare scheduler slots
+- Circuit breaker: sustained Gemini errors fail new calls fast for a
+  cooldown period instead of making every user wait for a timeout
+
+Latency samples, hedge budget and breaker state are per worker process.
+"""
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+
+# Per-request deadline for interactive generations (under gunicorn's 300s timeout)
+REQUEST_DEADLINE_SECONDS = int(os.getenv('GEMINI_REQUEST_DEADLINE', 270))
+
+# Don't start a Gemini call with less time than this left before the deadline
+MIN_CALL_SECONDS = 10
+
+HEDGE_ENABLED = os.getenv('GEMINI_HEDGE_ENABLED', 'true').lower() == 'true'
+
+# Hedge after this many seconds until enough latencies have been observed
+HEDGE_DEFAULT_DELAY = float(os.getenv('GEMINI_HEDGE_DELAY', 60))
+HEDGE_MIN_DELAY = 20
+HEDGE_MIN_SAMPLES = 10
+
+# Hedges allowed per primary call (token bucket: 0.1 = at most ~10% extra Gemini calls)
+HEDGE_BUDGET_RATIO = float(os.getenv('GEMINI_HEDGE_BUDGET', 0.1))
+HEDGE_BUDGET_BURST = 3
+
+# Trip when at least BREAKER_MIN_FAILURES of the last BREAKER_WINDOW calls failed
+# and the failure rate is at least BREAKER_FAILURE_RATE
+BREAKER_WINDOW = 20
+BREAKER_MIN_FAILURES = int(os.getenv('GEMINI_BREAKER_MIN_FAILURES', 5))
+BREAKER_FAILURE_RATE = 0.5
+BREAKER_COOLDOWN_SECONDS = int(os.getenv('GEMINI_BREAKER_COOLDOWN', 30))
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a generation can't finish before its request's deadline"""
+    pass
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling Gemini while the circuit breaker is open"""
+    pass
+
+
+class HedgeSkipped(Exception):
+    """Raised by a hedge attempt that found no spare capacity (never surfaced to callers)"""
+    pass
+
+
+def request_deadline():
+    """Absolute deadline for a generation started by the current request"""
+    return time.time() + REQUEST_DEADLINE_SECONDS
+
+
+def remaining(deadline):
+    """Seconds left before deadline (None = no deadline)"""
+    if deadline is None:
+        return None
+    return deadline - time.time()
+
+
+def check_deadline(deadline):
+    """Raise DeadlineExceeded if there isn't enough time left for a Gemini call"""
+    left = remaining(deadline)
+    if left is not None and left < MIN_CALL_SECONDS:
+        raise DeadlineExceeded(f"Generation deadline reached ({max(left, 0):.0f}s left) - please try again")
+
+
+# ============================================================================
+# LATENCY, HEDGE BUDGET AND CIRCUIT BREAKER STATE
+# ============================================================================
+
+_lock = threading.Lock()
+_latencies = deque(maxlen=200)
+_hedge_tokens = float(HEDGE_BUDGET_BURST)
+_outcomes = deque(maxlen=BREAKER_WINDOW)  # True = success
+_open_until = 0.0
+_probe_in_flight = False
+
+
+def hedge_delay():
+    """Seconds to wait before hedging: p90 of recent successful call latencies"""
+    with _lock:
+        samples = sorted(_latencies)
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    return max(samples[int(len(samples) * 0.9) - 1], HEDGE_MIN_DELAY)
+
+
+def _deposit_hedge_budget():
+    global _hedge_tokens
+    with _lock:
+        _hedge_tokens = min(_hedge_tokens + HEDGE_BUDGET_RATIO, HEDGE_BUDGET_BURST)
+
+
+def _take_hedge_token():
+    global _hedge_tokens
+    with _lock:
+        if _hedge_tokens < 1:
+            return False
+        _hedge_tokens -= 1
+        return True
+
+
+def _before_call():
+    """
+    Breaker gate for a primary call (half-open: one probe call at a time)
+
+    Returns:
+        bool: True if this call is the half-open probe
+    """
+    global _probe_in_flight
+    with _lock:
+        if _open_until == 0:
+            return False
+        if time.time() < _open_until or _probe_in_flight:
+            wait_seconds = max(_open_until - time.time(), 1)
+            raise CircuitOpenError(
+                f"Image generation is temporarily unavailable - please try again in {wait_seconds:.0f}s"
+            )
+        _probe_in_flight = True
+        print("🔌 Gemini circuit half-open - sending a probe request")
+        return True
+
+
+def _end_probe():
+    """Free the probe slot if the probe never reached Gemini (e.g. scheduler timeout)"""
+    global _probe_in_flight
+    with _lock:
+        _probe_in_flight = False
+
+
+def record_success(latency):
+    """Record a successful Gemini call (feeds the hedge p90 and closes the breaker)"""
+    global _open_until, _probe_in_flight
+    with _lock:
+        _latencies.append(latency)
+        _outcomes.append(True)
+        if _open_until:
+            print("🔌 Gemini circuit closed")
+            _open_until = 0.0
+            _outcomes.clear()
+        _probe_in_flight = False
+
+
+def record_failure():
+    """Record a failed Gemini call; trips the breaker on sustained errors"""
+    global _open_until, _probe_in_flight
+    with _lock:
+        _outcomes.append(False)
+        failures = _outcomes.count(False)
+        tripped = _probe_in_flight or (
+            failures >= BREAKER_MIN_FAILURES and failures / len(_outcomes) >= BREAKER_FAILURE_RATE
+        )
+        _probe_in_flight = False
+        if tripped:
+            _open_until = time.time() + BREAKER_COOLDOWN_SECONDS
+            _outcomes.clear()
+            print(f"🔌 Gemini circuit OPEN for {BREAKER_COOLDOWN_SECONDS}s ({failures} recent failures)")
+
+
+def breaker_status():
+    """'closed', 'open' or 'half_open' (for debug/status endpoints)"""
+    with _lock:
+        if _open_until == 0:
+            return 'closed'
+        return 'open' if time.time() < _open_until else 'half_open'
+
+
+def _may_hedge(deadline):
+    """Whether a hedge may be launched now (the budget token is only taken once it holds a slot)"""
+    if not HEDGE_ENABLED or breaker_status() != 'closed':
+        return False
+    left = remaining(deadline)
+    if left is not None and left < MIN_CALL_SECONDS:
+        return False
+    with _lock:
+        return _hedge_tokens >= 1
+
+
+# ============================================================================
+# GUARDED CALLS
+# ============================================================================
+
+def call(attempt, deadline=None):
+    """
+    Run a synchronous Gemini call under the breaker and deadline (never hedged -
+    a thread can't be cancelled, so hedged calls go through acall())
+
+    Args:
+        attempt: attempt() -> response; makes one Gemini call and records its outcome
+        deadline: Absolute time.time() deadline (None = no limit)
+
+    Raises:
+        CircuitOpenError, DeadlineExceeded, or the call's error
+    """
+    probe = _before_call()
+    try:
+        check_deadline(deadline)
+        _deposit_hedge_budget()
+        return attempt()
+    finally:
+        if probe:
+            _end_probe()
+
+
+async def acall(attempt, deadline=None, hedge=False):
+    """
+    Run a Gemini call under the breaker and deadline, hedging it if it's slow
+
+    Args:
+        attempt: Coroutine function attempt(is_hedge, begin) -> response; makes one
+                 Gemini call and records its outcome. It calls begin() once it holds
+                 its capacity (scheduler slot), right before calling Gemini: for the
+                 primary this starts the hedge timer, for a hedge it takes a budget
+                 token and returns False if none is left (the hedge must then raise
+                 HedgeSkipped, as it must when it finds no spare slot)
+        deadline: Absolute time.time() deadline (None = no limit)
+        hedge: Allow a hedged duplicate for this call
+
+    Returns:
+        The first successful response (the losing call is cancelled)
+
+    Raises:
+        CircuitOpenError, DeadlineExceeded, or the primary call's error
+    """
+    probe = _before_call()
+    try:
+        return await _acall(attempt, deadline, hedge and not probe)
+    finally:
+        if probe:
+            _end_probe()
+
+
+async def _acall(attempt, deadline, hedge):
+    check_deadline(deadline)
+    _deposit_hedge_budget()
+
+    started = asyncio.Event()
+
+    def begin_primary():
+        started.set()
+        return True
+
+    if not (hedge and HEDGE_ENABLED):
+        try:
+            return await asyncio.wait_for(attempt(False, begin_primary), remaining(deadline))
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Gemini didn't answer before the deadline")
+
+    tasks = [asyncio.ensure_future(attempt(False, begin_primary))]
+    try:
+        # The hedge timer starts once the primary holds its slot - p90 samples
+        # are Gemini call latencies, not scheduler waits
+        slot_wait = asyncio.ensure_future(started.wait())
+        try:
+            await asyncio.wait([tasks[0], slot_wait], timeout=remaining(deadline),
+                               return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            slot_wait.cancel()
+
+        if started.is_set() and not tasks[0].done():
+            left = remaining(deadline)
+            delay = hedge_delay() if left is None else min(hedge_delay(), left)
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+
+            if not done and _may_hedge(deadline):
+                print(f"  🪁 Gemini call exceeded {delay:.0f}s (p90) - sending a hedged request")
+                tasks.append(asyncio.ensure_future(attempt(True, _take_hedge_token)))
+
+        primary_error = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=remaining(deadline), return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded("Gemini didn't answer before the deadline")
+            for task in done:
+                error = task.exception()
+                if error is None:
+                    if task is not tasks[0]:
+                        print("  🪁 Hedged request won")
+                    return task.result()
+                if task is tasks[0]:
+                    primary_error = error
+
+        raise primary_error or DeadlineExceeded("Gemini didn't answer before the deadline")
+
+    finally:
+        for task in tasks:
+            task.cancel()
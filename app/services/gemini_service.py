@@ -6,9 +6,16 @@ with face-swapping and character consistency
 import os
 import io
 import time
+import asyncio
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import nullcontext
 from google import genai
 from google.genai import types
 from PIL import Image
+from app.services import generation_cache, generation_scheduler, gemini_resilience
 
 # Configure Gemini API
 # IMPORTANT: API key MUST be set as environment variable - never hardcode!
@@ -16,28 +23,33 @@ GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 if not GOOGLE_API_KEY:
     raise ValueError("GOOGLE_API_KEY environment variable is required but not set")
 
-def generate_calendar_image(prompt, reference_image_data_list=None):
-    """
-    Generate a calendar image using Google Gemini 2.5 Flash Image
-    with seamless face blending and character consistency
+GEMINI_IMAGE_MODEL = 'gemini-2.5-flash-image'
 
-    Args:
-        prompt (str): Text description of desired hunky scene
-        reference_image_data_list (list): List of image data bytes for character reference
+# Send the face-swap protocol as a system instruction instead of inline content.
+# A stable prefix also lets Gemini's implicit context caching kick in across months.
+USE_SYSTEM_INSTRUCTION = os.getenv('GEMINI_USE_SYSTEM_INSTRUCTION', 'true').lower() == 'true'
 
-    Returns:
-        bytes: Generated image data as PNG bytes
-    """
-    try:
-        client = genai.Client(api_key=GOOGLE_API_KEY)
+# Drop the per-month likeness preamble (the system instruction already carries it).
+# On by default with the system instruction; GEMINI_COMPACT_PROMPTS=false restores the full preamble
+COMPACT_PROMPTS = USE_SYSTEM_INSTRUCTION and os.getenv('GEMINI_COMPACT_PROMPTS', 'true').lower() == 'true'
+
+# Max pixels per reference image sent to Gemini
+MAX_REFERENCE_PIXELS = 4_000_000
+
+# Sampling and output settings shared by all image generations
+# Use 4:3 aspect ratio (1.33:1) for optimal wall calendar fit with more context
+# 4:3 shows more environment/scene compared to 5:4 (wider = less close-up)
+GENERATION_PARAMS = {
+    'temperature': 0.7,  # Balanced creativity and consistency
+    'top_p': 0.9,  # Slightly more diverse sampling
+    'aspect_ratio': '4:3'  # Standard landscape - shows more context/environment
+}
 
-        # Build content array with reference images first
-        content = []
+# ============================================================================
+# SHARED PROMPT FRAGMENTS (defined once, composed per request type)
+# ============================================================================
 
-        # Add reference images if provided (for character consistency)
-        if reference_image_data_list:
-            # System instruction - Ultra-strong face swap with professional photography
-            system_instruction = """⚠️ CRITICAL: THIS IS A FACE SWAP OPERATION ⚠️
+FACE_TRANSFER_PROTOCOL = """⚠️ CRITICAL: THIS IS A FACE SWAP OPERATION ⚠️
 
 REFERENCE IMAGES: The following images show the EXACT person whose face must appear in the final image.
 
@@ -73,9 +85,9 @@ STEP 3 - NATURAL INTEGRATION (After face is copied):
 • Add natural shadows, highlights, and reflections that fit the environment
 • Ensure the skin tone lighting adjusts to the scene (warm/cool tones) while keeping the BASE skin tone identical
 • Make the integration seamless - the person should look like they were actually photographed in this location
-• Keep the face recognizable - lighting should enhance, never obscure or transform features
+• Keep the face recognizable - lighting should enhance, never obscure or transform features"""
 
-PHOTOGRAPHY STYLE:
+PHOTOGRAPHY_STYLE = """PHOTOGRAPHY STYLE:
 You are a professional advertising photographer shooting high-budget parody stock photos. Your style: beautifully lit, cinematic, ultra-realistic images of people in ridiculous or unexpected situations — the more over-the-top the concept, the more serious and professional the execution should look.
 
 Execution requirements:
@@ -83,9 +95,9 @@ Execution requirements:
 • Keep everything funny and absurd in concept, but photorealistic in execution
 • Create cohesive composition with believable subject-to-environment integration
 • Never include any text, letters, or writing within images
-• All results must look like natural photographs without any visible text or labels
+• All results must look like natural photographs without any visible text or labels"""
 
-QUALITY VERIFICATION:
+QUALITY_VERIFICATION = """QUALITY VERIFICATION:
 Before finalizing, verify:
 ✓ Can you identify the person from the reference images with 100% certainty?
 ✓ Are ALL distinctive facial features (moles, freckles, scars) in the correct locations?
@@ -94,49 +106,304 @@ Before finalizing, verify:
 ✓ Would this pass as a real photograph of this specific person in this scene?
 
 If ANY answer is "no" - the face transfer has failed. The face must be IDENTICAL."""
-            content.append(system_instruction)
-
-            # Add up to 3 best reference images for character consistency
-            for img_data in reference_image_data_list[:3]:
-                try:
-                    # Load image and add to content
-                    img = Image.open(io.BytesIO(img_data))
-                    # Resize if too large (max 4MP for Gemini)
-                    max_pixels = 4_000_000
-                    if img.width * img.height > max_pixels:
-                        ratio = (max_pixels / (img.width * img.height)) ** 0.5
-                        new_size = (int(img.width * ratio), int(img.height * ratio))
-                        img = img.resize(new_size, Image.LANCZOS)
-                    content.append(img)
-                except Exception as e:
-                    print(f"Error loading reference image: {e}")
-
-        # Prompts are now complete and optimized - pass through as-is
-        content.append(prompt)
 
-        # Generate the image using Gemini 2.5 Flash Image (Nano Banana)
-        # Use 4:3 aspect ratio (1.33:1) for optimal wall calendar fit with more context
-        # 4:3 shows more environment/scene compared to 5:4 (wider = less close-up)
-        response = client.models.generate_content(
-            model='gemini-2.5-flash-image',
-            contents=content,
-            config=types.GenerateContentConfig(
-                response_modalities=['IMAGE'],
-                temperature=0.7,  # Balanced creativity and consistency
-                top_p=0.9,  # Slightly more diverse sampling
-                image_config=types.ImageConfig(
-                    aspect_ratio='4:3'  # Standard landscape - shows more context/environment
-                )
-            )
+# Calendar months: full protocol + photography style
+CALENDAR_FACE_SWAP_INSTRUCTION = "\n\n".join([FACE_TRANSFER_PROTOCOL, PHOTOGRAPHY_STYLE, QUALITY_VERIFICATION])
+
+# Delivery worker image: protocol without the parody photography style
+DELIVERY_FACE_SWAP_INSTRUCTION = "\n\n".join([FACE_TRANSFER_PROTOCOL, QUALITY_VERIFICATION])
+
+# ============================================================================
+# CLIENT AND REFERENCE IMAGE CACHES
+# ============================================================================
+
+_client = None
+_client_lock = threading.Lock()
+
+# Async clients, one per event loop (the aio transport is bound to the loop that created it)
+_async_clients = weakref.WeakKeyDictionary()
+
+# Default per-generation timeout for the async path (seconds, None = no timeout)
+ASYNC_TIMEOUT_SECONDS = float(os.getenv('GEMINI_ASYNC_TIMEOUT', 180)) or None
+
+# Default number of concurrent generations in agenerate_batch
+ASYNC_BATCH_CONCURRENCY = int(os.getenv('GEMINI_ASYNC_BATCH_CONCURRENCY', 16))
+
+# Prepared reference image parts, keyed by SHA-256 of the uploaded bytes
+_reference_part_cache = OrderedDict()
+_reference_cache_lock = threading.Lock()
+REFERENCE_CACHE_SIZE = 32
+
+
+def get_client():
+    """Get the process-wide Gemini client (created on first use)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = genai.Client(api_key=GOOGLE_API_KEY)
+    return _client
+
+
+def get_async_client():
+    """Get the async (client.aio) Gemini API for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = genai.Client(api_key=GOOGLE_API_KEY).aio
+    return client
+
+
+# ============================================================================
+# SHARED EVENT LOOP
+# ============================================================================
+
+# One generation event loop per worker process (started on first use, after fork)
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+
+
+def _shared_loop():
+    global _loop, _loop_pid
+    with _loop_lock:
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name='gemini-aio', daemon=True).start()
+        return _loop
+
+
+def run_async(coro):
+    """
+    Run a coroutine on this worker's shared generation loop and wait for its result
+
+    Request threads (gthread workers) block here while their generations are
+    multiplexed with every other request's on one event loop and one aio
+    client, instead of each request spinning up its own loop and client.
+
+    Args:
+        coro: Coroutine, e.g. agenerate_batch(...)
+
+    Returns:
+        The coroutine's result (its exception is raised here)
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _shared_loop()).result()
+
+
+def reference_digest(img_data):
+    """SHA-256 hex digest of reference image bytes"""
+    return hashlib.sha256(img_data).hexdigest()
+
+
+def _usable_references(reference_image_data_list):
+    """The (up to 3) reference images actually sent - payloads whose image file is missing read back as None"""
+    return [img for img in (reference_image_data_list or []) if img is not None][:3]
+
+
+def _prepare_reference_part(img_data):
+    """Build a Gemini Part for one reference image (downscaled to max 4MP if needed)"""
+    digest = reference_digest(img_data)
+
+    with _reference_cache_lock:
+        part = _reference_part_cache.get(digest)
+        if part is not None:
+            _reference_part_cache.move_to_end(digest)
+            return part
+
+    # Image.open only reads the header - full decode happens only if we must resize
+    img = Image.open(io.BytesIO(img_data))
+    mime_type = Image.MIME.get(img.format, 'image/jpeg')
+
+    if img.width * img.height > MAX_REFERENCE_PIXELS:
+        ratio = (MAX_REFERENCE_PIXELS / (img.width * img.height)) ** 0.5
+        new_size = (int(img.width * ratio), int(img.height * ratio))
+        img = img.convert('RGB').resize(new_size, Image.LANCZOS)
+        img_io = io.BytesIO()
+        img.save(img_io, format='JPEG', quality=95)
+        img_data = img_io.getvalue()
+        mime_type = 'image/jpeg'
+
+    part = types.Part.from_bytes(data=bytes(img_data), mime_type=mime_type)
+
+    with _reference_cache_lock:
+        _reference_part_cache[digest] = part
+        while len(_reference_part_cache) > REFERENCE_CACHE_SIZE:
+            _reference_part_cache.popitem(last=False)
+
+    return part
+
+
+def build_generation_request(prompt, reference_image_data_list=None, face_swap_instruction=CALENDAR_FACE_SWAP_INSTRUCTION):
+    """
+    Assemble the content list and config for one image generation
+
+    Args:
+        prompt (str): Final scene prompt
+        reference_image_data_list (list): Reference image bytes (first 3 are used)
+        face_swap_instruction (str): Shared face-swap instruction for this request type
+
+    Returns:
+        tuple: (contents list, types.GenerateContentConfig)
+    """
+    content = []
+    system_instruction = None
+
+    # Add reference images if provided (for character consistency)
+    references = _usable_references(reference_image_data_list)
+    if reference_image_data_list and None in reference_image_data_list:
+        print(f"⚠️  Skipping unreadable reference image(s) (image file missing)")
+    if references:
+        if USE_SYSTEM_INSTRUCTION:
+            system_instruction = face_swap_instruction
+        else:
+            content.append(face_swap_instruction)
+
+        # Add up to 3 best reference images for character consistency
+        for img_data in references:
+            try:
+                content.append(_prepare_reference_part(img_data))
+            except Exception as e:
+                print(f"Error loading reference image: {e}")
+
+    # Prompts are now complete and optimized - pass through as-is
+    content.append(prompt)
+
+    config = types.GenerateContentConfig(
+        system_instruction=system_instruction,
+        response_modalities=['IMAGE'],
+        temperature=GENERATION_PARAMS['temperature'],
+        top_p=GENERATION_PARAMS['top_p'],
+        image_config=types.ImageConfig(
+            aspect_ratio=GENERATION_PARAMS['aspect_ratio']
         )
+    )
+
+    return content, config
+
+
+def generation_cache_key(prompt, reference_image_data_list=None, face_swap_instruction=CALENDAR_FACE_SWAP_INSTRUCTION):
+    """Cache key for a generation request (same inputs as build_generation_request)"""
+    references = _usable_references(reference_image_data_list)
+    config_params = dict(GENERATION_PARAMS)
+    if references:
+        config_params['face_swap_instruction'] = face_swap_instruction
+        config_params['system_instruction'] = USE_SYSTEM_INSTRUCTION
+    return generation_cache.make_key(
+        [reference_digest(img_data) for img_data in references],
+        prompt,
+        GEMINI_IMAGE_MODEL,
+        config_params
+    )
+
+
+def extract_image_data(response):
+    """Return the first inline image bytes from a Gemini response, or None"""
+    if response.candidates and len(response.candidates) > 0:
+        candidate = response.candidates[0]
+        if candidate.content and candidate.content.parts:
+            for part in candidate.content.parts:
+                if hasattr(part, 'inline_data') and part.inline_data:
+                    return part.inline_data.data
+    return None
+
+
+def _with_deadline(config, deadline):
+    """Copy of config whose HTTP timeout ends at the deadline (checked after the scheduler wait)"""
+    if deadline is None:
+        return config
+    gemini_resilience.check_deadline(deadline)
+    timeout_ms = int(gemini_resilience.remaining(deadline) * 1000)
+    return config.model_copy(update={'http_options': types.HttpOptions(timeout=timeout_ms)})
+
+
+def _should_hedge(priority):
+    """Hedge interactive generations only (scripts and background work can wait)"""
+    return priority is not None and priority != generation_scheduler.PRIORITY_BACKGROUND
+
+
+def _hedge_slot(priority):
+    """Hedges only run on a spare scheduler slot (unscheduled calls need none)"""
+    if priority is None:
+        return nullcontext(True)
+    return generation_scheduler.spare_generation_slot()
+
+
+def _call_gemini(content, config, deadline):
+    """One Gemini call, recording its latency/outcome for hedging and the circuit breaker"""
+    config = _with_deadline(config, deadline)
+    started_at = time.time()
+    try:
+        response = get_client().models.generate_content(model=GEMINI_IMAGE_MODEL, contents=content, config=config)
+    except Exception:
+        gemini_resilience.record_failure()
+        raise
+    gemini_resilience.record_success(time.time() - started_at)
+    return response
+
+
+def _generate_content(content, config, priority=None, session_id=None, deadline=None):
+    """
+    Call Gemini through the circuit breaker, holding a scheduler slot when a
+    priority class is given
+
+    Interactive calls may be hedged, so they run on the worker's shared event
+    loop (see _agenerate_content), where the losing call can be cancelled.
+    """
+    if _should_hedge(priority) and gemini_resilience.HEDGE_ENABLED:
+        return run_async(_agenerate_content(content, config, priority=priority, session_id=session_id,
+                                            deadline=deadline))
+
+    def attempt():
+        if priority is None:
+            return _call_gemini(content, config, deadline)
 
-        # Extract PNG image data from response
-        if response.candidates and len(response.candidates) > 0:
-            candidate = response.candidates[0]
-            if candidate.content and candidate.content.parts:
-                for part in candidate.content.parts:
-                    if hasattr(part, 'inline_data') and part.inline_data:
-                        return part.inline_data.data
+        with generation_scheduler.generation_slot(session_id, priority, deadline):
+            return _call_gemini(content, config, deadline)
+
+    return gemini_resilience.call(attempt, deadline)
+
+
+def generate_calendar_image(prompt, reference_image_data_list=None, use_cache=True, priority=None, session_id=None,
+                            deadline=None):
+    """
+    Generate a calendar image using Google Gemini 2.5 Flash Image
+    with seamless face blending and character consistency
+
+    Args:
+        prompt (str): Text description of desired hunky scene
+        reference_image_data_list (list): List of image data bytes for character reference
+        use_cache (bool): Serve/store identical requests from the generation cache
+                          (False for regenerations that need a fresh variant)
+        priority (int): generation_scheduler.PRIORITY_* class (None = unscheduled, e.g. scripts)
+        session_id (str): Internal session ID for per-session fairness in the scheduler
+        deadline (float): Absolute time.time() deadline from the request (None = no limit)
+
+    Returns:
+        bytes: Generated image data as PNG bytes
+
+    Raises:
+        gemini_resilience.DeadlineExceeded: Not enough time left before the deadline
+        gemini_resilience.CircuitOpenError: Gemini is failing - not attempted
+    """
+    try:
+        cache_key = None
+        if use_cache:
+            cache_key = generation_cache_key(prompt, reference_image_data_list)
+            cached = generation_cache.get(cache_key)
+            if cached:
+                return cached
+
+        content, config = build_generation_request(prompt, reference_image_data_list)
+
+        # Generate the image using Gemini 2.5 Flash Image (Nano Banana)
+        response = _generate_content(content, config, priority=priority, session_id=session_id, deadline=deadline)
+
+        image_data = extract_image_data(response)
+        if image_data:
+            if cache_key:
+                generation_cache.put(cache_key, image_data)
+            return image_data
 
         raise Exception("No image generated in response")
 
@@ -144,6 +411,127 @@ If ANY answer is "no" - the face transfer has failed. The face must be IDENTICAL
         print(f"Error generating image with Gemini: {str(e)}")
         raise
 
+async def _acall_gemini(content, config, deadline):
+    """Async version of _call_gemini"""
+    config = _with_deadline(config, deadline)
+    started_at = time.time()
+    try:
+        response = await get_async_client().models.generate_content(model=GEMINI_IMAGE_MODEL, contents=content, config=config)
+    except Exception:
+        gemini_resilience.record_failure()
+        raise
+    gemini_resilience.record_success(time.time() - started_at)
+    return response
+
+
+async def _agenerate_content(content, config, priority=None, session_id=None, deadline=None):
+    """
+    Async version of _generate_content; slow interactive calls get a hedged
+    duplicate and the losing call is cancelled
+    """
+    async def attempt(is_hedge, begin):
+        if is_hedge:
+            # The hedge budget token is only spent once a spare slot is held
+            with _hedge_slot(priority) as held:
+                if not (held and begin()):
+                    raise gemini_resilience.HedgeSkipped()
+                return await _acall_gemini(content, config, deadline)
+
+        if priority is None:
+            begin()
+            return await _acall_gemini(content, config, deadline)
+
+        async with generation_scheduler.async_generation_slot(session_id, priority, deadline):
+            begin()
+            return await _acall_gemini(content, config, deadline)
+
+    return await gemini_resilience.acall(attempt, deadline, hedge=_should_hedge(priority))
+
+
+async def agenerate_calendar_image(prompt, reference_image_data_list=None, use_cache=True, priority=None,
+                                   session_id=None, timeout=ASYNC_TIMEOUT_SECONDS, deadline=None):
+    """
+    Async version of generate_calendar_image (same prompt, references, cache and scheduler)
+
+    Hashing, cache I/O and reference image preparation run in worker threads,
+    so many generations can be outstanding on one event loop.
+
+    Args:
+        timeout (float): Seconds to wait for Gemini before cancelling (None = no limit)
+        deadline (float): Absolute time.time() deadline from the request (the
+                          earlier of the two applies)
+
+    Returns:
+        bytes: Generated image data
+
+    Raises:
+        gemini_resilience.DeadlineExceeded: Gemini didn't answer in time (the call is
+                                            cancelled; also an asyncio.TimeoutError)
+    """
+    if timeout is not None:
+        deadline = min(deadline or float('inf'), time.time() + timeout)
+
+    try:
+        cache_key = None
+        if use_cache:
+            cache_key = await asyncio.to_thread(generation_cache_key, prompt, reference_image_data_list)
+            cached = await asyncio.to_thread(generation_cache.get, cache_key)
+            if cached:
+                return cached
+
+        content, config = await asyncio.to_thread(build_generation_request, prompt, reference_image_data_list)
+
+        response = await _agenerate_content(content, config, priority=priority, session_id=session_id, deadline=deadline)
+
+        image_data = extract_image_data(response)
+        if image_data:
+            if cache_key:
+                await asyncio.to_thread(generation_cache.put, cache_key, image_data)
+            return image_data
+
+        raise Exception("No image generated in response")
+
+    except asyncio.CancelledError:
+        print("Gemini generation cancelled")
+        raise
+
+    except Exception as e:
+        print(f"Error generating image with Gemini (async): {str(e) or type(e).__name__}")
+        raise
+
+
+async def agenerate_batch(requests, max_concurrent=ASYNC_BATCH_CONCURRENCY, timeout=ASYNC_TIMEOUT_SECONDS,
+                          priority=None, session_id=None, deadline=None):
+    """
+    Generate many images concurrently on the running event loop
+
+    Args:
+        requests (list): Dicts with 'prompt' and optional 'reference_image_data_list', 'use_cache'
+        max_concurrent (int): Max generations in flight at once
+        timeout (float): Per-generation timeout in seconds
+        priority (int): generation_scheduler.PRIORITY_* class (None = unscheduled, e.g. scripts)
+        session_id (str): Internal session ID for scheduler fairness
+        deadline (float): Absolute time.time() deadline shared by the whole batch
+
+    Returns:
+        list: One entry per request, in order - image bytes, or the Exception that request raised
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def run_one(request):
+        async with semaphore:
+            return await agenerate_calendar_image(
+                request['prompt'],
+                request.get('reference_image_data_list'),
+                use_cache=request.get('use_cache', True),
+                priority=priority,
+                session_id=session_id,
+                timeout=timeout,
+                deadline=deadline
+            )
+
+    return await asyncio.gather(*(run_one(r) for r in requests), return_exceptions=True)
+
 
 def generate_calendar_images_batch(project_id, prompts, reference_image_data_list):
     """
@@ -247,112 +635,45 @@ def generate_calendar_images_batch(project_id, prompts, reference_image_data_lis
     return results
 
 
-def generate_delivery_worker_image(reference_image_data_list=None):
+def generate_delivery_worker_image(reference_image_data_list=None, session_id=None):
     """
     Generate a custom image of the customer as a handsome postal worker delivering a calendar
     This image is shown ONLY on the order success page, not included in the calendar
 
     Args:
         reference_image_data_list (list): List of user's reference image data bytes
+        session_id (str): Internal session ID (scheduled at background priority)
 
     Returns:
         bytes: Generated image data as PNG bytes
     """
     try:
-        client = genai.Client(api_key=GOOGLE_API_KEY)
-
-        content = []
-
-        # Add reference images if provided (to match the customer's appearance)
-        if reference_image_data_list:
-            ref_instruction = """⚠️ CRITICAL: THIS IS A FACE SWAP OPERATION ⚠️
-
-REFERENCE IMAGES: The following images show the EXACT person whose face must appear in the final image.
-
-FACE TRANSFER PROTOCOL (ABSOLUTE REQUIREMENTS):
-Your primary objective is to perform a precise face swap. Study ALL reference images to understand this person's EXACT facial features:
-
-STEP 1 - FACIAL ANALYSIS (Study these features from reference images):
-• Face shape: oval, square, round, heart-shaped, diamond, oblong
-• Eye characteristics: exact eye color, eye shape, eyelid type, eyebrow shape, spacing between eyes
-• Nose structure: nose bridge width, nose tip shape, nostril size, nose length
-• Mouth features: lip fullness, lip shape, smile line, teeth visibility
-• Jawline definition: jaw width, chin shape, chin prominence
-• Cheekbone structure: height, prominence, width
-• Skin characteristics: skin tone (exact shade), texture, blemishes, freckles, moles
-• Hair details: color, texture, hairline, hair style, facial hair if present
-• Distinctive features: scars, dimples, facial asymmetries, unique characteristics
-
-STEP 2 - FACE COPYING (Execute with 100% accuracy):
-• COPY the face EXACTLY as shown in reference images - every detail must match
-• Transfer the IDENTICAL face onto the body/scene - this is a direct face replacement
-• The face must be PIXEL-PERFECT identical to the reference photos
-• Match skin tone EXACTLY - do not lighten, darken, or alter the complexion
-• Copy facial proportions PRECISELY - eye spacing, nose-to-mouth ratio, forehead height
-• Preserve ALL distinctive features - moles, freckles, scars, dimples must appear in exact locations
-• Hair color and style must MATCH the reference exactly
-• DO NOT create a "similar looking" person - this must be the EXACT SAME PERSON
-• DO NOT blend, morph, or average features - COPY them with forensic precision
-• The viewer should be able to match the face to the reference images with 100% certainty
-
-STEP 3 - NATURAL INTEGRATION (After face is copied):
-• Once the EXACT face is transferred, integrate it naturally into the scene
-• Apply appropriate lighting that matches the scene (but does NOT change facial features)
-• Add natural shadows, highlights, and reflections that fit the environment
-• Ensure the skin tone lighting adjusts to the scene (warm/cool tones) while keeping the BASE skin tone identical
-• Make the integration seamless - the person should look like they were actually photographed in this location
-• Keep the face recognizable - lighting should enhance, never obscure or transform features
-
-QUALITY VERIFICATION:
-Before finalizing, verify:
-✓ Can you identify the person from the reference images with 100% certainty?
-✓ Are ALL distinctive facial features (moles, freckles, scars) in the correct locations?
-✓ Does the skin tone match the reference exactly (accounting only for scene lighting)?
-✓ Are the eye color, nose shape, and mouth exactly the same?
-✓ Would this pass as a real photograph of this specific person in this scene?
-
-If ANY answer is "no" - the face transfer has failed. The face must be IDENTICAL."""
-            content.append(ref_instruction)
-
-            # Add up to 3 best reference images
-            for img_data in reference_image_data_list[:3]:
-                try:
-                    img = Image.open(io.BytesIO(img_data))
-                    # Resize if too large (max 4MP for Gemini)
-                    max_pixels = 4_000_000
-                    if img.width * img.height > max_pixels:
-                        ratio = (max_pixels / (img.width * img.height)) ** 0.5
-                        new_size = (int(img.width * ratio), int(img.height * ratio))
-                        img = img.resize(new_size, Image.LANCZOS)
-                    content.append(img)
-                except Exception as e:
-                    print(f"Error loading reference image: {e}")
-
         # Use the bonus delivery prompt from monthly themes
-        from app.services.monthly_themes import BONUS_DELIVERY_PROMPT
-        content.append(BONUS_DELIVERY_PROMPT)
+        from app.services.monthly_themes import BONUS_DELIVERY_PROMPT, BONUS_DELIVERY_COMPACT_PROMPT
+        prompt = BONUS_DELIVERY_COMPACT_PROMPT if COMPACT_PROMPTS else BONUS_DELIVERY_PROMPT
+
+        cache_key = generation_cache_key(prompt, reference_image_data_list, DELIVERY_FACE_SWAP_INSTRUCTION)
+        cached = generation_cache.get(cache_key)
+        if cached:
+            return cached
+
+        content, config = build_generation_request(
+            prompt,
+            reference_image_data_list,
+            face_swap_instruction=DELIVERY_FACE_SWAP_INSTRUCTION
+        )
 
-        # Generate the image using Gemini 2.5 Flash Image
-        response = client.models.generate_content(
-            model='gemini-2.5-flash-image',
-            contents=content,
-            config=types.GenerateContentConfig(
-                response_modalities=['IMAGE'],
-                temperature=0.7,  # Balanced creativity and consistency
-                top_p=0.9,  # Slightly more diverse sampling
-                image_config=types.ImageConfig(
-                    aspect_ratio='4:3'  # Standard landscape for consistent calendar sizing
-                )
-            )
+        # Generate the image using Gemini 2.5 Flash Image (nice-to-have - lowest priority)
+        response = _generate_content(
+            content, config,
+            priority=generation_scheduler.PRIORITY_BACKGROUND,
+            session_id=session_id
         )
 
-        # Extract PNG image data from response
-        if response.candidates and len(response.candidates) > 0:
-            candidate = response.candidates[0]
-            if candidate.content and candidate.content.parts:
-                for part in candidate.content.parts:
-                    if hasattr(part, 'inline_data') and part.inline_data:
-                        return part.inline_data.data
+        image_data = extract_image_data(response)
+        if image_data:
+            generation_cache.put(cache_key, image_data)
+            return image_data
 
         raise Exception("No delivery worker image generated in response")
 
@@ -360,18 +681,15 @@ If ANY answer is "no" - the face transfer has failed. The face must be IDENTICAL
         print(f"Error generating delivery worker image: {str(e)}")
         raise
 
-
 def test_api_connection():
     """Test if Gemini API is configured and working"""
     try:
         if not GOOGLE_API_KEY:
             return False, "Google API key not configured"
 
-        client = genai.Client(api_key=GOOGLE_API_KEY)
-
         # Simple test generation
-        response = client.models.generate_content(
-            model='gemini-2.5-flash-image',
+        response = get_client().models.generate_content(
+            model=GEMINI_IMAGE_MODEL,
             contents=['A simple red circle on white background'],
             config=types.GenerateContentConfig(
                 response_modalities=['IMAGE'],
@@ -0,0 +1,172 @@
+"""
+Persistent cache of Gemini generation results
+Keyed by (reference image digests, final prompt, model, generation config)
+so identical re-requests are served from disk instead of paying Gemini again
+"""
+import os
+import time
+import hashlib
+import json
+import threading
+from app.storage_paths import DATA_ROOT
+
+# Cache directory (persistent volume on Fly.io, falls back to /tmp for local dev)
+CACHE_DIR = DATA_ROOT / 'generation_cache'
+CACHE_DIR.mkdir(exist_ok=True, parents=True)
+
+CACHE_ENABLED = os.getenv('GENERATION_CACHE_ENABLED', 'true').lower() == 'true'
+CACHE_TTL_SECONDS = int(os.getenv('GENERATION_CACHE_TTL', 7 * 24 * 3600))  # 7 days
+CACHE_MAX_BYTES = int(os.getenv('GENERATION_CACHE_MAX_BYTES', 1024 * 1024 * 1024))  # 1GB
+
+# Eviction frees down to this fraction of CACHE_MAX_BYTES, so a full cache isn't swept on every put
+CACHE_LOW_WATER = 0.9
+
+# A sweep lists and stats every entry, so put() only sweeps when this worker's running
+# total (last sweep's size plus its own writes since) passes CACHE_MAX_BYTES, or once
+# every EVICT_INTERVAL_SECONDS to pick up other workers' writes and expired entries
+EVICT_INTERVAL_SECONDS = int(os.getenv('GENERATION_CACHE_EVICT_INTERVAL', 600))
+_approx_bytes = None  # Not swept yet in this worker
+_last_sweep = 0.0
+
+# Serializes eviction sweeps within a worker (cross-worker races are harmless:
+# writes are atomic renames and a missing file is just a cache miss)
+_evict_lock = threading.Lock()
+
+
+def make_key(reference_digests, prompt, model, config_params):
+    """
+    Build a cache key for one generation request
+
+    Args:
+        reference_digests (list): SHA-256 digests of the reference images actually sent (in order)
+        prompt (str): Final prompt text
+        model (str): Gemini model name
+        config_params (dict): JSON-serializable generation config (incl. system instruction)
+
+    Returns:
+        str: Hex digest cache key
+    """
+    payload = json.dumps({
+        'references': list(reference_digests),
+        'prompt': prompt,
+        'model': model,
+        'config': config_params
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _entry_path(key):
+    return CACHE_DIR / f'{key}.bin'
+
+
+def get(key):
+    """Return cached image bytes for key, or None if missing/expired"""
+    if not CACHE_ENABLED:
+        return None
+
+    path = _entry_path(key)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+
+    if time.time() - stat.st_mtime > CACHE_TTL_SECONDS:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        return None
+
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+
+    # Record access time for LRU eviction (mtime is the TTL clock, atime the LRU clock)
+    try:
+        os.utime(path, (time.time(), stat.st_mtime))
+    except OSError:
+        pass
+
+    print(f"  ⚡ Generation cache hit ({len(data)} bytes)")
+    return data
+
+
+def put(key, image_data):
+    """Store image bytes under key (atomic write), then enforce the size bound when due"""
+    if not CACHE_ENABLED or not image_data:
+        return
+
+    path = _entry_path(key)
+    tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(image_data)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"  ⚠️  Failed to write generation cache entry: {e}")
+        try:
+            tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+        return
+
+    _maybe_evict(len(image_data))
+
+
+def delete(key):
+    """Remove one entry (e.g. discarded speculative results)"""
+    _entry_path(key).unlink(missing_ok=True)
+
+
+def _maybe_evict(added_bytes):
+    """Sweep if the running total is over the bound or the last sweep is too old"""
+    global _approx_bytes
+    if _approx_bytes is not None:
+        _approx_bytes += added_bytes
+    if _approx_bytes is None or _approx_bytes > CACHE_MAX_BYTES \
+            or time.time() - _last_sweep > EVICT_INTERVAL_SECONDS:
+        _evict()
+
+
+def _evict():
+    """Drop expired entries, then (if over CACHE_MAX_BYTES) least-recently-used entries down to the low-water mark"""
+    global _approx_bytes, _last_sweep
+    if not _evict_lock.acquire(blocking=False):
+        return  # Another thread is already sweeping
+
+    try:
+        now = time.time()
+        entries = []
+        total_bytes = 0
+
+        for entry in CACHE_DIR.glob('*.bin'):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > CACHE_TTL_SECONDS:
+                entry.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_atime, stat.st_size, entry))
+            total_bytes += stat.st_size
+
+        _last_sweep = now
+        _approx_bytes = total_bytes
+        if total_bytes <= CACHE_MAX_BYTES:
+            return
+
+        entries.sort()  # Oldest access first
+        freed = 0
+        for _, size, entry in entries:
+            if total_bytes - freed <= CACHE_MAX_BYTES * CACHE_LOW_WATER:
+                break
+            entry.unlink(missing_ok=True)
+            freed += size
+        _approx_bytes = total_bytes - freed
+
+        print(f"  🧹 Generation cache evicted {freed} bytes")
+
+    finally:
+        _evict_lock.release()
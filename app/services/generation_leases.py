@@ -0,0 +1,258 @@
+"""
+Leases on in-progress month generations
+Every month marked 'processing' is covered by a lease file that a heartbeat
+thread in the owning worker keeps renewing. When gunicorn kills the worker
+(timeout = 300, max_requests recycling, OOM) the heartbeats stop, and a
+background reaper puts the month back to 'pending' so the next generation
+pass picks it up - or marks it 'failed' after repeated interruptions -
+instead of leaving it 'processing' forever.
+"""
+import os
+import time
+import json
+import fcntl
+import socket
+import hashlib
+import threading
+from app.storage_paths import DATA_ROOT
+
+# Lease state directory (shared by all workers on the machine)
+LEASES_DIR = DATA_ROOT / 'leases'
+LEASES_DIR.mkdir(exist_ok=True, parents=True)
+
+# A lease expires this long after its last heartbeat
+LEASE_TTL_SECONDS = int(os.getenv('GENERATION_LEASE_TTL', 60))
+HEARTBEAT_INTERVAL = LEASE_TTL_SECONDS / 3
+
+# Heartbeats stop after this long even if the worker is alive (hung request -
+# gunicorn's 300s timeout should have killed it by now)
+LEASE_MAX_SECONDS = int(os.getenv('GENERATION_LEASE_MAX', 330))
+
+# Interrupted generations are requeued this many times before the month is failed
+MAX_ATTEMPTS = int(os.getenv('GENERATION_LEASE_MAX_ATTEMPTS', 3))
+
+REAPER_INTERVAL_SECONDS = int(os.getenv('GENERATION_REAPER_INTERVAL', 30))
+REAPER_ENABLED = os.getenv('GENERATION_REAPER_ENABLED', 'true').lower() == 'true'
+
+_HOST = socket.gethostname()
+
+# Leases held by this process (renewed by the heartbeat thread)
+_held = {}
+_held_lock = threading.Lock()
+_heartbeat_thread = None
+_reaper_thread = None
+
+
+def _lease_key(session_id, project_id, month_num):
+    raw = f'{session_id}|{project_id}|{month_num}'
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _lease_path(key):
+    return LEASES_DIR / f'{key}.json'
+
+
+def _requeue_path(key):
+    """Attempt counter left by the reaper when it requeues a month"""
+    return LEASES_DIR / f'{key}.requeued'
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    """Atomic write (readers never see a partial lease)"""
+    tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+    fd = os.open(tmp_path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+class Lease:
+    """A lease this process holds on one month's generation (use as a context manager)"""
+
+    def __init__(self, session_id, project_id, month_num):
+        self.key = _lease_key(session_id, project_id, month_num)
+        requeued = _read_json(_requeue_path(self.key))
+        now = time.time()
+        self.record = {
+            'session_id': session_id,
+            'project_id': project_id,
+            'month': month_num,
+            'host': _HOST,
+            'pid': os.getpid(),
+            'attempt': (requeued['attempts'] + 1) if requeued else 1,
+            'started_at': now,
+            'expires_at': now + LEASE_TTL_SECONDS
+        }
+
+    def renew(self):
+        """Push the expiry forward (False once LEASE_MAX_SECONDS has passed)"""
+        now = time.time()
+        if now - self.record['started_at'] > LEASE_MAX_SECONDS:
+            return False
+        with _held_lock:
+            if _held.get(self.key) is not self:
+                return True  # Released meanwhile - don't resurrect the file
+            self.record['expires_at'] = now + LEASE_TTL_SECONDS
+            _write_json(_lease_path(self.key), self.record)
+        return True
+
+    def release(self):
+        """Drop the lease (the generation finished, successfully or not)"""
+        with _held_lock:
+            if _held.pop(self.key, None) is None:
+                return
+        _lease_path(self.key).unlink(missing_ok=True)
+        _requeue_path(self.key).unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def acquire(session_id, project_id, month_num):
+    """
+    Take the lease for a month about to be marked 'processing'
+
+    Take it BEFORE updating the month status, so a 'processing' month always
+    has a lease for the reaper to find.
+
+    Returns:
+        Lease (release it when the month is completed or failed)
+    """
+    lease = Lease(session_id, project_id, month_num)
+    _write_json(_lease_path(lease.key), lease.record)
+    with _held_lock:
+        _held[lease.key] = lease
+    _ensure_heartbeat()
+    return lease
+
+
+def _ensure_heartbeat():
+    global _heartbeat_thread
+    with _held_lock:
+        if _heartbeat_thread is not None and _heartbeat_thread.is_alive():
+            return
+        _heartbeat_thread = threading.Thread(target=_heartbeat_loop, daemon=True)
+        _heartbeat_thread.start()
+
+
+def _heartbeat_loop():
+    """Renew every lease this process holds until there are none left"""
+    while True:
+        time.sleep(HEARTBEAT_INTERVAL)
+        with _held_lock:
+            leases = list(_held.values())
+        for lease in leases:
+            try:
+                if not lease.renew():
+                    print(f"  ⏳ Lease for month {lease.record['month']} hit {LEASE_MAX_SECONDS}s - no longer renewing")
+                    with _held_lock:
+                        _held.pop(lease.key, None)
+            except Exception as e:
+                print(f"  ⚠️  Failed to renew generation lease: {e}")
+
+
+def _is_expired(record, now):
+    """Lease is dead: heartbeats stopped, or its worker process is gone"""
+    if now > record['expires_at']:
+        return True
+    return record.get('host') == _HOST and not _pid_alive(record['pid'])
+
+
+def reap_expired():
+    """
+    Requeue (or fail) months whose generation lease has expired
+
+    Only one worker sweeps at a time (flock on reaper.lock); others skip.
+
+    Returns:
+        dict: {'requeued', 'failed'} month counts for this sweep
+    """
+    from app import session_storage
+
+    stats = {'requeued': 0, 'failed': 0}
+    fd = os.open(LEASES_DIR / 'reaper.lock', os.O_CREAT | os.O_RDWR, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return stats
+
+        now = time.time()
+        for path in LEASES_DIR.glob('*.json'):
+            record = _read_json(path)
+            if record is None or not _is_expired(record, now):
+                continue
+
+            key = path.stem
+            session_id, project_id, month_num = record['session_id'], record['project_id'], record['month']
+            if record['attempt'] < MAX_ATTEMPTS:
+                _write_json(_requeue_path(key), {'attempts': record['attempt'], 'requeued_at': now})
+                if session_storage.recover_stuck_month_by_session_id(session_id, project_id, month_num, 'pending'):
+                    stats['requeued'] += 1
+                    print(f"♻️  [Reaper] Month {month_num} of project {project_id} was interrupted "
+                          f"(attempt {record['attempt']}/{MAX_ATTEMPTS}) - requeued")
+                else:
+                    _requeue_path(key).unlink(missing_ok=True)  # Month finished anyway
+            else:
+                _requeue_path(key).unlink(missing_ok=True)
+                error_msg = f'Generation was interrupted {record["attempt"]} times - please try again'
+                if session_storage.recover_stuck_month_by_session_id(session_id, project_id, month_num,
+                                                                      'failed', error=error_msg):
+                    stats['failed'] += 1
+                    print(f"💀 [Reaper] Month {month_num} of project {project_id} failed after "
+                          f"{record['attempt']} interrupted attempts")
+
+            # Only drop the lease if nobody re-acquired it while we were recovering
+            current = _read_json(path)
+            if current and current['started_at'] == record['started_at']:
+                path.unlink(missing_ok=True)
+
+        # Requeue counters for months that were never retried
+        for path in LEASES_DIR.glob('*.requeued'):
+            requeued = _read_json(path)
+            if requeued and now - requeued['requeued_at'] > 24 * 3600:
+                path.unlink(missing_ok=True)
+
+        return stats
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def _reaper_loop():
+    while True:
+        time.sleep(REAPER_INTERVAL_SECONDS)
+        try:
+            reap_expired()
+        except Exception as e:
+            print(f"⚠️  [Reaper] Sweep failed (non-critical): {e}")
+
+
+def start_reaper():
+    """Start the background reaper thread in this worker (safe to call more than once)"""
+    global _reaper_thread
+    if not REAPER_ENABLED or (_reaper_thread is not None and _reaper_thread.is_alive()):
+        return
+    _reaper_thread = threading.Thread(target=_reaper_loop, daemon=True)
+    _reaper_thread.start()
@@ -0,0 +1,302 @@
+"""
+Priority-aware scheduler for Gemini image generations
+Shares a fixed number of generation slots across all gunicorn workers
+(flock'd slot files on the storage volume) and hands free slots to waiting
+requests by priority class, round-robin across sessions within a class
+"""
+import os
+import time
+import asyncio
+import json
+import uuid
+import fcntl
+import hashlib
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from app.storage_paths import DATA_ROOT
+
+# Priority classes (lower number = served first)
+PRIORITY_PAID = 0          # Remaining months after payment authorization
+PRIORITY_REGENERATE = 1    # User clicked regenerate
+PRIORITY_PREVIEW = 2       # Free 3-month preview
+PRIORITY_BACKGROUND = 3    # Speculative pre-generation, delivery worker image
+
+PRIORITY_NAMES = {
+    PRIORITY_PAID: 'paid',
+    PRIORITY_REGENERATE: 'regenerate',
+    PRIORITY_PREVIEW: 'preview',
+    PRIORITY_BACKGROUND: 'background'
+}
+
+# Scheduler state directory (shared by all workers on the machine)
+SCHEDULER_DIR = DATA_ROOT / 'scheduler'
+TICKETS_DIR = SCHEDULER_DIR / 'tickets'
+TICKETS_DIR.mkdir(exist_ok=True, parents=True)
+
+# Concurrent Gemini generations allowed across all workers
+MAX_CONCURRENT = int(os.getenv('GEMINI_MAX_CONCURRENT', 6))
+
+# Give up waiting before gunicorn's 300s worker timeout
+MAX_WAIT_SECONDS = int(os.getenv('SCHEDULER_MAX_WAIT', 240))
+
+# Waiters deeper in the queue poll less often (every poll lists all tickets)
+POLL_INTERVAL = 0.25
+MAX_POLL_INTERVAL = 2.0
+STALE_TICKET_SECONDS = 600
+
+# Typical Gemini latency used for wait estimates (updated as generations finish)
+_avg_latency = 45.0
+_latency_lock = threading.Lock()
+
+
+class SchedulerTimeout(Exception):
+    """Raised when a request waits longer than MAX_WAIT_SECONDS for a generation slot"""
+    pass
+
+
+def _session_tag(session_id):
+    """Short, non-reversible tag for a session (ticket filenames are world-listable)"""
+    return hashlib.sha256((session_id or 'anonymous').encode('utf-8')).hexdigest()[:16]
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def _read_tickets():
+    """List live tickets as dicts, removing tickets left behind by dead processes"""
+    now = time.time()
+    tickets = []
+    for path in TICKETS_DIR.glob('*.json'):
+        try:
+            with open(path) as f:
+                ticket = json.load(f)
+        except (FileNotFoundError, ValueError):
+            continue
+        if now - ticket['enqueued_at'] > STALE_TICKET_SECONDS or not _pid_alive(ticket['pid']):
+            path.unlink(missing_ok=True)
+            continue
+        ticket['path'] = path
+        tickets.append(ticket)
+    return tickets
+
+
+def _order_tickets(tickets):
+    """
+    Sort tickets into service order: priority class first, then round-robin
+    across sessions (a session's Nth ticket waits behind every other
+    session's (N-1)th), then arrival time
+    """
+    by_arrival = sorted(tickets, key=lambda t: t['enqueued_at'])
+    session_rank = {}
+    for ticket in by_arrival:
+        key = (ticket['priority'], ticket['session'])
+        ticket['rank'] = session_rank.get(key, 0)
+        session_rank[key] = ticket['rank'] + 1
+    return sorted(by_arrival, key=lambda t: (t['priority'], t['rank'], t['enqueued_at']))
+
+
+def _lock_free_slot(skip=0):
+    """
+    Lock one free slot file, leaving the first `skip` free slots to the
+    requests ahead in the queue (never holds more than one slot while probing)
+
+    Returns:
+        int: fd of the locked slot, or None if there weren't skip + 1 free slots
+    """
+    for i in range(MAX_CONCURRENT):
+        fd = os.open(SCHEDULER_DIR / f'slot-{i}.lock', os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            continue
+        if skip == 0:
+            return fd
+        skip -= 1
+        _release_slot(fd)
+    return None
+
+
+def _release_slot(fd):
+    try:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def _enqueue(session_id, priority, deadline):
+    """
+    Write this request's ticket into the queue
+
+    Returns:
+        tuple: (ticket_id, ticket_path, enqueued_at, give_up_at)
+    """
+    ticket_id = uuid.uuid4().hex
+    ticket_path = TICKETS_DIR / f'{ticket_id}.json'
+    enqueued_at = time.time()
+    give_up_at = enqueued_at + MAX_WAIT_SECONDS
+    if deadline is not None:
+        give_up_at = min(give_up_at, deadline)
+    with open(ticket_path, 'w') as f:
+        json.dump({
+            'id': ticket_id,
+            'session': _session_tag(session_id),
+            'priority': priority,
+            'enqueued_at': enqueued_at,
+            'pid': os.getpid()
+        }, f)
+    return ticket_id, ticket_path, enqueued_at, give_up_at
+
+
+def _try_acquire(ticket_id, give_up_at):
+    """
+    One non-blocking attempt to take a slot for a queued ticket
+
+    Returns:
+        tuple: (slot_fd, retry_in) - slot_fd is None if the caller should
+               wait retry_in seconds and try again
+
+    Raises:
+        SchedulerTimeout: give_up_at has passed without getting a slot
+    """
+    ordered = _order_tickets(_read_tickets())
+    position = next((i for i, t in enumerate(ordered) if t['id'] == ticket_id), 0)
+
+    # Only the first MAX_CONCURRENT waiters can be served; the rest don't touch the slots
+    if position < MAX_CONCURRENT:
+        slot_fd = _lock_free_slot(skip=position)
+        if slot_fd is not None:
+            return slot_fd, 0
+
+    if time.time() > give_up_at:
+        raise SchedulerTimeout(
+            f"Generation queue is busy (position {position + 1}) - please try again shortly"
+        )
+    return None, min(POLL_INTERVAL * (1 + position // MAX_CONCURRENT), MAX_POLL_INTERVAL)
+
+
+def _log_wait(priority, enqueued_at):
+    waited = time.time() - enqueued_at
+    if waited > 1:
+        print(f"  🚦 Got {PRIORITY_NAMES.get(priority, priority)} generation slot after {waited:.1f}s")
+
+
+def _release_and_record(slot_fd, started_at):
+    """Free a held slot and fold the generation's duration into the latency estimate"""
+    global _avg_latency
+    _release_slot(slot_fd)
+    with _latency_lock:
+        _avg_latency = 0.8 * _avg_latency + 0.2 * (time.time() - started_at)
+
+
+@contextmanager
+def generation_slot(session_id, priority, deadline=None):
+    """
+    Wait for a generation slot, hold it for the duration of the block
+
+    Args:
+        session_id: Internal storage session ID (for per-session fairness)
+        priority: One of the PRIORITY_* classes
+        deadline: Absolute time.time() deadline of the request (waits at most
+                  until then, and never longer than MAX_WAIT_SECONDS)
+
+    Raises:
+        SchedulerTimeout: No slot became available in time
+    """
+    ticket_id, ticket_path, enqueued_at, give_up_at = _enqueue(session_id, priority, deadline)
+    try:
+        while True:
+            slot_fd, retry_in = _try_acquire(ticket_id, give_up_at)
+            if slot_fd is not None:
+                break
+            time.sleep(retry_in)
+    finally:
+        ticket_path.unlink(missing_ok=True)
+
+    _log_wait(priority, enqueued_at)
+    started_at = time.time()
+    try:
+        yield
+    finally:
+        _release_and_record(slot_fd, started_at)
+
+
+@contextmanager
+def spare_generation_slot():
+    """
+    Hold a free generation slot only if no request is queued for one
+
+    Used by hedged requests, which must never take capacity from the queue.
+
+    Yields:
+        bool: True if a slot is held for the block
+    """
+    slot_fd = _lock_free_slot() if not _read_tickets() else None
+    try:
+        yield slot_fd is not None
+    finally:
+        if slot_fd is not None:
+            _release_slot(slot_fd)
+
+
+@asynccontextmanager
+async def async_generation_slot(session_id, priority, deadline=None):
+    """
+    Async variant of generation_slot for the asyncio generation path
+
+    Polls for the slot with asyncio.sleep between attempts, so waiters cost
+    no threads and a cancelled waiter simply drops its ticket.
+    """
+    ticket_id, ticket_path, enqueued_at, give_up_at = _enqueue(session_id, priority, deadline)
+    try:
+        while True:
+            slot_fd, retry_in = _try_acquire(ticket_id, give_up_at)
+            if slot_fd is not None:
+                break
+            await asyncio.sleep(retry_in)
+    finally:
+        ticket_path.unlink(missing_ok=True)
+
+    _log_wait(priority, enqueued_at)
+    started_at = time.time()
+    try:
+        yield
+    finally:
+        _release_and_record(slot_fd, started_at)
+
+
+def get_queue_status(session_id=None):
+    """
+    Snapshot of the generation queue for progress endpoints
+
+    Returns:
+        dict: {'queue_depth', 'by_priority', 'position', 'estimated_wait_seconds'}
+              position/estimated wait refer to the session's first queued request
+              (None if the session has nothing queued)
+    """
+    ordered = _order_tickets(_read_tickets())
+    tag = _session_tag(session_id) if session_id else None
+    position = next((i for i, t in enumerate(ordered) if t['session'] == tag), None)
+
+    by_priority = {name: 0 for name in PRIORITY_NAMES.values()}
+    for ticket in ordered:
+        by_priority[PRIORITY_NAMES.get(ticket['priority'], 'background')] += 1
+
+    estimated_wait = None
+    if position is not None:
+        # Each "round" of MAX_CONCURRENT queued requests takes about one generation
+        estimated_wait = int(((position // MAX_CONCURRENT) + 1) * _avg_latency)
+
+    return {
+        'queue_depth': len(ordered),
+        'by_priority': by_priority,
+        'position': position,
+        'estimated_wait_seconds': estimated_wait
+    }
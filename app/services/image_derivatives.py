@@ -0,0 +1,81 @@
+"""
+One-shot derivatives of a month variant's master image
+Each generated variant is stored once as its master: a single high-quality
+JPEG encode of Gemini's PNG, which is also what the browser is served.
+Every other output is rendered straight from the master the first time it's
+needed and cached by (master digest, purpose) - see
+session_storage.get_month_derivative_path() - so no image is re-encoded from
+an earlier lossy copy, or re-rendered on every mockup/order/grid request.
+
+Purposes:
+- print: face-safe padding + watermark, uploaded to Printify (mockups and orders)
+- print_unbranded: print without the watermark (wall calendar cover IS the logo)
+- tile: 400x533 tile of the calendar grid preview
+"""
+import io
+from PIL import Image
+
+# Master encode of a generated image (Gemini PNG -> JPEG, once per variant)
+# q95 keeps print quality; optimize trims ~20% at ~10ms on a 1MP image
+MASTER_JPEG_OPTIONS = {'quality': 95, 'optimize': True}
+
+# Calendar grid preview tiles (3:4)
+TILE_SIZE = (400, 533)
+TILE_JPEG_OPTIONS = {'quality': 85, 'optimize': True}
+
+
+def encode_master(img):
+    """
+    JPEG master bytes for a decoded generated image
+
+    Args:
+        img: PIL Image (any mode)
+
+    Returns:
+        bytes
+    """
+    output = io.BytesIO()
+    img.convert('RGB').save(output, format='JPEG', **MASTER_JPEG_OPTIONS)
+    return output.getvalue()
+
+
+def _print(master, face_box, skip_watermark=False):
+    from app.services.image_padding_service import add_safe_padding
+    return add_safe_padding(master, use_face_detection=False, skip_watermark=skip_watermark, face_info=face_box)
+
+
+def _tile(master, face_box):
+    img = Image.open(io.BytesIO(master))
+    img.draft('RGB', TILE_SIZE)  # JPEG masters decode at 1/2 scale or smaller
+    img = img.convert('RGB').resize(TILE_SIZE, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    output = io.BytesIO()
+    img.save(output, format='JPEG', **TILE_JPEG_OPTIONS)
+    return output.getvalue()
+
+
+# Purpose -> renderer(master bytes, face box) -> JPEG bytes
+RENDERERS = {
+    'print': _print,
+    'print_unbranded': lambda master, face_box: _print(master, face_box, skip_watermark=True),
+    'tile': _tile,
+}
+
+
+def render(purpose, master, face_box=None):
+    """
+    Render a derivative from master bytes (callers cache the result)
+
+    Args:
+        purpose: Key of RENDERERS
+        master: Master JPEG bytes of the variant
+        face_box: Face box stored with the variant (face-safe print padding)
+
+    Returns:
+        bytes: JPEG
+    """
+    return RENDERERS[purpose](master, face_box)
+
+
+def print_purpose(month_number, product_type):
+    """Derivative uploaded to Printify for a month (the wall calendar cover skips the watermark)"""
+    return 'print_unbranded' if month_number == 0 and product_type == 'wall_calendar' else 'print'
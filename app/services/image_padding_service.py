@@ -78,16 +78,19 @@ def add_watermark(img, logo_size_percent=8, margin_percent=2):
         print(f"  ⚠️  Watermark failed: {e}, returning original image")
         return img
 
-def add_safe_padding(image_bytes, use_face_detection=False, skip_watermark=False):
+def add_safe_padding(image_bytes, use_face_detection=False, skip_watermark=False, face_info=None):
     """
     Add intelligent padding to image with multiple safety layers
 
-    CURRENTLY DISABLED: Returns original image with watermark for direct scaling
+    Uniform padding is DISABLED (original image is scaled directly). Only
+    face-aware padding is applied, and only when a known face box falls
+    outside the central safe zone.
 
     Args:
         image_bytes: Input image as bytes
-        use_face_detection: Enable face detection for smart padding (requires cv2)
+        use_face_detection: Run face detection if no face_info given (requires cv2)
         skip_watermark: Skip adding watermark/logo (for cover images that ARE the logo)
+        face_info: Face box stored with the month variant (skips detection)
 
     Returns:
         bytes: Image with watermark as JPEG bytes
@@ -98,7 +101,22 @@ def add_safe_padding(image_bytes, use_face_detection=False, skip_watermark=False
         original_width, original_height = img.size
 
         print(f"  🖼️  Original size: {original_width}x{original_height}")
-        print(f"  ⚠️  PADDING DISABLED - adding watermark only")
+
+        if face_info is None and use_face_detection:
+            face_info = detect_face_position(img)
+
+        if face_info:
+            pad_w, pad_h = calculate_face_padding(face_info, original_width, original_height)
+            if pad_w or pad_h:
+                print(f"  👤 Face outside safe zone - padding {pad_w}px sides, {pad_h}px top/bottom")
+                img = create_padded_canvas(
+                    img.convert('RGB'), pad_w, pad_h, pad_h,
+                    original_width + 2 * pad_w, original_height + 2 * pad_h
+                )
+            else:
+                print(f"  👤 Face inside safe zone - no padding needed")
+        else:
+            print(f"  ⚠️  PADDING DISABLED - adding watermark only")
 
         # Add watermark to bottom right corner (unless skip_watermark=True)
         if skip_watermark:
@@ -222,55 +240,15 @@ def create_blurred_edges(img, pad_w, pad_top, pad_bottom, new_width, new_height)
 
 def detect_face_position(img):
     """
-    Detect face position in image (requires OpenCV/MediaPipe)
+    Detect face position in image (requires OpenCV)
     Returns None if face detection unavailable or no face found
+
+    Uses the shared detector from face_detection_service (cached per process,
+    runs on a downscaled copy). Prefer the face box stored with each month
+    variant over calling this again.
     """
-    try:
-        import cv2
-        import numpy as np
-
-        # Convert PIL to OpenCV format
-        img_array = np.array(img)
-        img_cv = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-
-        # Load OpenCV face detector
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-
-        # Detect faces
-        faces = face_cascade.detectMultiScale(img_cv, scaleFactor=1.1, minNeighbors=5)
-
-        if len(faces) == 0:
-            return None
-
-        # If multiple faces, get bounding box containing all
-        if len(faces) > 1:
-            x_min = min(f[0] for f in faces)
-            y_min = min(f[1] for f in faces)
-            x_max = max(f[0] + f[2] for f in faces)
-            y_max = max(f[1] + f[3] for f in faces)
-            return {
-                'x': x_min,
-                'y': y_min,
-                'width': x_max - x_min,
-                'height': y_max - y_min,
-                'count': len(faces)
-            }
-
-        # Single face
-        x, y, w, h = faces[0]
-        return {
-            'x': x,
-            'y': y,
-            'width': w,
-            'height': h,
-            'count': 1
-        }
-
-    except ImportError:
-        # OpenCV not available - skip face detection
-        return None
-    except Exception:
-        return None
+    from app.services.face_detection_service import detect_face_box
+    return detect_face_box(img)
 
 def calculate_face_padding(face_info, img_width, img_height):
     """
@@ -294,6 +272,10 @@ def calculate_face_padding(face_info, img_width, img_height):
     extra_pad_top = max(0, safe_top - face_top)
     extra_pad_bottom = max(0, face_bottom - safe_bottom)
 
+    # Face already inside the safe zone - no extra padding needed
+    if not any((extra_pad_left, extra_pad_right, extra_pad_top, extra_pad_bottom)):
+        return 0, 0
+
     # Add face margin percentage
     face_margin = CONFIG['face_margin_percent'] / 100
     face_margin_w = int(img_width * face_margin)
@@ -2,91 +2,126 @@
 Pre-defined monthly hunk themes - FINAL PRODUCTION PROMPTS
 Each month features cinematic scenarios optimized for face consistency
 Last updated: November 12, 2025
+
+Prompts are composed once at import time from shared fragments:
+each theme has a "template" with a {likeness} slot, filled with the shared
+LIKENESS_CLAUSE (or a month-specific "likeness" override).
 """
 
+# Shared likeness preamble (used verbatim by most months)
+LIKENESS_CLAUSE = "using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration, blending, or re-rendering of facial features"
+
+# Short form used when the face-swap system instruction already carries the likeness rules
+COMPACT_LIKENESS_CLAUSE = "of the person in the reference images"
+
 MONTHLY_THEMES = {
     0: {
         "month": "Cover",
         "title": "Hunk of the Month Magazine Hero",
         "description": "Epic magazine cover hero shot with dramatic lighting",
-        "prompt": """Create a cinematic photo using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration, blending, or re-rendering of facial features as a confident man in a sleek black tuxedo pouring champagne while fireworks explode across a midnight skyline. He stands on a rooftop terrace, city lights glimmering below, champagne foam sparkling in the air, his smile smooth and cinematic. The mood is luxury and celebration, golden rim-light catching his features like a magazine cover. Blend lighting, shadows, and color naturally so the subject looks photographed in the scene. Keep the person's likeness consistent with the reference photos. Never include any text, letters, or writing within images. All results must look like natural photographs without any visible text or labels."""
+        "template": """Create a cinematic photo {likeness} as a confident man in a sleek black tuxedo pouring champagne while fireworks explode across a midnight skyline. He stands on a rooftop terrace, city lights glimmering below, champagne foam sparkling in the air, his smile smooth and cinematic. The mood is luxury and celebration, golden rim-light catching his features like a magazine cover. Blend lighting, shadows, and color naturally so the subject looks photographed in the scene. Keep the person's likeness consistent with the reference photos. Never include any text, letters, or writing within images. All results must look like natural photographs without any visible text or labels."""
     },
     1: {
         "month": "January",
         "title": "Gentleman 🥵",
         "description": "Ring in the new year right.",
-        "prompt": """Create a hyper-realistic medium-shot photo using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration, blending, or re-rendering of facial features as a confident, sexy man at an upscale New Year's Eve penthouse party. He is wearing a perfectly tailored black tuxedo jacket styled open to reveal a sculpted, powerful chest and abs, paired with matching tuxedo pants, and he holds a champagne bottle clearly in frame as it erupts into a dramatic burst of glittering foam and droplets frozen mid-air. He gives a smoldering, sexy smirk directly into the camera, the expression smooth and magnetic. Behind him, massive fireworks explode across the city skyline through floor-to-ceiling glass windows, reflections shimmering across the room, confetti drifting around him, warm golden party lights flaring softly at the edges of the frame, adding cinematic intensity. The scene features realistic skin texture, crisp reflections, rich highlights from the fireworks, shallow depth of field, and a high-fashion, studio-quality professional male model photoshoot vibe with no text or writing anywhere in the image."""
+        "template": """Create a hyper-realistic medium-shot photo {likeness} as a confident, sexy man at an upscale New Year's Eve penthouse party. He is wearing a perfectly tailored black tuxedo jacket styled open to reveal a sculpted, powerful chest and abs, paired with matching tuxedo pants, and he holds a champagne bottle clearly in frame as it erupts into a dramatic burst of glittering foam and droplets frozen mid-air. He gives a smoldering, sexy smirk directly into the camera, the expression smooth and magnetic. Behind him, massive fireworks explode across the city skyline through floor-to-ceiling glass windows, reflections shimmering across the room, confetti drifting around him, warm golden party lights flaring softly at the edges of the frame, adding cinematic intensity. The scene features realistic skin texture, crisp reflections, rich highlights from the fireworks, shallow depth of field, and a high-fashion, studio-quality professional male model photoshoot vibe with no text or writing anywhere in the image."""
     },
     2: {
         "month": "February",
         "title": "Valentine's Cop 💘",
         "description": "Arrested for being too sexy.",
-        "prompt": """Create a hyper-realistic photo using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration, blending, or re-rendering of facial features as a shirtless, intensely sexy Cupid-style police officer drawing back a bright red Cupid bow with powerful muscular tension, his sculpted chest, shoulders, and abs defined by crisp natural lighting that preserves realistic skin texture, pores, and lifelike detail with no plastic smoothing, wearing tight uniform pants, a polished police hat, and a reflective badge catching subtle highlights as he looks directly into the camera with a locked, deliberate, smoldering stare, maintaining strong eye contact with the viewer, rose petals falling naturally around him against a backdrop of real red roses, practical lights, and shallow depth of field, with clean true-to-life shadows, rich contrast, and a professional photoshoot look, all rendered with studio-quality realism and absolutely no text or writing anywhere in the image."""
+        "template": """Create a hyper-realistic photo {likeness} as a shirtless, intensely sexy Cupid-style police officer drawing back a bright red Cupid bow with powerful muscular tension, his sculpted chest, shoulders, and abs defined by crisp natural lighting that preserves realistic skin texture, pores, and lifelike detail with no plastic smoothing, wearing tight uniform pants, a polished police hat, and a reflective badge catching subtle highlights as he looks directly into the camera with a locked, deliberate, smoldering stare, maintaining strong eye contact with the viewer, rose petals falling naturally around him against a backdrop of real red roses, practical lights, and shallow depth of field, with clean true-to-life shadows, rich contrast, and a professional photoshoot look, all rendered with studio-quality realism and absolutely no text or writing anywhere in the image."""
     },
     3: {
         "month": "March",
         "title": "Wall Street Billionaire CEO 💼",
         "description": "Powerful billionaire in his corner office",
-        "prompt": """Create a hyper-realistic photo using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration, blending, or re-rendering of facial features, as an impossibly wealthy, powerfully built Wall Street billionaire CEO leaning sexily against a sleek executive desk in a glass-walled corner office during a dramatic, natural sunset casting warm rim light around his shoulders and jawline, creating realistic highlights and long shadows across polished marble floors, brushed metal accents, and understated luxury furniture, his white button-down shirt unbuttoned wide to reveal sculpted abs and a defined chest with a black tie hanging untied and draped to the sides, not covering his torso, cuffs rolled up showing faint veins, and an extremely expensive watch catching a subtle glint as he supports himself with one hand on the desk near a detailed private jet model, crystal whiskey glass, luxury pen, leather notebook, and metallic accessories, a tailored suit jacket draped over a nearby chair, rare modern art on the wall, a discreet security badge scanner by the door, and natural reflections of skyscrapers and city lights in the surrounding glass, while a slight breeze lifts the open edges of his shirt and he locks an intense, smoldering, direct stare into the camera, crisp natural lighting preserving true skin texture, stubble, and lifelike detail with shallow depth of field enhancing the grounded, cinematic, ultra-rich atmosphere, all rendered with studio-quality realism and absolutely no text or writing anywhere in the image."""
+        "template": """Create a hyper-realistic photo {likeness}, as an impossibly wealthy, powerfully built Wall Street billionaire CEO leaning sexily against a sleek executive desk in a glass-walled corner office during a dramatic, natural sunset casting warm rim light around his shoulders and jawline, creating realistic highlights and long shadows across polished marble floors, brushed metal accents, and understated luxury furniture, his white button-down shirt unbuttoned wide to reveal sculpted abs and a defined chest with a black tie hanging untied and draped to the sides, not covering his torso, cuffs rolled up showing faint veins, and an extremely expensive watch catching a subtle glint as he supports himself with one hand on the desk near a detailed private jet model, crystal whiskey glass, luxury pen, leather notebook, and metallic accessories, a tailored suit jacket draped over a nearby chair, rare modern art on the wall, a discreet security badge scanner by the door, and natural reflections of skyscrapers and city lights in the surrounding glass, while a slight breeze lifts the open edges of his shirt and he locks an intense, smoldering, direct stare into the camera, crisp natural lighting preserving true skin texture, stubble, and lifelike detail with shallow depth of field enhancing the grounded, cinematic, ultra-rich atmosphere, all rendered with studio-quality realism and absolutely no text or writing anywhere in the image."""
     },
     4: {
         "month": "April",
         "title": "Firefighter with Kitten 🚒",
         "description": "Heroic firefighter with a rescued kitten",
-        "prompt": """Create a hyper-realistic photo using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration, blending, or re-rendering of facial features as a muscular, sexy male firefighter posing like a male model beside a red fire hydrant, shirtless with turnout pants and a turnout coat hanging open, suspenders loose, leaning confidently on the fire hydrant with a smoldering gaze, sunlight glistening on his abs and shoulders, a fluffy cat perched on a nearby tree branch watching me, soft golden hour lighting with warm tones, shallow depth of field, background firetruck and firefighters slightly out of focus, realistic skin texture, wet pavement reflections, water droplets in motion, studio-quality professional male model photoshoot."""
+        "template": """Create a hyper-realistic photo {likeness} as a muscular, sexy male firefighter posing like a male model beside a red fire hydrant, shirtless with turnout pants and a turnout coat hanging open, suspenders loose, leaning confidently on the fire hydrant with a smoldering gaze, sunlight glistening on his abs and shoulders, a fluffy cat perched on a nearby tree branch watching me, soft golden hour lighting with warm tones, shallow depth of field, background firetruck and firefighters slightly out of focus, realistic skin texture, wet pavement reflections, water droplets in motion, studio-quality professional male model photoshoot."""
     },
     5: {
         "month": "May",
         "title": "Beach Lifeguard Rescue 🏄",
         "description": "Emerging from golden hour waves",
-        "prompt": """Create a hyper-realistic photo using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration, blending, or re-rendering of facial features as a muscular, sexy male lifeguard heroically rescuing a swimmer from a shark attack in shallow ocean water. The lifeguard is carrying the injured swimmer toward shore with strength and determination, waves crashing around his legs, red lifeguard shorts clinging wetly to his body, sunlight glistening on his abs and shoulders, ocean spray and water droplets frozen mid-air, faint silhouette of a shark fin visible behind in the distance, other lifeguards running toward them out of focus. Dramatic golden-hour lighting with warm tones, intense and cinematic energy, heroic and protective expression, shallow depth of field, realistic skin texture, wet reflections on the sand, studio-quality professional male model photoshoot vibe."""
+        "template": """Create a hyper-realistic photo {likeness} as a muscular, sexy male lifeguard heroically rescuing a swimmer from a shark attack in shallow ocean water. The lifeguard is carrying the injured swimmer toward shore with strength and determination, waves crashing around his legs, red lifeguard shorts clinging wetly to his body, sunlight glistening on his abs and shoulders, ocean spray and water droplets frozen mid-air, faint silhouette of a shark fin visible behind in the distance, other lifeguards running toward them out of focus. Dramatic golden-hour lighting with warm tones, intense and cinematic energy, heroic and protective expression, shallow depth of field, realistic skin texture, wet reflections on the sand, studio-quality professional male model photoshoot vibe."""
     },
     6: {
         "month": "June",
         "title": "Hot Pool Guy 💧",
         "description": "Sun-kissed pool maintenance on a hot summer day",
-        "prompt": """Create a hyper-realistic photo using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, hair, and facial features with no alteration, blending, or re-rendering — as an intensely sexy, sun-kissed pool guy captured full body outside on a blistering Beverly Hills afternoon, viewed voyeuristically from inside a cool, shaded modern kitchen through a spotless glass window. He stands barefoot on the pool deck with his entire sculpted physique on display, powerful legs, defined obliques, and a fully visible, ripped torso glistening with a heavy sheen of sweat and pool spray, water trails running down his abs and chest as harsh sunlight creates sharp, cinematic sun flares on each droplet. His low-slung, slightly damp dark board shorts cling tightly to his hips and thighs, a dark leather utility belt hangs on his waist, and he grips a long white pool-skimmer pole with both hands, the net submerged in the water and soaked, dripping a steady stream back into the pool as he works. Even mid-motion, he turns his head to lock a direct, smoldering, devastatingly seductive stare into the camera, expression confident, teasing, and fully aware he's being watched. The foreground shows the blurred metallic silhouette of a kitchen faucet and a pristine white counter framing the scene, while behind him stretch a sparkling infinity pool, vibrant bougainvillea, towering palms, rolling hills, and the distant haze of Los Angeles, all rendered with hyper-realistic lighting, true skin texture with real pores and sweat, crisp detail, shallow depth of field, and a cinematic photoshoot look, with absolutely no text or writing anywhere in the image."""
+        "likeness": """using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, hair, and facial features with no alteration, blending, or re-rendering —""",
+        "template": """Create a hyper-realistic photo {likeness} as an intensely sexy, sun-kissed pool guy captured full body outside on a blistering Beverly Hills afternoon, viewed voyeuristically from inside a cool, shaded modern kitchen through a spotless glass window. He stands barefoot on the pool deck with his entire sculpted physique on display, powerful legs, defined obliques, and a fully visible, ripped torso glistening with a heavy sheen of sweat and pool spray, water trails running down his abs and chest as harsh sunlight creates sharp, cinematic sun flares on each droplet. His low-slung, slightly damp dark board shorts cling tightly to his hips and thighs, a dark leather utility belt hangs on his waist, and he grips a long white pool-skimmer pole with both hands, the net submerged in the water and soaked, dripping a steady stream back into the pool as he works. Even mid-motion, he turns his head to lock a direct, smoldering, devastatingly seductive stare into the camera, expression confident, teasing, and fully aware he's being watched. The foreground shows the blurred metallic silhouette of a kitchen faucet and a pristine white counter framing the scene, while behind him stretch a sparkling infinity pool, vibrant bougainvillea, towering palms, rolling hills, and the distant haze of Los Angeles, all rendered with hyper-realistic lighting, true skin texture with real pores and sweat, crisp detail, shallow depth of field, and a cinematic photoshoot look, with absolutely no text or writing anywhere in the image."""
     },
     7: {
         "month": "July",
         "title": "Hot Cowboy 🤠",
         "description": "Rugged ranch cowboy at sunset with lasso",
-        "prompt": """Create a hyper-realistic photo using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration, blending, or re-rendering of facial features as an intensely sexy, rugged cowboy leaning with one forearm on a weathered, splintered wooden fence at the edge of a rustic Jackson Hole ranch during a blazing sunset, a battered Stetson shading his sweat-plastered hair as warm, dramatic rim light outlines his hat, broad shoulders, and super-defined abs and chest with a natural dusting of chest hair, sweat trails gliding over each muscle. His unbuttoned, dust-stained dark denim shirt hangs open and flutters in the cool Wyoming breeze, revealing a deeply tanned, hard-earned torso and powerful, veined forearms beneath a distressed leather vest. Faded, dirt-caked jeans cling to his strong thighs, scuffed boots dig into the dry earth, a massive tarnished silver belt buckle anchors his thick weathered belt, and a frayed glove and heavy revolver sit at his hips. He grips a coiled rawhide lasso in one hand while his dark, sweat-damp Quarter Horse stands fully behind the fence with its entire body on the other side, but its head hangs over the top rail of the fence beside him, clearly visible and close to his shoulder, warm breath drifting in the crisp mountain air. His expression is devastatingly seductive — an intense, smoldering stare locked directly into the camera, equal parts danger and desire. Dust drifts through the air, heat haze ripples across the open range, and a subtle lens flare cuts through the frame as the Grand Tetons rise sharply in the background under a sky streaked with orange, red, and violet. The entire image features realistic skin texture, tactile grit, lightly applied film grain, shallow depth of field, and a cinematic Western mood with absolutely no text or writing anywhere in the image."""
+        "template": """Create a hyper-realistic photo {likeness} as an intensely sexy, rugged cowboy leaning with one forearm on a weathered, splintered wooden fence at the edge of a rustic Jackson Hole ranch during a blazing sunset, a battered Stetson shading his sweat-plastered hair as warm, dramatic rim light outlines his hat, broad shoulders, and super-defined abs and chest with a natural dusting of chest hair, sweat trails gliding over each muscle. His unbuttoned, dust-stained dark denim shirt hangs open and flutters in the cool Wyoming breeze, revealing a deeply tanned, hard-earned torso and powerful, veined forearms beneath a distressed leather vest. Faded, dirt-caked jeans cling to his strong thighs, scuffed boots dig into the dry earth, a massive tarnished silver belt buckle anchors his thick weathered belt, and a frayed glove and heavy revolver sit at his hips. He grips a coiled rawhide lasso in one hand while his dark, sweat-damp Quarter Horse stands fully behind the fence with its entire body on the other side, but its head hangs over the top rail of the fence beside him, clearly visible and close to his shoulder, warm breath drifting in the crisp mountain air. His expression is devastatingly seductive — an intense, smoldering stare locked directly into the camera, equal parts danger and desire. Dust drifts through the air, heat haze ripples across the open range, and a subtle lens flare cuts through the frame as the Grand Tetons rise sharply in the background under a sky streaked with orange, red, and violet. The entire image features realistic skin texture, tactile grit, lightly applied film grain, shallow depth of field, and a cinematic Western mood with absolutely no text or writing anywhere in the image."""
     },
     8: {
         "month": "August",
         "title": "Firefighter Saving a Puppy from Burning Building 🚒",
         "description": "Brave firefighter rescuing a puppy from flames",
-        "prompt": """Create a hyper-realistic wide full-body photo using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration of facial features, as an intensely sexy, rugged firefighter at night, emerging through heavy smoke and drifting embers from a large burning building, firefighter helmet always on and fully visible in frame with no cropping, turnout coat wide open revealing a sculpted sweat-soaked, soot-streaked chest and defined abs, suspenders loose, carrying a scruffy, wet Golden Retriever puppy tightly in one arm while stepping over debris. A fire truck blasts a high-pressure stream of water toward the flames behind him, red and white emergency lights flashing, blurred firefighters and EMTs rushing in the background; sparks cling to his skin, sweat glistens across his muscles, and dramatic firelight casts bold highlights and deep shadows as he locks a direct smoldering heroic gaze into the camera, with realistic skin texture, gritty ash detail, cinematic lighting, extra headroom and full lower-body framing, and no text or writing anywhere in the image."""
+        "likeness": """using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration of facial features,""",
+        "template": """Create a hyper-realistic wide full-body photo {likeness} as an intensely sexy, rugged firefighter at night, emerging through heavy smoke and drifting embers from a large burning building, firefighter helmet always on and fully visible in frame with no cropping, turnout coat wide open revealing a sculpted sweat-soaked, soot-streaked chest and defined abs, suspenders loose, carrying a scruffy, wet Golden Retriever puppy tightly in one arm while stepping over debris. A fire truck blasts a high-pressure stream of water toward the flames behind him, red and white emergency lights flashing, blurred firefighters and EMTs rushing in the background; sparks cling to his skin, sweat glistens across his muscles, and dramatic firelight casts bold highlights and deep shadows as he locks a direct smoldering heroic gaze into the camera, with realistic skin texture, gritty ash detail, cinematic lighting, extra headroom and full lower-body framing, and no text or writing anywhere in the image."""
     },
     9: {
         "month": "September",
         "title": "Fighter Pilot ✈️",
         "description": "Elite fighter jet pilot with aviators and flight suit",
-        "prompt": """Create a hyper-realistic wide full-body photo using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration or re-rendering of facial features as a confident, sexy fighter jet pilot leaning naturally against the metallic fuselage of an F-22 Raptor, flight suit unzipped low to show smooth, defined, sweat-lit abs and a toned chest, sleeves pushed just below the elbows, holding his tinted pilot helmet securely in one hand with his arm wrapped around it, reflective aviator sunglasses catching the warm light as he looks directly into the camera with a calm, smoldering expression. His entire body is framed in a wide shot as the sun sets directly behind him, creating a realistic lens flare across the lens and soft golden rim light around his silhouette; the F-22's matte metal surface reflects the sunset naturally, and a formation of jets passes overhead leaving clean smoke trails across the sky. The runway behind him appears slightly blurred with subtle ground crew movement, the lighting feels real and atmospheric, the skin texture and flight suit materials look authentic, and the overall image has a grounded, cinematic, professional photojournalism-meets-military-editorial vibe with absolutely no text or writing anywhere in the image."""
+        "likeness": """using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration or re-rendering of facial features""",
+        "template": """Create a hyper-realistic wide full-body photo {likeness} as a confident, sexy fighter jet pilot leaning naturally against the metallic fuselage of an F-22 Raptor, flight suit unzipped low to show smooth, defined, sweat-lit abs and a toned chest, sleeves pushed just below the elbows, holding his tinted pilot helmet securely in one hand with his arm wrapped around it, reflective aviator sunglasses catching the warm light as he looks directly into the camera with a calm, smoldering expression. His entire body is framed in a wide shot as the sun sets directly behind him, creating a realistic lens flare across the lens and soft golden rim light around his silhouette; the F-22's matte metal surface reflects the sunset naturally, and a formation of jets passes overhead leaving clean smoke trails across the sky. The runway behind him appears slightly blurred with subtle ground crew movement, the lighting feels real and atmospheric, the skin texture and flight suit materials look authentic, and the overall image has a grounded, cinematic, professional photojournalism-meets-military-editorial vibe with absolutely no text or writing anywhere in the image."""
     },
     10: {
         "month": "October",
         "title": "Werewolf at Full Moon 🌕",
         "description": "Mysterious transformation under the full moon",
-        "prompt": """Create a hyper-realistic photo using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — with no alteration or re-rendering of facial features as a rugged, muscular man standing in a fog-soaked field at night under a massive October full moon, head tilted as cold moonlight cuts across his face, his eyes glowing like a wolf's — sharp, amber, predatory, yet still captivating and beautifully hypnotic, breath curling into the freezing air. His torn jeans and open flannel whipping violently in the wind reveal a tense, sculpted torso with smooth skin, light hair growth on his arms and jawline, and subtly raised veins hinting at a transformation just beneath the surface; fog coils around his legs as he stands in a powerful, sensual, primal stance. Thick rolling mist sweeps through a broken wooden fence, bare twisted trees, and past a distant abandoned farmhouse glowing faintly, while a lone dog-like silhouette howls from a hill beneath the moon. Wind ripples through the tall grass, thin clouds drift across the moon, and dramatic rim light outlines his shoulders and chest, creating a colder, darker, spookier, yet deeply erotic cinematic energy, captured with crisp lens depth, realistic skin texture, subtle film grain, icy blue-gray tones, drifting particles in the air, and a moody fall photoshoot atmosphere with absolutely no text or writing anywhere in the image."""
+        "likeness": """using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — with no alteration or re-rendering of facial features""",
+        "template": """Create a hyper-realistic photo {likeness} as a rugged, muscular man standing in a fog-soaked field at night under a massive October full moon, head tilted as cold moonlight cuts across his face, his eyes glowing like a wolf's — sharp, amber, predatory, yet still captivating and beautifully hypnotic, breath curling into the freezing air. His torn jeans and open flannel whipping violently in the wind reveal a tense, sculpted torso with smooth skin, light hair growth on his arms and jawline, and subtly raised veins hinting at a transformation just beneath the surface; fog coils around his legs as he stands in a powerful, sensual, primal stance. Thick rolling mist sweeps through a broken wooden fence, bare twisted trees, and past a distant abandoned farmhouse glowing faintly, while a lone dog-like silhouette howls from a hill beneath the moon. Wind ripples through the tall grass, thin clouds drift across the moon, and dramatic rim light outlines his shoulders and chest, creating a colder, darker, spookier, yet deeply erotic cinematic energy, captured with crisp lens depth, realistic skin texture, subtle film grain, icy blue-gray tones, drifting particles in the air, and a moody fall photoshoot atmosphere with absolutely no text or writing anywhere in the image."""
     },
     11: {
         "month": "November",
         "title": "Fall Lumberjack 🌲",
         "description": "Rugged woodsman with flannel and axe in autumn forest",
-        "prompt": """Create a hyper-realistic wide full-body photo using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration of facial features, as an intensely sexy, rugged lumberjack in a real autumn forest at golden hour, captured in a powerful stance with one foot planted firmly on the ground and the other propped confidently on a freshly split log, holding a massive axe after a heavy swing while locking a direct, smoldering, dominant gaze into the camera. His dark distressed jeans ride low on his hips, his open unbuttoned flannel and rugged leather suspenders frame a sweat-drenched, naturally muscular chest, sharply defined abs, and a dusting of chest hair, with thick sweat running down his torso and catching the warm light. Wood chips explode through the air, fallen leaves swirl around him in motion, mist crawls low between tall glowing autumn trees, and subtle heat haze adds intensity. Behind him, softly blurred but clearly visible, are a rustic log cabin, a vintage pickup truck, and a distant mountain ridge, all lit by warm amber rays filtering through the forest. Cinematic warm tones, realistic skin texture, sharp detail, dynamic action lighting, extra headroom and full lower-body framing, and absolutely no text or writing anywhere in the image."""
+        "likeness": """using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration of facial features,""",
+        "template": """Create a hyper-realistic wide full-body photo {likeness} as an intensely sexy, rugged lumberjack in a real autumn forest at golden hour, captured in a powerful stance with one foot planted firmly on the ground and the other propped confidently on a freshly split log, holding a massive axe after a heavy swing while locking a direct, smoldering, dominant gaze into the camera. His dark distressed jeans ride low on his hips, his open unbuttoned flannel and rugged leather suspenders frame a sweat-drenched, naturally muscular chest, sharply defined abs, and a dusting of chest hair, with thick sweat running down his torso and catching the warm light. Wood chips explode through the air, fallen leaves swirl around him in motion, mist crawls low between tall glowing autumn trees, and subtle heat haze adds intensity. Behind him, softly blurred but clearly visible, are a rustic log cabin, a vintage pickup truck, and a distant mountain ridge, all lit by warm amber rays filtering through the forest. Cinematic warm tones, realistic skin texture, sharp detail, dynamic action lighting, extra headroom and full lower-body framing, and absolutely no text or writing anywhere in the image."""
     },
     12: {
         "month": "December",
         "title": "Hot Santa 🎅",
         "description": "Santa's fittest helper by the fireplace on Christmas Eve",
-        "prompt": """Create a hyper-realistic wide mid-shot photo using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, hair, and facial hair exactly as shown with zero alteration, no adding or removing a beard, and no re-rendering of facial features — as a muscular, sexy Santa Claus walking across a snowy rooftop at night toward a brick chimney, one hand reaching toward the edge as he approaches it, his red Santa coat hanging open to reveal sculpted abs and a warm chest, a huge gift sack thrown over one shoulder. He locks a direct, smoldering, magnetic gaze into the camera as he moves, lips slightly parted, jaw relaxed. A reindeer stands close in the foreground with visible breath fogging in the cold air, and more reindeer behind it are connected by glowing harnesses with part of the sleigh visible on the roof, their warm breaths rising into the night. Snow falls softly as Santa's warm body gives off subtle steam in the freezing air, golden Christmas lights glow behind him, moonlight shimmers on the flakes, and distant city lights twinkle, all captured with cinematic holiday lighting, realistic skin and fabric texture, and a sexy, high-fashion Christmas photoshoot vibe with absolutely no text or writing anywhere in the image."""
+        "likeness": """using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, hair, and facial hair exactly as shown with zero alteration, no adding or removing a beard, and no re-rendering of facial features —""",
+        "template": """Create a hyper-realistic wide mid-shot photo {likeness} as a muscular, sexy Santa Claus walking across a snowy rooftop at night toward a brick chimney, one hand reaching toward the edge as he approaches it, his red Santa coat hanging open to reveal sculpted abs and a warm chest, a huge gift sack thrown over one shoulder. He locks a direct, smoldering, magnetic gaze into the camera as he moves, lips slightly parted, jaw relaxed. A reindeer stands close in the foreground with visible breath fogging in the cold air, and more reindeer behind it are connected by glowing harnesses with part of the sleigh visible on the roof, their warm breaths rising into the night. Snow falls softly as Santa's warm body gives off subtle steam in the freezing air, golden Christmas lights glow behind him, moonlight shimmers on the flakes, and distant city lights twinkle, all captured with cinematic holiday lighting, realistic skin and fabric texture, and a sexy, high-fashion Christmas photoshoot vibe with absolutely no text or writing anywhere in the image."""
     },
 }
 
-# Bonus prompt for checkout/order success page (Hot Mailman)
-BONUS_DELIVERY_PROMPT = """Create a hyper-realistic medium-shot photo using the exact face and likeness from the attached reference — identical eyes, jawline, skin tone, and hair — no alteration, blending, or re-rendering of facial features as a sexy, fit UPS delivery driver standing on a sunny suburban front porch. The camera is positioned inside the front door looking outward, framing him naturally through the doorway as he pauses mid-delivery with a confident, smoldering look directly into the camera. He wears a fitted UPS brown uniform shirt partially unbuttoned to reveal a sculpted, defined chest and abs, sleeves rolled to show strong forearms, paired with tailored brown UPS shorts that highlight his powerful legs. One hand holds a small stack of packages and envelopes, while the other rests casually on his hip or his delivery satchel strap. Warm afternoon sunlight highlights subtle sweat along his neck and chest, giving him a realistic, hardworking glow. A brown UPS truck sits slightly out of focus behind him, surrounded by sunlit trees and a suburban street, with soft bokeh and warm tones creating a cinematic, professional male-model photoshoot vibe. Absolutely no text or writing anywhere in the image."""
+# Bonus prompt template for checkout/order success page (Hot Mailman)
+BONUS_DELIVERY_TEMPLATE = """Create a hyper-realistic medium-shot photo {likeness} as a sexy, fit UPS delivery driver standing on a sunny suburban front porch. The camera is positioned inside the front door looking outward, framing him naturally through the doorway as he pauses mid-delivery with a confident, smoldering look directly into the camera. He wears a fitted UPS brown uniform shirt partially unbuttoned to reveal a sculpted, defined chest and abs, sleeves rolled to show strong forearms, paired with tailored brown UPS shorts that highlight his powerful legs. One hand holds a small stack of packages and envelopes, while the other rests casually on his hip or his delivery satchel strap. Warm afternoon sunlight highlights subtle sweat along his neck and chest, giving him a realistic, hardworking glow. A brown UPS truck sits slightly out of focus behind him, surrounded by sunlit trees and a suburban street, with soft bokeh and warm tones creating a cinematic, professional male-model photoshoot vibe. Absolutely no text or writing anywhere in the image."""
+
+
+def compose_prompt(template, likeness=None, compact=False):
+    """Fill a prompt template's {likeness} slot with the shared (or overridden) clause
+
+    Plain substitution, not str.format - prompt text may contain literal braces
+    """
+    if compact:
+        return template.replace('{likeness}', COMPACT_LIKENESS_CLAUSE)
+    return template.replace('{likeness}', likeness or LIKENESS_CLAUSE)
+
+
+# Precompute final prompts once per process (templates never change at runtime)
+for _theme in MONTHLY_THEMES.values():
+    _theme['prompt'] = compose_prompt(_theme['template'], _theme.get('likeness'))
+    _theme['compact_prompt'] = compose_prompt(_theme['template'], compact=True)
+
+BONUS_DELIVERY_PROMPT = compose_prompt(BONUS_DELIVERY_TEMPLATE)
+BONUS_DELIVERY_COMPACT_PROMPT = compose_prompt(BONUS_DELIVERY_TEMPLATE, compact=True)
 
 
 # Helper functions for accessing themes
@@ -98,9 +133,12 @@ def get_theme(month_number):
     """Get theme for a specific month (0-12)"""
     return MONTHLY_THEMES.get(month_number)
 
-def get_enhanced_prompt(month_number):
-    """Get the enhanced prompt for a specific month"""
+def get_enhanced_prompt(month_number, compact=False):
+    """Get the enhanced prompt for a specific month
+
+    compact: Return the short-likeness variant (for use with the face-swap system instruction)
+    """
     theme = get_theme(month_number)
     if theme:
-        return theme.get('prompt', '')
+        return theme.get('compact_prompt' if compact else 'prompt', '')
     return ''
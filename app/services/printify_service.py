@@ -112,6 +112,10 @@ def upload_image(image_data_bytes, filename="month.jpg"):
     Returns:
         dict: Upload data with 'id' and 'file_name'
     """
+    if image_data_bytes is None:
+        # Session payloads read back as None when their image file is missing
+        raise ValueError(f"Image data for {filename} is missing")
+
     # Convert image bytes to base64
     image_b64 = base64.b64encode(image_data_bytes).decode('utf-8')
 
@@ -516,8 +520,9 @@ def create_product_for_preview(month_image_data, product_type='wall_calendar'):
     so users can see realistic calendar preview before purchasing.
 
     Args:
-        month_image_data: Dict mapping month numbers (0-12) to binary image data
+        month_image_data: Dict mapping month numbers (0-12) to print-ready image data
                          {0: bytes (cover), 1: bytes, 2: bytes, ..., 12: bytes}
+                         (padded/watermarked print derivatives - see image_derivatives)
         product_type: 'wall_calendar'
 
     Returns:
@@ -536,7 +541,7 @@ def create_product_for_preview(month_image_data, product_type='wall_calendar'):
     print(f"{'='*70}\n")
 
     try:
-        # Step 1: Upload cover and all 12 month images with padding
+        # Step 1: Upload cover and all 12 month images (already padded for print)
         print("📤 STEP 1: Uploading padded images to Printify...")
         month_image_ids = {}
         month_names = ["january", "february", "march", "april", "may", "june",
@@ -545,16 +550,7 @@ def create_product_for_preview(month_image_data, product_type='wall_calendar'):
         # Upload cover image (month 0)
         if 0 in month_image_data:
             print("  📸 Uploading front cover image...")
-            from app.services.image_padding_service import add_safe_padding
-            # Skip watermark for wall calendar cover only (cover IS the logo)
-            # Desktop calendar covers still get watermark
-            skip_logo = (product_type == 'wall_calendar')
-            padded_cover = add_safe_padding(
-                month_image_data[0],
-                use_face_detection=False,
-                skip_watermark=skip_logo
-            )
-            upload_data = upload_image(padded_cover, "cover_preview.jpg")
+            upload_data = upload_image(month_image_data[0], "cover_preview.jpg")
             month_image_ids["cover"] = upload_data['id']
             print(f"  ✅ Front cover image uploaded")
             time.sleep(0.1)
@@ -570,14 +566,7 @@ def create_product_for_preview(month_image_data, product_type='wall_calendar'):
             month_name = month_names[month_num - 1]
             filename = f"{month_name}_preview.jpg"
 
-            # Apply padding for print safety
-            from app.services.image_padding_service import add_safe_padding
-            padded_image = add_safe_padding(
-                month_image_data[month_num],
-                use_face_detection=False
-            )
-
-            upload_data = upload_image(padded_image, filename)
+            upload_data = upload_image(month_image_data[month_num], filename)
             month_image_ids[month_name] = upload_data['id']
 
             # Small delay to avoid rate limiting
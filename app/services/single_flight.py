@@ -0,0 +1,159 @@
+"""
+Single-flight deduplication for month generations
+Concurrent duplicates of the same generation (double-clicks, page refreshes,
+frontend retries - possibly in other gunicorn workers) wait for the first
+call and share its result instead of paying Gemini again.
+
+The leader holds an flock on the flight's lock file while it works (released
+by the OS if the worker dies) and publishes a small JSON result when done.
+"""
+import os
+import time
+import json
+import fcntl
+import hashlib
+from app.storage_paths import DATA_ROOT
+
+# Flight state directory (shared by all workers on the machine)
+FLIGHTS_DIR = DATA_ROOT / 'single_flight'
+FLIGHTS_DIR.mkdir(exist_ok=True, parents=True)
+
+# Followers give up before gunicorn's 300s worker timeout
+WAIT_TIMEOUT_SECONDS = int(os.getenv('SINGLE_FLIGHT_WAIT', 280))
+
+POLL_INTERVAL = 0.25
+
+
+class SingleFlightTimeout(Exception):
+    """Raised when a duplicate request waits longer than WAIT_TIMEOUT_SECONDS"""
+    pass
+
+
+def make_key(session_id, project_id, month_num, intent):
+    """
+    Flight key for one logical generation
+
+    Args:
+        intent: What the caller wants, e.g. 'generate' or 'regenerate:1'
+                (regenerations include the retry number, so duplicate clicks
+                share a variant but a deliberate second retry doesn't)
+    """
+    raw = f'{session_id}|{project_id}|{month_num}|{intent}'
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _lock_path(key):
+    return FLIGHTS_DIR / f'{key}.lock'
+
+
+def _result_path(key):
+    return FLIGHTS_DIR / f'{key}.json'
+
+
+class Flight:
+    """A flight this process leads; call finish() with the result (or abandon())"""
+
+    def __init__(self, key, fd):
+        self.key = key
+        self._fd = fd
+        self.started_at = time.time()
+
+    def finish(self, result):
+        """Publish a JSON-serializable result to waiting duplicates and release the flight"""
+        try:
+            path = _result_path(self.key)
+            tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'started_at': self.started_at,
+                    'finished_at': time.time(),
+                    'result': result
+                }, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"  ⚠️  Failed to publish single-flight result: {e}")
+        finally:
+            self.abandon()
+
+    def abandon(self):
+        """Release the flight without a result (duplicates will retry themselves)"""
+        if self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+def try_lead(key):
+    """
+    Claim a flight without waiting
+
+    Returns:
+        Flight if this caller is now the leader, None if another request holds it
+    """
+    fd = os.open(_lock_path(key), os.O_CREAT | os.O_RDWR, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return Flight(key, fd)
+
+
+def _read_result(key):
+    try:
+        with open(_result_path(key)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def do(key, fn, wait_timeout=WAIT_TIMEOUT_SECONDS):
+    """
+    Run fn() once per flight key across all workers
+
+    The first caller runs fn(); callers arriving while it runs wait and get
+    the same result. A caller arriving after the flight finished runs fn()
+    again (fn is expected to notice completed work itself).
+
+    Args:
+        fn: Callable returning a JSON-serializable result
+            (exceptions are not shared - duplicates retry as leaders)
+
+    Raises:
+        SingleFlightTimeout: The leader didn't finish within wait_timeout
+    """
+    joined_at = time.time()
+
+    while True:
+        flight = try_lead(key)
+        if flight is not None:
+            try:
+                result = fn()
+            except BaseException:
+                flight.abandon()
+                raise
+            flight.finish(result)
+            return result
+
+        print("  🛬 Duplicate generation request - waiting for the in-flight one")
+        while True:
+            time.sleep(POLL_INTERVAL)
+
+            # Leader publishes before releasing, so check the lock first, then the result
+            probe = try_lead(key)
+            if probe is not None:
+                probe.abandon()
+
+            record = _read_result(key)
+            if record and record['finished_at'] >= joined_at:
+                print("  🤝 Shared result from in-flight generation")
+                return record['result']
+
+            if probe is not None:
+                break  # Leader gone without publishing (failed or worker died) - try to lead
+
+            if time.time() - joined_at > wait_timeout:
+                raise SingleFlightTimeout("Generation is still in progress - please check back shortly")
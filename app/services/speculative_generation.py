@@ -0,0 +1,179 @@
+"""
+Speculative pre-generation of the remaining months
+Starts generating April-December in the background while the user is on the
+payment gate, so most of the calendar is already in the generation cache by
+the time the payment method is authorized
+"""
+import os
+import socket
+import threading
+from datetime import datetime
+from app import session_storage
+from app.services import generation_cache, generation_scheduler
+
+# Months generated speculatively (cover is a static asset - nothing to pre-generate)
+SPECULATIVE_MONTHS = [4, 5, 6, 7, 8, 9, 10, 11, 12]
+
+# Max sessions pre-generating at once in this worker
+# (each Gemini call also waits at background priority in the generation scheduler)
+SPECULATIVE_MAX_SESSIONS = int(os.getenv('SPECULATIVE_MAX_SESSIONS', 2))
+
+SPECULATIVE_ENABLED = os.getenv('SPECULATIVE_GENERATION_ENABLED', 'true').lower() == 'true'
+
+# A 'running' state older than this is treated as dead (9 months at background priority
+# fit comfortably; a live run never gets near it)
+SPECULATIVE_MAX_RUN_SECONDS = int(os.getenv('SPECULATIVE_MAX_RUN_SECONDS', 3600))
+
+_HOST = socket.gethostname()
+
+_capacity = threading.BoundedSemaphore(SPECULATIVE_MAX_SESSIONS)
+
+
+def _is_expired(project):
+    """True if the project's free preview window has passed"""
+    expiry_str = project.get('preview_expiry')
+    if not expiry_str:
+        return False
+    return datetime.utcnow() > datetime.fromisoformat(expiry_str)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def _is_stale(state):
+    """True if a 'running' state's worker is gone or it has run longer than any run could"""
+    started_at = state.get('started_at')
+    if not started_at:
+        return True
+    age = (datetime.utcnow() - datetime.fromisoformat(started_at)).total_seconds()
+    if age > SPECULATIVE_MAX_RUN_SECONDS:
+        return True
+    pid = state.get('pid')
+    return pid is not None and state.get('host') == _HOST and not _pid_alive(pid)
+
+
+def _is_running(state):
+    """True if a speculative run recorded in state is still live"""
+    return bool(state) and state.get('status') == 'running' and not _is_stale(state)
+
+
+def start(session_id, project_id):
+    """
+    Start speculative generation for a project if it isn't already running
+
+    Args:
+        session_id: Internal storage session ID
+        project_id: Project whose remaining months should be pre-generated
+
+    Returns:
+        bool: True if a background run was started
+    """
+    if not SPECULATIVE_ENABLED:
+        return False
+
+    project = session_storage.get_project_by_session_id(session_id, project_id)
+    if not project or _is_expired(project):
+        return False
+
+    state = project.get('speculative_generation')
+    if state and (state.get('status') == 'completed' or _is_running(state)):
+        return False
+    if state and state.get('status') == 'running':
+        print(f"🪦 [Speculative] Previous run for project {project_id} died - restarting")
+
+    # Throttle: skip (don't queue) when this worker is already at capacity
+    if not _capacity.acquire(blocking=False):
+        print(f"⏸️  [Speculative] At capacity ({SPECULATIVE_MAX_SESSIONS} sessions) - skipping {project_id}")
+        return False
+
+    session_storage.save_speculative_generation_by_session_id(session_id, project_id, {
+        'status': 'running',
+        'months': {},
+        'host': _HOST,
+        'pid': os.getpid(),
+        'started_at': datetime.utcnow().isoformat()
+    })
+
+    thread = threading.Thread(target=_run, args=(session_id, project_id), daemon=True)
+    thread.start()
+    print(f"🔮 [Speculative] Started pre-generation for project {project_id}")
+    return True
+
+
+def _run(session_id, project_id):
+    """Background worker: generate each remaining month into the generation cache"""
+    from app.services.gemini_service import generate_calendar_image, generation_cache_key, COMPACT_PROMPTS
+    from app.services.monthly_themes import get_enhanced_prompt
+
+    cache_keys = {}
+    status = 'completed'
+
+    try:
+        uploaded_images = session_storage.get_uploaded_images_by_session_id(session_id, project_id=project_id)
+        reference_image_data = [img['file_data'] for img in uploaded_images]
+        if not reference_image_data:
+            status = 'discarded'
+            return
+
+        for month_num in SPECULATIVE_MONTHS:
+            project = session_storage.get_project_by_session_id(session_id, project_id)
+            if not project or _is_expired(project):
+                print(f"⌛ [Speculative] Preview expired for project {project_id} - discarding results")
+                discard(cache_keys)
+                cache_keys = {}
+                status = 'discarded'
+                return
+
+            # Same prompt and references generate_month will use → identical cache key
+            prompt = get_enhanced_prompt(month_num, compact=COMPACT_PROMPTS)
+            try:
+                generate_calendar_image(
+                    prompt, reference_image_data,
+                    priority=generation_scheduler.PRIORITY_BACKGROUND,
+                    session_id=session_id
+                )
+                cache_keys[month_num] = generation_cache_key(prompt, reference_image_data)
+                print(f"🔮 [Speculative] Month {month_num} ready for project {project_id}")
+            except Exception as e:
+                print(f"⚠️  [Speculative] Month {month_num} failed (non-critical): {e}")
+
+    except Exception as e:
+        print(f"⚠️  [Speculative] Pre-generation failed (non-critical): {e}")
+        status = 'failed'
+
+    finally:
+        _capacity.release()
+        session_storage.save_speculative_generation_by_session_id(session_id, project_id, {
+            'status': status,
+            'months': cache_keys,
+            'finished_at': datetime.utcnow().isoformat()
+        })
+
+
+def discard(cache_keys):
+    """Remove speculatively generated results from the generation cache"""
+    for key in cache_keys.values():
+        generation_cache.delete(key)
+
+
+def discard_for_project(session_id, project_id):
+    """Discard a project's speculative results (e.g. preview expired without payment)"""
+    project = session_storage.get_project_by_session_id(session_id, project_id)
+    if not project:
+        return
+    state = project.get('speculative_generation')
+    if not state or state.get('status') == 'discarded':
+        return
+    discard(state.get('months', {}))
+    session_storage.save_speculative_generation_by_session_id(session_id, project_id, {
+        'status': 'discarded',
+        'months': {},
+        'finished_at': datetime.utcnow().isoformat()
+    })
@@ -0,0 +1,83 @@
+"""
+Reduced-resolution decoding for uploaded photos
+iPhone photos are 12-48 MP; decoding one at full size just to downscale it
+to 2560px costs 36-150 MB of RGB pixels per photo. The decoder is asked for
+the smallest resolution that still covers the target instead:
+
+- JPEG: DCT-domain scaling (Image.draft) decodes at 1/2, 1/4 or 1/8 size
+- HEIC: pillow-heif's draft() decodes an embedded thumbnail when one is
+  large enough (libheif has no scaled decode of the main image)
+
+Other formats (PNG, ...) are decoded at full size as before. Rotation,
+RGB conversion and the final resize all run on the reduced image.
+"""
+import io
+from PIL import Image, ImageOps
+
+# Longest edge (px) of stored reference photos - high quality for AI face analysis
+# (Gemini limit: 20MB total, ~6MB per image with 3 references)
+UPLOAD_MAX_DIMENSION = 2560
+
+THUMBNAIL_SIZE = (200, 200)
+
+
+def _fit(size, max_dimension):
+    """size scaled down so its longest edge is max_dimension (unchanged if already smaller)"""
+    width, height = size
+    ratio = min(max_dimension / max(width, height), 1)
+    return max(1, round(width * ratio)), max(1, round(height * ratio))
+
+
+def decode_scaled(data, max_dimension):
+    """
+    Decode an image at no more than max_dimension px on its longest edge
+
+    Args:
+        data: Encoded image bytes (JPEG, PNG, HEIC, ...)
+        max_dimension: Longest edge of the result
+
+    Returns:
+        PIL.Image: Upright (EXIF orientation applied) RGB image
+    """
+    img = Image.open(io.BytesIO(data))
+
+    # Only reads the header; the decoder picks the smallest scale still >= the target
+    img.draft('RGB', _fit(img.size, max_dimension))
+
+    # Convert to RGB if necessary (handles RGBA, grayscale, etc.)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    if max(img.size) > max_dimension:
+        # reducing_gap: cheap box reduction down to 2x the target, LANCZOS for the rest
+        img = img.resize(_fit(img.size, max_dimension), Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    # Auto-rotate based on EXIF orientation (iPhone photos) - after resizing, so
+    # the rotated copy is target-sized (the EXIF block is carried along in img.info)
+    img = ImageOps.exif_transpose(img)
+    return img
+
+
+def prepare_upload(data):
+    """
+    Stored reference photo and preview thumbnail for an uploaded image
+
+    Args:
+        data: Uploaded file bytes
+
+    Returns:
+        tuple: (JPEG bytes at most UPLOAD_MAX_DIMENSION px, 200px JPEG thumbnail bytes)
+    """
+    img = decode_scaled(data, UPLOAD_MAX_DIMENSION)
+
+    # Save with maximum quality (strips EXIF for privacy)
+    # Quality 95: Near-lossless, optimal for AI reference images
+    optimized_io = io.BytesIO()
+    img.save(optimized_io, format='JPEG', quality=95, optimize=True)
+
+    # Thumbnail from the already reduced image, never the original
+    img.thumbnail(THUMBNAIL_SIZE, reducing_gap=2.0)
+    thumb_io = io.BytesIO()
+    img.save(thumb_io, format='JPEG', quality=85)
+
+    return optimized_io.getvalue(), thumb_io.getvalue()
@@ -0,0 +1,203 @@
+"""
+Compact index of stored sessions
+One SQLite row per session file (size, mtime, last access, stage, ...),
+updated on every session write, so listing, janitor sweeps and statistics
+are queries instead of a stat() or unpickle of every file in STORAGE_DIR.
+
+The session files stay the source of truth: index updates never fail a
+save, and a lost or stale index is rebuilt from disk with
+    python -m app.session_index --rebuild
+"""
+import os
+import sys
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from app.storage_paths import SESSION_STORAGE_DIR
+
+INDEX_PATH = SESSION_STORAGE_DIR / 'index.sqlite3'
+INDEX_PATH.parent.mkdir(exist_ok=True, parents=True)
+
+# Reads only update last_access this often per session per worker
+TOUCH_INTERVAL_SECONDS = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    last_access REAL NOT NULL,
+    stage TEXT,
+    paid INTEGER NOT NULL DEFAULT 0,
+    cart_items INTEGER NOT NULL DEFAULT 0,
+    preview_expiry REAL,
+    schema_version INTEGER
+);
+CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access);
+"""
+
+# Per-thread connections (reopened after fork - gunicorn's master opens one at startup)
+_local = threading.local()
+
+# Key: session_id, Value: time this worker last recorded an access (oldest first;
+# entries past TOUCH_INTERVAL_SECONDS no longer throttle anything and are dropped)
+_touched = OrderedDict()
+_touched_lock = threading.Lock()
+
+
+def _connect():
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.pid == os.getpid():
+        return conn
+    conn = sqlite3.connect(INDEX_PATH, timeout=10, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(_SCHEMA)
+    _local.conn, _local.pid = conn, os.getpid()
+    return conn
+
+
+def summarize(data):
+    """
+    Index fields derived from a session's contents
+
+    Returns:
+        dict: {'stage', 'paid', 'cart_items', 'preview_expiry', 'schema_version'}
+    """
+    projects = data.get('projects', [])
+    active = next((p for p in projects if p.get('id') == data.get('active_project_id')), None)
+    if active is None and projects:
+        active = projects[0]
+
+    expiries = [datetime.fromisoformat(p['preview_expiry']).replace(tzinfo=timezone.utc).timestamp()
+                for p in projects if p.get('preview_expiry')]
+    return {
+        'stage': 'ordered' if data.get('order') else (active.get('generation_stage') if active else None),
+        'paid': bool(data.get('order')) or any(p.get('payment_method_id') for p in projects),
+        'cart_items': len(data.get('cart') or []),
+        'preview_expiry': max(expiries) if expiries else None,
+        'schema_version': data.get('schema_version')
+    }
+
+
+def record(session_id, size, mtime, summary):
+    """Insert or update a session's row after its file was written"""
+    try:
+        _connect().execute(
+            """
+            INSERT INTO sessions (session_id, size, mtime, last_access, stage, paid,
+                                  cart_items, preview_expiry, schema_version)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (session_id) DO UPDATE SET
+                size = excluded.size,
+                mtime = excluded.mtime,
+                last_access = max(last_access, excluded.mtime),
+                stage = excluded.stage,
+                paid = excluded.paid,
+                cart_items = excluded.cart_items,
+                preview_expiry = excluded.preview_expiry,
+                schema_version = excluded.schema_version
+            """,
+            (session_id, size, mtime, mtime, summary['stage'], int(summary['paid']),
+             summary['cart_items'], summary['preview_expiry'], summary['schema_version'])
+        )
+    except Exception as e:
+        print(f"Warning: Failed to index session {session_id}: {e}")
+
+
+def touch(session_id):
+    """Record a read of a session (throttled to once per TOUCH_INTERVAL_SECONDS per worker)"""
+    now = time.time()
+    with _touched_lock:
+        if now - _touched.get(session_id, 0) < TOUCH_INTERVAL_SECONDS:
+            return
+        _touched[session_id] = now
+        _touched.move_to_end(session_id)
+        while now - next(iter(_touched.values())) >= TOUCH_INTERVAL_SECONDS:
+            _touched.popitem(last=False)
+    try:
+        _connect().execute('UPDATE sessions SET last_access = max(last_access, ?) WHERE session_id = ?',
+                           (now, session_id))
+    except Exception as e:
+        print(f"Warning: Failed to record access to session {session_id}: {e}")
+
+
+def remove(session_id):
+    """Drop a deleted session's row"""
+    with _touched_lock:
+        _touched.pop(session_id, None)
+    try:
+        _connect().execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+    except Exception as e:
+        print(f"Warning: Failed to unindex session {session_id}: {e}")
+
+
+def clear():
+    """Drop every row (before a full rebuild from disk)"""
+    with _touched_lock:
+        _touched.clear()
+    _connect().execute('DELETE FROM sessions')
+
+
+def is_empty():
+    """True if nothing has been indexed yet (first start with an index, or it was lost)"""
+    return _connect().execute('SELECT 1 FROM sessions LIMIT 1').fetchone() is None
+
+
+def outdated(schema_version):
+    """Session ids indexed at an older (or unknown) schema version"""
+    rows = _connect().execute(
+        'SELECT session_id FROM sessions WHERE schema_version IS NULL OR schema_version < ?',
+        (schema_version,)
+    )
+    return [row[0] for row in rows]
+
+
+def removal_candidates(expired_before, abandoned_before, now, limit):
+    """
+    Sessions the janitor may remove, least recently used first
+
+    Args:
+        expired_before: Sessions last used before this time are expired
+        abandoned_before: Unpaid sessions with an empty cart whose previews all
+                          expired before now are abandoned if last used before this time
+        now: Current time.time()
+        limit: Maximum rows
+
+    Returns:
+        list: (session_id, mtime, last_access) tuples
+    """
+    rows = _connect().execute(
+        """
+        SELECT session_id, mtime, last_access FROM sessions
+        WHERE last_access < ?
+           OR (last_access < ? AND paid = 0 AND cart_items = 0
+               AND preview_expiry IS NOT NULL AND preview_expiry < ?)
+        ORDER BY last_access
+        LIMIT ?
+        """,
+        (expired_before, abandoned_before, now, limit)
+    )
+    return rows.fetchall()
+
+
+def stats():
+    """
+    Session counts and bytes on disk (session files only, not image files)
+
+    Returns:
+        dict: {'sessions', 'bytes', 'by_stage': {stage: count}}
+    """
+    conn = _connect()
+    count, total = conn.execute('SELECT count(*), coalesce(sum(size), 0) FROM sessions').fetchone()
+    by_stage = dict(conn.execute('SELECT coalesce(stage, ?), count(*) FROM sessions GROUP BY stage', ('unknown',)))
+    return {'sessions': count, 'bytes': total, 'by_stage': by_stage}
+
+
+if __name__ == '__main__':
+    if '--rebuild' in sys.argv:
+        from app.session_migrations import run_migrations
+        run_migrations(full_scan=True)
+    print(stats())
@@ -0,0 +1,227 @@
+"""
+Background janitor for expired and abandoned sessions
+The session cookie expires after PERMANENT_SESSION_LIFETIME, but its
+STORAGE_DIR/*.pkl file (with every image in it) used to stay on the volume
+and in every worker's memory forever. The janitor periodically removes:
+
+- sessions idle longer than SESSION_TTL_SECONDS
+- free previews abandoned before payment (preview_expiry passed, nothing paid)
+- orphaned image files, lock files and single-flight results
+  (shared images such as the cover are never orphans)
+
+Sessions with a saved payment method or an order are archived (gzip copy in
+STORAGE_DIR/archive) instead of deleted. Work is rate limited per sweep.
+Candidates come from the session index, so live sessions are never read.
+
+Run offline with:  python -m app.session_janitor [--dry-run]
+"""
+import os
+import sys
+import time
+import fcntl
+import pickle
+import threading
+from datetime import datetime
+from app import session_migrations, session_index
+
+# Idle time after which a session is expired (matches the cookie lifetime by default)
+SESSION_TTL_SECONDS = int(os.getenv('JANITOR_SESSION_TTL', os.getenv('PERMANENT_SESSION_LIFETIME', 86400)))
+
+# Abandoned previews are only removed once the session has also been idle this long
+ABANDONED_MIN_IDLE_SECONDS = int(os.getenv('JANITOR_ABANDONED_MIN_IDLE', 6 * 3600))
+
+# Orphaned lock/single-flight files older than this are removed
+ORPHAN_MIN_AGE_SECONDS = 24 * 3600
+
+# Rate limiting: sessions removed per sweep, and a pause between removals
+MAX_PER_SWEEP = int(os.getenv('JANITOR_MAX_PER_SWEEP', 200))
+PAUSE_SECONDS = float(os.getenv('JANITOR_PAUSE_SECONDS', 0.1))
+
+INTERVAL_SECONDS = int(os.getenv('JANITOR_INTERVAL', 900))
+JANITOR_ENABLED = os.getenv('SESSION_JANITOR_ENABLED', 'true').lower() == 'true'
+
+_janitor_thread = None
+
+
+def _has_payment(data):
+    """Session has anything money-related worth keeping (order, saved payment method)"""
+    if data.get('order'):
+        return True
+    return any(project.get('payment_method_id') for project in data.get('projects', []))
+
+
+def _preview_abandoned(data, now):
+    """Every free preview in the session expired without payment and nothing is in the cart"""
+    if data.get('cart'):
+        return False
+    expiries = [project.get('preview_expiry') for project in data.get('projects', [])]
+    expiries = [expiry for expiry in expiries if expiry]
+    if not expiries:
+        return False
+    return all(datetime.fromisoformat(expiry) < now for expiry in expiries)
+
+
+def _load(session_file):
+    with open(session_file, 'rb') as f:
+        data, _ = session_migrations.upgrade(pickle.load(f))
+    return data
+
+
+def _discard_speculative(data):
+    """Drop a session's speculative pre-generations from the generation cache"""
+    from app.services import speculative_generation
+
+    discarded = 0
+    for project in data.get('projects', []):
+        state = project.get('speculative_generation')
+        if state and state.get('status') != 'discarded':
+            speculative_generation.discard(state.get('months', {}))
+            discarded += len(state.get('months', {}))
+    return discarded
+
+
+def _purge_orphans(stats, now):
+    """Remove image files, lock files and single-flight results nothing refers to"""
+    import shutil
+    from app.session_storage import IMAGES_DIR, SHARED_IMAGES_DIR, LOCKS_DIR, session_path
+    from app.services.single_flight import FLIGHTS_DIR
+
+    for session_dir in IMAGES_DIR.glob('*/*/*'):
+        if SHARED_IMAGES_DIR in session_dir.parents:
+            continue  # Shared images (and their derived/ cache) belong to every session
+        if not session_path(session_dir.name).exists():
+            stats['reclaimed_bytes'] += sum(path.stat().st_size for path in session_dir.iterdir())
+            shutil.rmtree(session_dir, ignore_errors=True)
+            stats['orphans_removed'] += 1
+
+    for lock_file in LOCKS_DIR.glob('*/*/*.lock'):
+        if now - lock_file.stat().st_mtime > ORPHAN_MIN_AGE_SECONDS \
+                and not session_path(lock_file.stem).exists():
+            lock_file.unlink(missing_ok=True)
+            stats['orphans_removed'] += 1
+
+    for flight_file in FLIGHTS_DIR.iterdir():
+        if now - flight_file.stat().st_mtime > ORPHAN_MIN_AGE_SECONDS:
+            flight_file.unlink(missing_ok=True)
+            stats['orphans_removed'] += 1
+
+
+def sweep(dry_run=False, max_sessions=MAX_PER_SWEEP):
+    """
+    Remove expired/abandoned sessions, oldest first, at most max_sessions per call
+
+    Only one worker sweeps at a time (flock on STORAGE_DIR/janitor.lock); others skip.
+
+    Args:
+        dry_run: Only report what would be removed
+
+    Returns:
+        dict: {'scanned', 'deleted', 'archived', 'reclaimed_bytes',
+               'speculative_discarded', 'orphans_removed'}
+    """
+    from app import session_storage
+
+    storage_dir = session_storage.STORAGE_DIR
+    stats = {'scanned': 0, 'deleted': 0, 'archived': 0, 'reclaimed_bytes': 0,
+             'speculative_discarded': 0, 'orphans_removed': 0}
+
+    fd = os.open(storage_dir / 'janitor.lock', os.O_CREAT | os.O_RDWR, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return stats
+
+        now = time.time()
+        utc_now = datetime.utcnow()
+
+        # Least recently used first, straight from the index
+        candidates = session_index.removal_candidates(
+            expired_before=now - SESSION_TTL_SECONDS,
+            abandoned_before=now - ABANDONED_MIN_IDLE_SECONDS,
+            now=now,
+            limit=max_sessions
+        )
+
+        for session_id, mtime, last_access in candidates:
+            session_file = session_storage.session_path(session_id)
+            stats['scanned'] += 1
+
+            try:
+                stat = session_file.stat()
+                data = _load(session_file)
+            except FileNotFoundError:
+                session_index.remove(session_id)  # Deleted without updating the index
+                continue
+            except Exception as e:
+                print(f"⚠️  [Janitor] Skipping unreadable session {session_file.name}: {e}")
+                continue
+
+            # Re-check against the file itself in case the index row is stale
+            expired = now - last_access >= SESSION_TTL_SECONDS
+            if abs(stat.st_mtime - mtime) > 0.001 or not (expired or (not _has_payment(data)
+                                                                      and _preview_abandoned(data, utc_now))):
+                session_index.record(session_id, stat.st_size, stat.st_mtime, session_index.summarize(data))
+                continue
+
+            archive = _has_payment(data)
+            size = stat.st_size
+            if dry_run:
+                stats['archived' if archive else 'deleted'] += 1
+                stats['reclaimed_bytes'] += size
+                continue
+
+            reclaimed = session_storage.delete_session_by_session_id(
+                session_id,
+                archive_dir=storage_dir / 'archive' if archive else None,
+                idle_since=stat.st_mtime
+            )
+            if reclaimed is None:
+                continue
+            stats['speculative_discarded'] += _discard_speculative(data)
+            stats['archived' if archive else 'deleted'] += 1
+            stats['reclaimed_bytes'] += reclaimed
+            del data
+            time.sleep(PAUSE_SECONDS)
+
+        if not dry_run:
+            _purge_orphans(stats, now)
+
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    if stats['deleted'] or stats['archived'] or stats['orphans_removed']:
+        print(f"🧹 [Janitor] {'Would remove' if dry_run else 'Removed'} {stats['deleted']} sessions, "
+              f"archived {stats['archived']}, {stats['orphans_removed']} orphaned files - "
+              f"{stats['reclaimed_bytes'] / 1024 / 1024:.1f} MB reclaimed "
+              f"({stats['speculative_discarded']} speculative cache entries discarded)")
+    return stats
+
+
+def _janitor_loop():
+    from app import session_storage
+
+    while True:
+        time.sleep(INTERVAL_SECONDS)
+        try:
+            sweep()
+            # Every worker drops sessions removed by whichever worker swept
+            evicted = session_storage.evict_deleted_sessions()
+            if evicted:
+                print(f"🧹 [Janitor] Evicted {evicted} removed sessions from worker {os.getpid()} memory")
+        except Exception as e:
+            print(f"⚠️  [Janitor] Sweep failed (non-critical): {e}")
+
+
+def start_janitor():
+    """Start the background janitor thread in this worker (safe to call more than once)"""
+    global _janitor_thread
+    if not JANITOR_ENABLED or (_janitor_thread is not None and _janitor_thread.is_alive()):
+        return
+    _janitor_thread = threading.Thread(target=_janitor_loop, daemon=True)
+    _janitor_thread.start()
+
+
+if __name__ == '__main__':
+    print(sweep(dry_run='--dry-run' in sys.argv, max_sessions=sys.maxsize))
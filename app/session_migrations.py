@@ -0,0 +1,237 @@
+"""
+Versioned schema migrations for pickled session files
+Upgrades every stored session to SCHEMA_VERSION once (at server startup or
+offline), so the session_storage read paths never have to check for or
+rewrite old formats.
+
+Run offline with:  python -m app.session_migrations
+"""
+import os
+import pickle
+import shutil
+import secrets
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from app.session_records import Session
+
+# Version history:
+#   0 - single-project dict ({'project': ..., 'images': ..., 'months': ...})
+#   1 - multi-project dicts ({'projects': [...], 'active_project_id', 'cart'})
+#   2 - 3-month preview fields on every project (generation_stage, preview_expiry, ...)
+#   3 - typed slot records (app.session_records.Session)
+#   4 - image payloads stored as files, referenced by Blob (written by migrate_session_file
+#       and session_storage on save; nothing to change in memory)
+#   5 - no cold tier: variants tiered out to gzip files are moved into image files
+#       (same as v4 - done when the session is written, which needs its id)
+#   6 - every session has at least one project (read paths no longer create one)
+SCHEMA_VERSION = 6
+
+MIGRATION_WORKERS = int(os.getenv('SESSION_MIGRATION_WORKERS', os.cpu_count() or 2))
+
+
+def schema_version(data):
+    """Schema version of a loaded session (records and dicts)"""
+    if isinstance(data, Session):
+        return data.get('schema_version', SCHEMA_VERSION)
+    if 'schema_version' in data:
+        return data['schema_version']
+    if 'project' in data and 'projects' not in data:
+        return 0
+    if all('generation_stage' in project for project in data.get('projects', [])):
+        return 2
+    return 1
+
+
+def _upgrade_to_v1(data):
+    """Convert old single-project format to multi-project format"""
+    old_project = data['project']
+    project_id = secrets.token_urlsafe(16)
+    return {
+        'projects': [
+            {
+                'id': project_id,
+                'status': old_project.get('status', 'new'),
+                'created_at': old_project.get('created_at', datetime.utcnow().isoformat()),
+                'images': data.get('images', []),
+                'months': data.get('months', []),
+                'preferences': data.get('preferences')
+            }
+        ],
+        'active_project_id': project_id,
+        'cart': [],
+        # Preserve order info and mockups if they exist
+        'order': data.get('order'),
+        'preview_mockups': data.get('preview_mockups', {}),
+        'preview_mockup': data.get('preview_mockup')
+    }
+
+
+def _upgrade_to_v2(data):
+    """Add 3-month preview system fields to projects created before it existed"""
+    for project in data.get('projects', []):
+        if 'generation_stage' in project:
+            continue
+        project['preview_expiry'] = None
+        project['payment_method_id'] = None
+        project['setup_intent_id'] = None
+        # Determine stage based on existing data
+        months = project.get('months', [])
+        if not months:
+            project['generation_stage'] = 'not_started'
+        elif len(months) == 3 and all(m.get('generation_status') == 'completed' for m in months):
+            # 3 preview months complete → show payment gate
+            project['generation_stage'] = 'preview_only'
+        elif len(months) == 13 and all(m.get('generation_status') == 'completed' for m in months):
+            # All 13 months complete → show product selection
+            project['generation_stage'] = 'fully_generated'
+        else:
+            # Generation in progress
+            project['generation_stage'] = 'generating_full' if len(months) > 3 else 'preview_only'
+        project['generation_progress'] = 0
+    return data
+
+
+def _upgrade_to_v3(data):
+    """Convert nested dicts to typed records"""
+    return Session.from_dict(data)
+
+
+def _upgrade_to_v4(data):
+    """Payloads are moved to files when the session is next written (needs the session id)"""
+    return data
+
+
+def _upgrade_to_v5(data):
+    """Cold variants are moved to image files when the session is next written (needs the session id)"""
+    return data
+
+
+def _upgrade_to_v6(data):
+    """Give sessions left without projects an initial one, as new sessions get"""
+    if not data['projects']:
+        project_id = secrets.token_urlsafe(16)
+        data.add_project({
+            'id': project_id,
+            'status': 'new',
+            'created_at': datetime.utcnow().isoformat(),
+            'images': [],
+            'months': [],
+            'preferences': None,
+            'preview_expiry': None,
+            'payment_method_id': None,
+            'setup_intent_id': None,
+            'generation_stage': 'not_started',
+            'generation_progress': 0
+        })
+        data['active_project_id'] = project_id
+    return data
+
+
+_UPGRADES = {
+    0: _upgrade_to_v1,
+    1: _upgrade_to_v2,
+    2: _upgrade_to_v3,
+    3: _upgrade_to_v4,
+    4: _upgrade_to_v5,
+    5: _upgrade_to_v6,
+}
+
+
+def upgrade(data):
+    """
+    Upgrade one loaded session to SCHEMA_VERSION (in memory, no disk writes)
+
+    Returns:
+        tuple: (session record, original version)
+    """
+    original_version = version = schema_version(data)
+    while version < SCHEMA_VERSION:
+        data = _UPGRADES[version](data)
+        version += 1
+    data['schema_version'] = SCHEMA_VERSION
+    return data, original_version
+
+
+def migrate_session_file(session_file):
+    """
+    Upgrade one session file in place (atomic rewrite, skipped if already current)
+
+    Returns:
+        tuple: (session file, original version or None if unreadable,
+                session_index.summarize() of the upgraded session or None)
+    """
+    from app import session_index, session_storage
+
+    try:
+        with open(session_file, 'rb') as f:
+            data = pickle.load(f)
+    except Exception as e:
+        print(f"Warning: Failed to load session {session_file}: {e}")
+        return session_file, None, None
+
+    data, original_version = upgrade(data)
+    summary = session_index.summarize(data)
+    if original_version == SCHEMA_VERSION:
+        return session_file, original_version, summary
+
+    adopted_cold = session_storage.externalize_payloads(session_file.stem, data)
+    tmp_file = session_file.with_suffix(f'.{os.getpid()}.migrating')
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, session_file)
+    if adopted_cold:
+        shutil.rmtree(session_storage._cold_dir(session_file.stem), ignore_errors=True)
+    return session_file, original_version, summary
+
+
+def run_migrations(full_scan=False, max_workers=None):
+    """
+    Upgrade stored sessions to SCHEMA_VERSION, in parallel worker processes
+
+    Only sessions the index lists at an older schema are read. Every session
+    file is read (and the index rebuilt from them) when the index is empty,
+    e.g. on the first start after the sharded layout was introduced.
+
+    Args:
+        full_scan: Read every session file and rebuild the index
+        max_workers: Parallel processes (defaults to SESSION_MIGRATION_WORKERS)
+
+    Returns:
+        dict: {'total', 'migrated', 'failed'}
+    """
+    from app import session_storage, session_index
+
+    session_storage.migrate_legacy_layout()
+
+    if full_scan or session_index.is_empty():
+        session_index.clear()
+        session_files = sorted(session_storage.SESSIONS_DIR.glob('*/*/*.pkl'))
+    else:
+        session_files = [session_storage.session_path(session_id)
+                         for session_id in session_index.outdated(SCHEMA_VERSION)]
+    stats = {'total': len(session_files), 'migrated': 0, 'failed': 0}
+    if not session_files:
+        return stats
+
+    with ProcessPoolExecutor(max_workers=max_workers or MIGRATION_WORKERS) as executor:
+        for session_file, original_version, summary in executor.map(migrate_session_file, session_files, chunksize=8):
+            if original_version is None:
+                if not session_file.exists():
+                    session_index.remove(session_file.stem)  # Deleted since it was indexed
+                else:
+                    stats['failed'] += 1
+                continue
+            if original_version < SCHEMA_VERSION:
+                stats['migrated'] += 1
+            stat = session_file.stat()
+            session_index.record(session_file.stem, stat.st_size, stat.st_mtime, summary)
+
+    print(f"🗂️  Session schema v{SCHEMA_VERSION}: migrated {stats['migrated']}/{stats['total']} sessions"
+          f" ({stats['failed']} unreadable)")
+    return stats
+
+
+if __name__ == '__main__':
+    run_migrations()
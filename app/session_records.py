@@ -0,0 +1,384 @@
+"""
+Typed in-memory records for server-side session storage
+Slot-based replacements for the nested session/project/month dicts, with
+O(1) indexes by project id, month number, image id and cart item id.
+
+Records keep the dict interface the rest of the app already uses
+(record['key'], record.get('key'), 'key' in record, record['key'] = value),
+so routes, services and templates work unchanged.
+
+Image payloads are stored as files and held as Blob references; reading
+such a field returns a memoryview over an mmap of the file.
+"""
+import mmap
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class Blob:
+    """
+    Reference to an image payload stored as a file (written by session_storage)
+
+    Record fields holding a Blob read back as a read-only memoryview over an
+    mmap of the file - loading a session never reads image bytes, and pages
+    are only touched by whoever consumes the view. Each file is mapped once
+    per process and the mapping reused (see _maps).
+    """
+    __slots__ = ('relpath', 'size')
+
+    # Directory relpath is relative to (session_storage.IMAGES_DIR, set on import)
+    root = None
+
+    def __init__(self, relpath, size):
+        self.relpath = relpath
+        self.size = size
+
+    @property
+    def path(self):
+        return Blob.root / self.relpath
+
+    def view(self):
+        """Read-only memoryview of the payload (None if the file is missing)"""
+        with _maps_lock:
+            mapped = _maps.get(self.relpath)
+            if mapped is not None:
+                _maps.move_to_end(self.relpath)
+                return memoryview(mapped)
+            try:
+                with open(self.path, 'rb') as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError) as e:
+                print(f"Warning: Image file {self.relpath} unreadable: {e}")
+                return None
+            _maps[self.relpath] = mapped
+            while len(_maps) > MAX_OPEN_MAPS:
+                _close_map(_maps.popitem(last=False)[1])
+            return memoryview(mapped)
+
+    def __getstate__(self):
+        return (self.relpath, self.size)
+
+    def __setstate__(self, state):
+        self.relpath, self.size = state
+
+    def __repr__(self):
+        return f'<blob {self.size} bytes>'
+
+
+# Open mappings by relpath, least recently used first. Image files are
+# content-addressed, so a relpath always maps the same bytes. Bounded because
+# each mmap holds a file descriptor.
+MAX_OPEN_MAPS = 256
+_maps = OrderedDict()
+_maps_lock = threading.Lock()
+
+
+def _close_map(mapped):
+    try:
+        mapped.close()
+    except BufferError:
+        pass  # A view is still in use - unmapped when the last one is released
+
+
+def close_maps(relpath_prefix):
+    """
+    Close mappings of image files about to be (or already) deleted
+
+    Args:
+        relpath_prefix: A file's relpath, or a directory relpath ending in '/'
+                        to close every file under it
+    """
+    with _maps_lock:
+        for relpath in [r for r in _maps if r.startswith(relpath_prefix)]:
+            _close_map(_maps.pop(relpath))
+
+
+class Record:
+    """Base class: dict-style access over __slots__ fields
+
+    Unset slots behave like missing dict keys. Keys that aren't declared
+    fields (rare, e.g. ad-hoc debug data) go to a small overflow dict.
+    """
+    __slots__ = ('_extra',)
+    FIELDS = ()
+
+    def __init__(self, data=None, **fields):
+        self._init_indexes()
+        if data:
+            fields = {**data, **fields}
+        for key, value in fields.items():
+            self[key] = value
+
+    def _init_indexes(self):
+        """Set up empty collections/indexes (subclasses with indexes override)"""
+        pass
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a legacy dict (or return it unchanged if already a record)"""
+        if isinstance(data, cls):
+            return data
+        return cls(data)
+
+    def _extras(self):
+        try:
+            return self._extra
+        except AttributeError:
+            self._extra = {}
+            return self._extra
+
+    def raw(self, key, default=None):
+        """Stored value without opening Blob payloads (e.g. to check where the bytes live)"""
+        if key in self.FIELDS:
+            return getattr(self, key, default)
+        return getattr(self, '_extra', {}).get(key, default)
+
+    def __getitem__(self, key):
+        value = self.raw(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        if type(value) is Blob:
+            return value.view()
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            self._extras()[key] = value
+
+    def __delitem__(self, key):
+        if key in self.FIELDS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        else:
+            del self._extras()[key]
+
+    def __contains__(self, key):
+        return self.raw(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key, default=None):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            self[key] = default
+            return default
+        return value
+
+    def pop(self, key, default=_MISSING):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        del self[key]
+        return value
+
+    def keys(self):
+        return [key for key in self.FIELDS if key in self] + list(getattr(self, '_extra', ()))
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self):
+        """Plain dict copy (nested records converted too)"""
+        return {key: _plain(value) for key, value in self.items()}
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __repr__(self):
+        # Never dump image bytes into logs
+        shown = {k: (f'<{len(v)} bytes>' if isinstance(v, (bytes, bytearray, memoryview)) else v)
+                 for k, v in ((k, self.raw(k)) for k in self.keys())}
+        return f'{type(self).__name__}({shown})'
+
+    # Pickle only the declared fields (Blob references, not their bytes); indexes are rebuilt on load
+    def __getstate__(self):
+        return {key: self.raw(key) for key in self.keys()}
+
+    def __setstate__(self, state):
+        self._init_indexes()
+        for key, value in state.items():
+            self[key] = value
+
+
+def _plain(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+class Variant(Record):
+    """One generated image for a month (cold_file: schema < 5 only, see session_storage._adopt_cold_variants)"""
+    __slots__ = ('data', 'digest', 'face_box', 'generated_at', 'variant_index', 'cold_file')
+    FIELDS = frozenset(__slots__)
+
+
+class Month(Record):
+    """One calendar month (0 = cover) and its generated variants"""
+    __slots__ = ('id', 'month_number', 'prompt', 'title', 'description', 'generation_status',
+                 'master_image_data', 'image_variants', 'selected_variant_index', 'retry_count',
+                 'error_message', 'generated_at', 'face_box', 'summary')
+    FIELDS = frozenset(__slots__)
+
+    def __setitem__(self, key, value):
+        if key == 'image_variants' and value is not None:
+            value = [Variant.from_dict(v) for v in value]
+        Record.__setitem__(self, key, value)
+
+
+class UploadedImage(Record):
+    """A reference photo uploaded by the user"""
+    __slots__ = ('id', 'filename', 'file_data', 'thumbnail_data', 'uploaded_at')
+    FIELDS = frozenset(__slots__)
+
+
+class CartItem(Record):
+    """A project + product type in the cart"""
+    __slots__ = ('id', 'project_id', 'product_type', 'price', 'quantity', 'mockup_url', 'added_at')
+    FIELDS = frozenset(__slots__)
+
+
+class Project(Record):
+    """One calendar project, with months indexed by number and images by id/filename"""
+    __slots__ = ('id', 'status', 'created_at', 'preferences', 'preview_expiry',
+                 'payment_method_id', 'setup_intent_id', 'generation_stage',
+                 'generation_progress', 'speculative_generation',
+                 '_months', '_months_by_number', '_images', '_images_by_id', '_images_by_filename')
+    FIELDS = frozenset(('id', 'status', 'created_at', 'preferences', 'preview_expiry',
+                        'payment_method_id', 'setup_intent_id', 'generation_stage',
+                        'generation_progress', 'speculative_generation', 'months', 'images'))
+
+    # --- months -------------------------------------------------------------
+
+    @property
+    def months(self):
+        return self._months
+
+    @months.setter
+    def months(self, months):
+        self._months = [Month.from_dict(m) for m in (months or [])]
+        self._months_by_number = {m['month_number']: m for m in self._months}
+
+    def add_month(self, month):
+        month = Month.from_dict(month)
+        self._months.append(month)
+        self._months_by_number[month['month_number']] = month
+        return month
+
+    def month(self, month_number):
+        """O(1) month lookup by number (None if missing)"""
+        return self._months_by_number.get(month_number)
+
+    # --- images -------------------------------------------------------------
+
+    @property
+    def images(self):
+        return self._images
+
+    @images.setter
+    def images(self, images):
+        self._images = [UploadedImage.from_dict(img) for img in (images or [])]
+        self._images_by_id = {img['id']: img for img in self._images}
+        self._images_by_filename = {img['filename']: img for img in self._images}
+
+    def add_image(self, image):
+        image = UploadedImage.from_dict(image)
+        self._images.append(image)
+        self._images_by_id[image['id']] = image
+        self._images_by_filename[image['filename']] = image
+        return image
+
+    def image(self, image_id):
+        """O(1) image lookup by id (None if missing)"""
+        return self._images_by_id.get(image_id)
+
+    def image_by_filename(self, filename):
+        """O(1) duplicate-upload check"""
+        return self._images_by_filename.get(filename)
+
+    def remove_image(self, image_id):
+        image = self._images_by_id.pop(image_id, None)
+        if image is None:
+            return
+        self._images.remove(image)
+        if self._images_by_filename.get(image['filename']) is image:
+            del self._images_by_filename[image['filename']]
+
+    def _init_indexes(self):
+        self.months = []
+        self.images = []
+
+
+class Session(Record):
+    """All server-side data for one browser session"""
+    __slots__ = ('schema_version', 'active_project_id', 'order', 'preview_mockups', 'preview_mockup',
+                 'delivery_image', '_projects', '_projects_by_id', '_cart', '_cart_by_id')
+    FIELDS = frozenset(('schema_version', 'active_project_id', 'order', 'preview_mockups', 'preview_mockup',
+                        'delivery_image', 'projects', 'cart'))
+
+    # --- projects -----------------------------------------------------------
+
+    @property
+    def projects(self):
+        return self._projects
+
+    @projects.setter
+    def projects(self, projects):
+        self._projects = [Project.from_dict(p) for p in (projects or [])]
+        self._projects_by_id = {p['id']: p for p in self._projects}
+
+    def add_project(self, project):
+        project = Project.from_dict(project)
+        self._projects.append(project)
+        self._projects_by_id[project['id']] = project
+        return project
+
+    def project(self, project_id):
+        """O(1) project lookup by id (None if missing)"""
+        return self._projects_by_id.get(project_id)
+
+    # --- cart ---------------------------------------------------------------
+
+    @property
+    def cart(self):
+        return self._cart
+
+    @cart.setter
+    def cart(self, cart):
+        self._cart = [CartItem.from_dict(item) for item in (cart or [])]
+        self._cart_by_id = {item['id']: item for item in self._cart}
+
+    def add_cart_item(self, item):
+        item = CartItem.from_dict(item)
+        self._cart.append(item)
+        self._cart_by_id[item['id']] = item
+        return item
+
+    def cart_item(self, cart_item_id):
+        """O(1) cart item lookup by id (None if missing)"""
+        return self._cart_by_id.get(cart_item_id)
+
+    def remove_cart_item(self, cart_item_id):
+        item = self._cart_by_id.pop(cart_item_id, None)
+        if item is not None:
+            self._cart.remove(item)
+
+    def _init_indexes(self):
+        self.projects = []
+        self.cart = []
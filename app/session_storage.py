@@ -5,21 +5,83 @@ Stores data in files on disk to survive deployments and restarts
 from flask import session, current_app
 from datetime import datetime
 import secrets
+import hashlib
 import pickle
 import os
 import gc
+import gzip
+import shutil
+import fcntl
+import functools
+import time
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 import sys
+from app.session_records import Session, Project, Variant, Blob, close_maps
+from app import session_migrations, session_index
+from app.storage_paths import SESSION_STORAGE_DIR
 
 # Storage directory (persistent volume on Fly.io, falls back to /tmp for local dev)
-STORAGE_DIR = Path('/data/session_storage') if Path('/data').exists() else Path('/tmp/session_storage')
+STORAGE_DIR = SESSION_STORAGE_DIR
 STORAGE_DIR.mkdir(exist_ok=True, parents=True)
 
+# Session files, sharded by id prefix (sessions/ab/cd/<id>.pkl) so no single
+# directory holds hundreds of thousands of entries
+SESSIONS_DIR = STORAGE_DIR / 'sessions'
+SESSIONS_DIR.mkdir(exist_ok=True)
+
+# Per-session lock files (flock'd by whichever worker is writing that session)
+LOCKS_DIR = STORAGE_DIR / 'locks'
+LOCKS_DIR.mkdir(exist_ok=True)
+
 # SERVER-SIDE storage (persisted to disk!)
 # Key: session_id, Value: project data
 _storage = {}
 _loaded = False
 
+# Key: session_id, Value: (inode, mtime_ns, size) of the file our in-memory copy came from
+_disk_stamps = {}
+
+# Sessions with an open write transaction in this thread
+_tx = threading.local()
+
+# In-process locks (gthread workers): initial load, and per-session guards so a
+# reader's reload can't swap out a session another thread is mutating
+_load_lock = threading.Lock()
+_session_thread_locks = {}
+_session_thread_locks_guard = threading.Lock()
+
+# Poll interval while another worker/thread holds a session's file lock
+LOCK_POLL_SECONDS = 0.005
+
+# Retired cold tier: old variants used to be moved out of the pickle into gzip files
+# here. Schema v5 moves them into image files; nothing new is written
+COLD_DIR = STORAGE_DIR / 'cold'
+COLD_DIR.mkdir(exist_ok=True)
+
+# Image files, one per image content digest: images/ab/cd/<session_id>/<digest>.jpg
+# Every image payload is stored here (session pickles hold Blob references that
+# read back as mmap'd memoryviews) and served straight from disk via sendfile
+IMAGES_DIR = STORAGE_DIR / 'images'
+IMAGES_DIR.mkdir(exist_ok=True)
+Blob.root = IMAGES_DIR
+
+# Static images every project uses (the month 0 cover): encoded once per process
+# (before fork under gunicorn) into images/shared/<digest>.jpg and referenced by
+# Blob from every project - no per-project copy, not part of any session's quota
+SHARED_IMAGES_DIR = IMAGES_DIR / 'shared'
+SHARED_IMAGE_SOURCES = {
+    'cover': Path(__file__).parent / 'static' / 'assets' / 'images' / 'cover.png'
+}
+
+# Per-session storage quota (session file + image files)
+SESSION_QUOTA_BYTES = int(os.getenv('SESSION_STORAGE_QUOTA_MB', 150)) * 1024 * 1024
+
+class StorageQuotaExceeded(Exception):
+    """Raised when a session has used up its storage quota"""
+    pass
+
 def _log(msg):
     """Log message using Flask logger if available, otherwise print with flush"""
     try:
@@ -28,41 +90,236 @@ def _log(msg):
         print(msg, flush=True)
         sys.stdout.flush()
 
+def _shard(session_id):
+    """Two-level prefix directory for a session id"""
+    return Path(session_id[:2]) / session_id[2:4]
+
+def session_path(session_id):
+    """Path of a session's pickle file"""
+    return SESSIONS_DIR / _shard(session_id) / f'{session_id}.pkl'
+
+def _cold_dir(session_id):
+    return COLD_DIR / _shard(session_id) / session_id
+
+def _image_dir(session_id):
+    return IMAGES_DIR / _shard(session_id) / session_id
+
+def _close_image_maps(session_id):
+    """Unmap this process's open views of a session's image files (before they're deleted)"""
+    close_maps(f'{_image_dir(session_id).relative_to(IMAGES_DIR).as_posix()}/')
+
+def _lock_path(session_id):
+    return LOCKS_DIR / _shard(session_id) / f'{session_id}.lock'
+
+def migrate_legacy_layout():
+    """
+    Move session files and cold variants from the old flat layout into shards
+
+    Run once at startup before workers serve requests (session_migrations.run_migrations).
+    Flat lock files are just removed - nothing can hold them yet.
+
+    Returns:
+        int: Number of sessions moved
+    """
+    moved = 0
+    for session_file in STORAGE_DIR.glob('*.pkl'):
+        target = session_path(session_file.stem)
+        target.parent.mkdir(exist_ok=True, parents=True)
+        try:
+            os.replace(session_file, target)
+            moved += 1
+        except FileNotFoundError:
+            pass
+    for cold_dir in COLD_DIR.iterdir():
+        if len(cold_dir.name) > 2:  # Shard directories have 2-character names
+            target = _cold_dir(cold_dir.name)
+            target.parent.mkdir(exist_ok=True, parents=True)
+            os.replace(cold_dir, target)
+    for lock_file in LOCKS_DIR.glob('*.lock'):
+        lock_file.unlink(missing_ok=True)
+    if moved:
+        print(f"🗂️  Moved {moved} sessions into the sharded storage layout")
+    return moved
+
 def _load_storage(force_reload=False):
-    """Load storage from disk on first access"""
+    """
+    Prepare storage on first access
+
+    Sessions are read lazily by _refresh_if_stale() the first time this worker
+    touches them (session_index lists what's on disk), so startup no longer
+    unpickles every session file.
+    """
     global _storage, _loaded
     if _loaded and not force_reload:
         return
 
-    # Load all session files from disk
-    if force_reload:
-        _storage.clear()  # Clear existing data when force reloading
-    for session_file in STORAGE_DIR.glob('*.pkl'):
+    with _load_lock:
+        if _loaded and not force_reload:
+            return  # Another thread finished loading while we waited
+
+        if force_reload:
+            # Drop in-memory copies; each is re-read from disk on next access
+            _storage.clear()
+            _disk_stamps.clear()
+            print("♻️  Force reload: in-memory sessions dropped")
+
+        _loaded = True
+
+def _to_session_record(data):
+    """
+    Return a loaded session as a current-schema Session record
+
+    Sessions are upgraded on disk once by session_migrations.run_migrations()
+    at startup; anything older seen here (e.g. restored from a backup) is
+    upgraded in memory only and written back on its next normal save.
+    """
+    data, original_version = session_migrations.upgrade(data)
+    if original_version < session_migrations.SCHEMA_VERSION:
+        print(f"Warning: Session loaded at schema v{original_version} - upgraded in memory")
+    return data
+
+def _file_stamp(session_file):
+    """Identity of a session file's current contents (changes on every atomic rewrite)"""
+    stat = os.stat(session_file)
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+def _read_session_file(session_id):
+    """Load one session file into memory (the file is always complete - writes are atomic renames)"""
+    session_file = session_path(session_id)
+    with open(session_file, 'rb') as f:
+        stamp = _file_stamp(session_file)
+        _storage[session_id] = _to_session_record(pickle.load(f))
+    _disk_stamps[session_id] = stamp
+
+def _session_thread_lock(session_id):
+    """In-process re-entrant lock for one session"""
+    lock = _session_thread_locks.get(session_id)
+    if lock is None:
+        with _session_thread_locks_guard:
+            lock = _session_thread_locks.setdefault(session_id, threading.RLock())
+    return lock
+
+def _refresh_if_stale(session_id):
+    """
+    Reload a session if another worker has rewritten its file since we read it
+
+    One stat() per call; the pickle is only re-read when the file changed.
+    """
+    session_file = session_path(session_id)
+    try:
+        stamp = _file_stamp(session_file)
+    except FileNotFoundError:
+        return  # Not on disk yet (new session) - memory is authoritative
+    if _disk_stamps.get(session_id) == stamp:
+        return
+    with _session_thread_lock(session_id):
         try:
-            with open(session_file, 'rb') as f:
-                session_id = session_file.stem
-                _storage[session_id] = pickle.load(f)
+            if _disk_stamps.get(session_id) != _file_stamp(session_file):
+                _read_session_file(session_id)
         except Exception as e:
-            print(f"Warning: Failed to load session {session_file}: {e}")
+            print(f"Warning: Failed to reload session {session_id}: {e}")
 
-    _loaded = True
-    if force_reload:
-        print(f"♻️  Force reloaded {len(_storage)} sessions from disk")
-    else:
-        print(f"✓ Loaded {len(_storage)} sessions from disk")
+@contextmanager
+def _session_lock(session_id):
+    """
+    Exclusive lock for one session across threads and worker processes
+
+    Takes the in-process lock first, then flocks the session's lock file.
+    The flock is polled non-blocking so a waiting gevent worker never
+    blocks its event loop inside the syscall.
+    """
+    with _session_thread_lock(session_id):
+        lock_path = _lock_path(session_id)
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+        except FileNotFoundError:
+            lock_path.parent.mkdir(exist_ok=True, parents=True)
+            fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    time.sleep(LOCK_POLL_SECONDS)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+@contextmanager
+def _session_transaction(session_id):
+    """
+    Serialize read-modify-write of one session across threads and worker processes
+
+    Holds an exclusive flock on the session's lock file, reloads the session if
+    another worker changed it, and writes it back once on exit if anything
+    called _save_session() inside the block. Lock hold time is just the
+    reload + mutation + write, so e.g. several months of one calendar can be
+    generated in parallel and each stores its result without clobbering the others.
+    Re-entrant within a thread.
+    """
+    held = getattr(_tx, 'sessions', None)
+    if held is None:
+        held = _tx.sessions = {}
+
+    if session_id in held:
+        held[session_id]['depth'] += 1
+        try:
+            yield
+        finally:
+            held[session_id]['depth'] -= 1
+        return
+
+    _load_storage()
+    with _session_lock(session_id):
+        held[session_id] = {'depth': 1, 'dirty': False}
+        try:
+            _refresh_if_stale(session_id)
+            yield
+            if held[session_id]['dirty']:
+                _write_session_file(session_id)
+        finally:
+            del held[session_id]
+
+def _transactional(func):
+    """Run a current-session mutator inside _session_transaction"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _session_transaction(_get_session_id()):
+            return func(*args, **kwargs)
+    return wrapper
 
 def _save_session(session_id):
-    """Save a single session to disk"""
+    """Save a single session to disk (deferred to commit when inside a transaction)"""
     if session_id not in _storage:
         return
 
+    held = getattr(_tx, 'sessions', None)
+    if held and session_id in held:
+        held[session_id]['dirty'] = True
+        return
+
+    with _session_lock(session_id):
+        _write_session_file(session_id)
+
+def _write_session_file(session_id):
+    """Atomically replace a session's file with the in-memory copy"""
     try:
-        import os
-        session_file = STORAGE_DIR / f'{session_id}.pkl'
-        with open(session_file, 'wb') as f:
+        session_file = session_path(session_id)
+        session_file.parent.mkdir(exist_ok=True, parents=True)
+        adopted_cold = externalize_payloads(session_id, _storage[session_id])
+        tmp_file = session_file.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_file, 'wb') as f:
             pickle.dump(_storage[session_id], f)
             f.flush()  # Flush Python buffers to OS
             os.fsync(f.fileno())  # Force OS to write to disk immediately
+        os.replace(tmp_file, session_file)
+        if adopted_cold:
+            shutil.rmtree(_cold_dir(session_id), ignore_errors=True)
+        _prune_image_files(session_id, _storage[session_id])
+        stamp = _disk_stamps[session_id] = _file_stamp(session_file)
+        session_index.record(session_id, stamp[2], stamp[1] / 1e9, session_index.summarize(_storage[session_id]))
         # Force garbage collection after saving large image data
         gc.collect()
     except Exception as e:
@@ -79,52 +336,35 @@ def _get_storage():
     _load_storage()  # Load from disk if not already loaded
 
     session_id = _get_session_id()
+    _refresh_if_stale(session_id)  # Pick up writes from other workers
     if session_id not in _storage:
-        # New multi-project + cart structure
-        project_id = secrets.token_urlsafe(16)
-        _storage[session_id] = {
-            'projects': [
-                {
-                    'id': project_id,
-                    'status': 'new',
-                    'created_at': datetime.utcnow().isoformat(),
-                    'images': [],
-                    'months': [],
-                    'preferences': None
-                }
-            ],
-            'active_project_id': project_id,
-            'cart': []
-        }
-        _save_session(session_id)  # Save new session to disk
-    else:
-        # MIGRATION: Convert old single-project format to new multi-project format
-        storage = _storage[session_id]
-        if 'project' in storage and 'projects' not in storage:
-            # Old format detected - migrate to new format
-            old_project = storage['project']
-            project_id = secrets.token_urlsafe(16)
-
-            _storage[session_id] = {
-                'projects': [
-                    {
-                        'id': project_id,
-                        'status': old_project.get('status', 'new'),
-                        'created_at': old_project.get('created_at', datetime.utcnow().isoformat()),
-                        'images': storage.get('images', []),
-                        'months': storage.get('months', []),
-                        'preferences': storage.get('preferences')
-                    }
-                ],
-                'active_project_id': project_id,
-                'cart': [],
-                # Preserve order info and mockups if they exist
-                'order': storage.get('order'),
-                'preview_mockups': storage.get('preview_mockups', {}),
-                'preview_mockup': storage.get('preview_mockup')
-            }
-            _save_session(session_id)
-
+        with _session_thread_lock(session_id):
+            if session_id not in _storage:
+                # New multi-project + cart structure
+                project_id = secrets.token_urlsafe(16)
+                _storage[session_id] = Session(
+                    schema_version=session_migrations.SCHEMA_VERSION,
+                    projects=[
+                        Project(
+                            id=project_id,
+                            status='new',
+                            created_at=datetime.utcnow().isoformat(),
+                            images=[],
+                            months=[],
+                            preferences=None,
+                            preview_expiry=None,
+                            payment_method_id=None,
+                            setup_intent_id=None,
+                            generation_stage='not_started',
+                            generation_progress=0
+                        )
+                    ],
+                    active_project_id=project_id,
+                    cart=[]
+                )
+                _save_session(session_id)  # Save new session to disk
+
+    session_index.touch(session_id)
     return _storage[session_id]
 
 def init_session():
@@ -132,60 +372,17 @@ def init_session():
     _get_storage()  # Creates storage if doesn't exist
 
 def _get_active_project():
-    """Internal: Get active project object"""
+    """Internal: Get active project object (read-only - every session has a project
+    from creation, or from the v6 schema upgrade)"""
     storage = _get_storage()
-    active_id = storage['active_project_id']
-    for project in storage['projects']:
-        if project['id'] == active_id:
-            # MIGRATION: Add new fields to existing projects
-            if 'generation_stage' not in project:
-                project['preview_expiry'] = None
-                project['payment_method_id'] = None
-                project['setup_intent_id'] = None
-                # Determine stage based on existing data
-                months = project.get('months', [])
-                if not months:
-                    project['generation_stage'] = 'not_started'
-                elif len(months) == 3 and all(m.get('generation_status') == 'completed' for m in months):
-                    # 3 preview months complete → show payment gate
-                    project['generation_stage'] = 'preview_only'
-                elif len(months) == 13 and all(m.get('generation_status') == 'completed' for m in months):
-                    # All 13 months complete → show product selection
-                    project['generation_stage'] = 'fully_generated'
-                else:
-                    # Generation in progress
-                    project['generation_stage'] = 'generating_full' if len(months) > 3 else 'preview_only'
-                project['generation_progress'] = 0
-                _save_session(_get_session_id())
-            return project
-    # Fallback: return first project if active not found
-    if storage['projects']:
-        storage['active_project_id'] = storage['projects'][0]['id']
-        _save_session(_get_session_id())
-        return storage['projects'][0]
-    # No projects exist - create one
-    project_id = secrets.token_urlsafe(16)
-    new_project = {
-        'id': project_id,
-        'status': 'new',
-        'created_at': datetime.utcnow().isoformat(),
-        'images': [],
-        'months': [],
-        'preferences': None,
-        # New fields for 3-month preview system
-        'preview_expiry': None,
-        'payment_method_id': None,
-        'setup_intent_id': None,
-        'generation_stage': 'not_started',
-        'generation_progress': 0
-    }
-    storage['projects'].append(new_project)
-    storage['active_project_id'] = project_id
-    _save_session(_get_session_id())
-    return new_project
+    project = storage.project(storage['active_project_id'])
+    if project is not None:
+        return project
+    # Fallback: first project if active not found (active id left as is)
+    return storage['projects'][0]
 
 def get_current_project():
-    """Get or create current project (backward compatible)"""
+    """Get current project (backward compatible)"""
     project = _get_active_project()
     # Return in old format for backward compatibility
     return {
@@ -209,29 +406,19 @@ def get_uploaded_images():
 def get_uploaded_images_by_session_id(session_id, project_id=None):
     """Get uploaded images for a specific session (used by webhooks)"""
     _load_storage()
+    _refresh_if_stale(session_id)
     if session_id not in _storage:
         return []
 
     storage = _storage[session_id]
 
-    # If project_id specified, get that specific project
-    if project_id:
-        for project in storage.get('projects', []):
-            if project['id'] == project_id:
-                return project.get('images', [])
-        return []
-
-    # Otherwise, get active project's images
-    active_id = storage.get('active_project_id')
-    if not active_id:
+    # If project_id specified, get that specific project; otherwise the active project
+    project = storage.project(project_id or storage.get('active_project_id'))
+    if project is None:
         return []
+    return project['images']
 
-    for project in storage.get('projects', []):
-        if project['id'] == active_id:
-            return project.get('images', [])
-
-    return []
-
+@_transactional
 def add_uploaded_image(filename, file_data, thumbnail_data):
     """Add an uploaded image to active project"""
     project = _get_active_project()
@@ -244,14 +431,14 @@ def add_uploaded_image(filename, file_data, thumbnail_data):
     _log(f"   Current images in project: {len(project.get('images', []))}")
 
     # Check for duplicate filename to prevent double uploads
-    for existing_image in project.get('images', []):
-        if existing_image['filename'] == filename:
-            _log(f"⚠️  Duplicate image detected: {filename} - skipping, returning existing ID {existing_image['id']}")
-            return existing_image['id']  # Return existing ID
+    existing_image = project.image_by_filename(filename)
+    if existing_image is not None:
+        _log(f"⚠️  Duplicate image detected: {filename} - skipping, returning existing ID {existing_image['id']}")
+        return existing_image['id']  # Return existing ID
 
     # Store binary data directly in server memory (no base64 needed!)
-    image_id = len(project['images']) + 1
-    project['images'].append({
+    image_id = max((img['id'] for img in project['images']), default=0) + 1
+    project.add_image({
         'id': image_id,
         'filename': filename,
         'file_data': file_data,  # Raw binary data
@@ -266,32 +453,23 @@ def add_uploaded_image(filename, file_data, thumbnail_data):
 
 def get_image_by_id(image_id):
     """Get image by ID from active project"""
-    project = _get_active_project()
-    for img in project.get('images', []):
-        if img['id'] == image_id:
-            return img
-    return None
+    return _get_active_project().image(image_id)
 
 def get_image_by_id_from_project(image_id, project_id):
     """Get image by ID from a SPECIFIC project (not active project)"""
-    storage = _get_storage()
-
-    # Find the specific project by ID
-    for project in storage.get('projects', []):
-        if project['id'] == project_id:
-            # Search for image in this specific project
-            for img in project.get('images', []):
-                if img['id'] == image_id:
-                    return img
-
-    return None
+    project = _get_storage().project(project_id)
+    if project is None:
+        return None
+    return project.image(image_id)
 
+@_transactional
 def delete_image(image_id):
     """Delete an image from active project"""
     project = _get_active_project()
-    project['images'] = [img for img in project.get('images', []) if img['id'] != image_id]
+    project.remove_image(image_id)
     _save_session(_get_session_id())  # Persist to disk
 
+@_transactional
 def clear_all_images():
     """Clear all images from active project (more efficient than deleting one by one)"""
     project = _get_active_project()
@@ -309,10 +487,62 @@ def clear_all_images():
     _log(f"   ✅ All images cleared, session saved")
 
 def get_all_months():
-    """Get all calendar months for active project"""
+    """Get all calendar months for active project (full records, including image bytes)"""
     project = _get_active_project()
     return project.get('months', [])
 
+# ============================================================================
+# BLOB-FREE METADATA PROJECTIONS
+# ============================================================================
+
+def _image_digest(image_data):
+    """Short content digest for an image (used for ETags and change detection)"""
+    if type(image_data) is Blob:
+        return Path(image_data.relpath).stem  # Image files are named by digest
+    if not image_data:
+        return None
+    return hashlib.sha256(image_data).hexdigest()[:16]
+
+def _refresh_month_summary(month):
+    """
+    Recompute the compact summary stored on a month record
+
+    Called by every write path that changes a month, so status/polling
+    endpoints can read month['summary'] without touching image payloads.
+    """
+    variants = month.get('image_variants') or []
+    selected_index = month.get('selected_variant_index', 0)
+
+    if variants and selected_index < len(variants):
+        selected = variants[selected_index]
+        digest = selected.get('digest') or _image_digest(selected.get('data'))
+    else:
+        digest = _image_digest(month.get('master_image_data'))
+
+    month['summary'] = {
+        'id': month['id'],
+        'month_number': month['month_number'],
+        'title': month.get('title'),
+        'generation_status': month.get('generation_status', 'pending'),
+        'variant_count': len(variants) if variants else (1 if month.get('master_image_data') else 0),
+        'selected_variant_index': selected_index,
+        'retry_count': month.get('retry_count', 0),
+        'image_digest': digest,
+        'generated_at': month.get('generated_at'),
+        'error_message': month.get('error_message')
+    }
+    return month['summary']
+
+def get_month_summary(month):
+    """Blob-free summary for a month record (precomputed on write)"""
+    return month.get('summary') or _refresh_month_summary(month)
+
+def get_month_summaries():
+    """Blob-free summaries of all months in the active project (for status/polling endpoints)"""
+    project = _get_active_project()
+    return [get_month_summary(m) for m in project.get('months', [])]
+
+@_transactional
 def create_months_with_themes(themes):
     """
     Create months for active project
@@ -327,7 +557,7 @@ def create_months_with_themes(themes):
 
     for month_num in preview_months:
         theme = themes[month_num]
-        project['months'].append({
+        month = project.add_month({
             'id': month_num,
             'month_number': month_num,
             'prompt': theme['prompt'],
@@ -341,6 +571,7 @@ def create_months_with_themes(themes):
             'error_message': None,
             'generated_at': None
         })
+        _refresh_month_summary(month)
 
     # Set generation stage and preview expiry
     project['generation_stage'] = 'preview_only'
@@ -348,6 +579,7 @@ def create_months_with_themes(themes):
 
     _save_session(_get_session_id())  # Persist to disk
 
+@_transactional
 def create_remaining_months(themes):
     """
     Create remaining 10 months (Cover + April-December) after payment authorization
@@ -360,7 +592,7 @@ def create_remaining_months(themes):
 
     for month_num in remaining_months:
         theme = themes[month_num]
-        project['months'].append({
+        month = project.add_month({
             'id': month_num,
             'month_number': month_num,
             'prompt': theme['prompt'],
@@ -374,6 +606,7 @@ def create_remaining_months(themes):
             'error_message': None,
             'generated_at': None
         })
+        _refresh_month_summary(month)
 
     # Update generation stage
     project['generation_stage'] = 'generating_full'
@@ -383,39 +616,41 @@ def create_remaining_months(themes):
 
 def get_month_by_number(month_num):
     """Get month by number from active project"""
-    project = _get_active_project()
-    for month in project.get('months', []):
-        if month['month_number'] == month_num:
-            return month
-    return None
+    return _get_active_project().month(month_num)
 
-def update_month_status(month_num, status, image_data=None, error=None):
-    """Update month generation status for active project"""
-    project = _get_active_project()
-
-    for month in project.get('months', []):
-        if month['month_number'] == month_num:
-            month['generation_status'] = status
+@_transactional
+def update_month_status(month_num, status, image_data=None, error=None, face_box=None):
+    """Update month generation status for active project
 
-            if image_data:
-                # Store as raw binary (no base64 needed in server memory!)
-                month['master_image_data'] = image_data
-                month['generated_at'] = datetime.utcnow().isoformat()
+    face_box: Optional face bounding box detected on image_data (stored with the variant)
+    """
+    month = _get_active_project().month(month_num)
+    if month is not None:
+        month['generation_status'] = status
 
-                # Initialize first variant if this is the first generation
-                if 'image_variants' not in month or len(month['image_variants']) == 0:
-                    month['image_variants'] = [{
-                        'data': image_data,
-                        'generated_at': month['generated_at'],
-                        'variant_index': 0
-                    }]
-                    month['selected_variant_index'] = 0
+        if image_data:
+            # Store as raw binary (no base64 needed in server memory!)
+            month['master_image_data'] = image_data
+            month['face_box'] = face_box
+            month['generated_at'] = datetime.utcnow().isoformat()
+
+            # Initialize first variant if this is the first generation
+            if 'image_variants' not in month or len(month['image_variants']) == 0:
+                month['image_variants'] = [{
+                    'data': image_data,
+                    'digest': _image_digest(image_data),
+                    'face_box': face_box,
+                    'generated_at': month['generated_at'],
+                    'variant_index': 0
+                }]
+                month['selected_variant_index'] = 0
 
-            if error:
-                month['error_message'] = str(error)
+        if error:
+            month['error_message'] = str(error)
 
-            _save_session(_get_session_id())  # Persist to disk
-            return month
+        _refresh_month_summary(month)
+        _save_session(_get_session_id())  # Persist to disk
+        return month
 
     return None
 
@@ -438,6 +673,27 @@ def get_month_image_data(month_num):
 
     return None
 
+def get_month_face_box(month):
+    """Get stored face box for a month's selected variant (no detection is run)
+
+    Args:
+        month: Month dict (from any session/project)
+    """
+    if not month:
+        return None
+
+    variants = month.get('image_variants', [])
+    selected_index = month.get('selected_variant_index', 0)
+
+    if variants and selected_index < len(variants):
+        return variants[selected_index].get('face_box')
+
+    return month.get('face_box')
+
+def get_month_face_box_by_number(month_num):
+    """Get stored face box for a month's selected variant in the active project"""
+    return get_month_face_box(get_month_by_number(month_num))
+
 def get_month_by_id(month_id):
     """Get month by ID (month_number) from active project"""
     return get_month_by_number(month_id)
@@ -454,66 +710,365 @@ def get_month_variant_image(month_id, variant_index):
 
     return None
 
+# ============================================================================
+# IMAGE FILES (served from disk)
+# ============================================================================
+
+def _image_file(session_id, digest, load, purpose=None, directory=None):
+    """
+    Path of an image's file on disk, written from load() the first time it's needed
+
+    Files are named by content digest, so an existing file is always current
+    and later requests never touch the image bytes. Derivatives (purpose given)
+    go to derived/<digest>.<purpose>.jpg - a cache outside the storage quota.
+    directory overrides the session's image directory (shared images).
+    """
+    directory = directory or _image_dir(session_id)
+    if purpose:
+        path = directory / 'derived' / f'{digest}.{purpose}.jpg'
+    else:
+        path = directory / f'{digest}.jpg'
+    if path.exists():
+        return path
+    data = load()
+    if data is None:
+        return None
+    path.parent.mkdir(exist_ok=True, parents=True)
+    tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+def _store_payload(session_id, record, key):
+    """Write a record's in-memory image bytes to their file and keep a Blob reference instead"""
+    value = record.raw(key)
+    if not isinstance(value, (bytes, bytearray, memoryview)) or not value:
+        return
+    path = _image_file(session_id, _image_digest(value), lambda: value)
+    record[key] = Blob(path.relative_to(IMAGES_DIR).as_posix(), len(value))
+
+def _payload_fields(data):
+    """(record, key) of every image payload field in a session"""
+    yield data, 'delivery_image'
+    for project in data.get('projects', []):
+        for image in project.get('images', []):
+            yield image, 'file_data'
+            yield image, 'thumbnail_data'
+        for month in project.get('months', []):
+            yield month, 'master_image_data'
+            for variant in month.get('image_variants') or []:
+                yield variant, 'data'
+
+def _adopt_cold_variants(session_id, data):
+    """
+    Schema v5: load variants tiered out to the retired cold tier back into the record
+
+    Returns:
+        int: Variants adopted (the cold directory can go once the session is written)
+    """
+    adopted = 0
+    for project in data.get('projects', []):
+        for month in project.get('months', []):
+            for variant in month.get('image_variants') or []:
+                cold_file = variant.pop('cold_file', None)
+                if not cold_file:
+                    continue
+                try:
+                    with gzip.open(_cold_dir(session_id) / cold_file, 'rb') as f:
+                        variant['data'] = f.read()
+                    adopted += 1
+                except FileNotFoundError:
+                    print(f"Warning: Cold variant {cold_file} missing for session {session_id}")
+    return adopted
+
+def externalize_payloads(session_id, data):
+    """
+    Move image bytes out of a session record into image files
+
+    Run before every pickle of a session, so session files hold metadata
+    only and a loaded session costs no memory for its images.
+
+    Returns:
+        int: Cold-tier variants moved into image files (see _adopt_cold_variants)
+    """
+    adopted = _adopt_cold_variants(session_id, data)
+    for record, key in _payload_fields(data):
+        _store_payload(session_id, record, key)
+    return adopted
+
+def _prune_image_files(session_id, data):
+    """
+    Delete a session's image files its record no longer references
+
+    Run after every session write (under the session lock), so deleted
+    uploads, cleared projects and replaced images free their space and stop
+    counting against the quota. derived/ is a cache and left alone.
+    """
+    image_dir = _image_dir(session_id)
+    if not image_dir.exists():
+        return
+    referenced = set()
+    for record, key in _payload_fields(data):
+        value = record.raw(key)
+        if type(value) is Blob:
+            referenced.add(value.path)
+    for path in image_dir.glob('*.jpg'):
+        if path not in referenced:
+            close_maps(path.relative_to(IMAGES_DIR).as_posix())
+            path.unlink(missing_ok=True)
+
+def payload_path(record, key, session_id=None):
+    """File path of a record's image payload (no bytes read if it's already stored as a file)"""
+    value = record.raw(key)
+    if type(value) is Blob:
+        return value.path
+    return image_path(value, session_id)
+
+def image_path(image_data, session_id=None):
+    """
+    File path for image bytes already in hand (thumbnails, covers, delivery image)
+
+    Args:
+        image_data: JPEG bytes from a session record
+        session_id: Owning session (defaults to the current session)
+
+    Returns:
+        Path or None if there is no image
+    """
+    if not image_data:
+        return None
+    return _image_file(session_id or _get_session_id(), _image_digest(image_data), lambda: image_data)
+
+def get_month_image_path(month_id, variant_index=None):
+    """File path of a month's image (selected variant unless variant_index is given)"""
+    month = get_month_by_id(month_id)
+    if not month:
+        return None
+    session_id = _get_session_id()
+
+    variants = month.get('image_variants', [])
+    if variant_index is None:
+        variant_index = month.get('selected_variant_index', 0)
+        if not (variants and variant_index < len(variants)):
+            return payload_path(month, 'master_image_data', session_id)
+    if variant_index >= len(variants):
+        return None
+
+    return payload_path(variants[variant_index], 'data', session_id)  # Possibly a shared image
+
+_shared_images = {}  # Key: SHARED_IMAGE_SOURCES name, Value: Blob (per process)
+_shared_images_lock = threading.Lock()
+
+def shared_image(name):
+    """
+    Blob of a shared static image's master JPEG, encoded once per process
+
+    Assign it to a record field like image bytes (e.g. as a month's image_data):
+    the record then references the shared file instead of holding a copy.
+
+    Args:
+        name: Key of SHARED_IMAGE_SOURCES
+
+    Returns:
+        Blob
+    """
+    blob = _shared_images.get(name)
+    if blob is not None:
+        return blob
+    with _shared_images_lock:
+        if name not in _shared_images:
+            from PIL import Image
+            from app.services import image_derivatives
+
+            with Image.open(SHARED_IMAGE_SOURCES[name]) as img:
+                data = image_derivatives.encode_master(img)
+            path = _image_file(None, _image_digest(data), lambda: data, directory=SHARED_IMAGES_DIR)
+            _shared_images[name] = Blob(path.relative_to(IMAGES_DIR).as_posix(), len(data))
+            print(f"✓ Shared image '{name}' ready ({len(data) / 1024:.0f} KB, {path.name})")
+    return _shared_images[name]
+
+def prepare_shared_images():
+    """Encode every shared image (gunicorn's master calls this before forking workers)"""
+    for name in SHARED_IMAGE_SOURCES:
+        try:
+            shared_image(name)
+        except Exception as e:
+            print(f"⚠️  Shared image '{name}' unavailable: {e}")
+
+def derived_image_path(key, purpose, render, session_id=None, shared=False):
+    """
+    Cached derived image, rendered the first time it's needed
+
+    Args:
+        key: Digest of everything the output depends on
+        purpose: Output kind (part of the file name)
+        render: render() -> JPEG bytes, or None if the source is gone
+        session_id: Owning session (defaults to the current session)
+        shared: Derived from a shared image - cached once for every session
+
+    Returns:
+        Path or None
+    """
+    if shared:
+        return _image_file(None, key, render, purpose=purpose, directory=SHARED_IMAGES_DIR)
+    return _image_file(session_id or _get_session_id(), key, render, purpose=purpose)
+
+def get_month_derivative_path(month, purpose, session_id=None):
+    """
+    File path of a derived output (print upload, grid tile, ...) of a month's selected variant
+
+    Rendered from the variant's master by image_derivatives.render() once,
+    then served from the cache for as long as the variant exists.
+
+    Args:
+        month: Month dict (from any session/project)
+        purpose: Key of image_derivatives.RENDERERS
+        session_id: Owning session (defaults to the current session)
+
+    Returns:
+        Path or None if the month has no image
+    """
+    if not month:
+        return None
+    session_id = session_id or _get_session_id()
+
+    variants = month.get('image_variants', [])
+    selected_index = month.get('selected_variant_index', 0)
+    if variants and selected_index < len(variants):
+        variant = variants[selected_index]
+        raw = variant.raw('data')
+        load = lambda: variant.get('data')
+        digest = variant.get('digest') or _image_digest(load())
+        face_box = variant.get('face_box')
+    elif month.get('master_image_data'):
+        raw = month.raw('master_image_data')
+        load = lambda: month['master_image_data']
+        digest = _image_digest(raw)
+        face_box = month.get('face_box')
+    else:
+        return None
+    shared = type(raw) is Blob and raw.path.parent == SHARED_IMAGES_DIR
+
+    def render():
+        from app.services import image_derivatives
+        master = load()
+        if master is None:
+            return None
+        return image_derivatives.render(purpose, master, face_box)
+
+    return derived_image_path(digest, purpose, render, session_id, shared=shared)
+
+def get_month_derivative(month, purpose, session_id=None):
+    """Bytes of a month's derived output (see get_month_derivative_path)"""
+    path = get_month_derivative_path(month, purpose, session_id)
+    return path.read_bytes() if path else None
+
+# ============================================================================
+# STORAGE QUOTA
+# ============================================================================
+
+def _dir_size(directory):
+    if not directory.exists():
+        return 0
+    return sum(path.stat().st_size for path in directory.iterdir() if path.is_file())
+
+def get_storage_usage(session_id=None):
+    """Bytes on disk used by a session (session file + image files, not derived/ caches)"""
+    session_id = session_id or _get_session_id()
+    total = 0
+    session_file = session_path(session_id)
+    if session_file.exists():
+        total += session_file.stat().st_size
+    return total + _dir_size(_image_dir(session_id))
+
+def check_storage_quota(session_id=None):
+    """
+    Raise StorageQuotaExceeded if the session has used up SESSION_QUOTA_BYTES
+
+    Called before work that adds data (uploads, regenerations, new projects)
+    """
+    used = get_storage_usage(session_id)
+    if used >= SESSION_QUOTA_BYTES:
+        raise StorageQuotaExceeded(
+            f"Storage limit reached: this session is using {used / 1024 / 1024:.0f} MB "
+            f"of its {SESSION_QUOTA_BYTES / 1024 / 1024:.0f} MB. "
+            f"Finish or check out an existing calendar before adding more."
+        )
+
+@_transactional
 def select_month_variant(month_id, variant_index):
     """Update selected variant for a month"""
-    project = _get_active_project()
-
-    for month in project.get('months', []):
-        if month['month_number'] == month_id:
-            variants = month.get('image_variants', [])
-            if variant_index < len(variants):
-                month['selected_variant_index'] = variant_index
-                _save_session(_get_session_id())
-                return True
+    month = _get_active_project().month(month_id)
+    if month is not None:
+        variants = month.get('image_variants', [])
+        if variant_index < len(variants):
+            month['selected_variant_index'] = variant_index
+            _refresh_month_summary(month)
+            _save_session(_get_session_id())
+            return True
 
     return False
 
-def add_month_variant(month_id, image_data):
-    """Add new variant to month and increment retry count"""
-    from datetime import datetime
-
-    project = _get_active_project()
+@_transactional
+def add_month_variant(month_id, image_data, face_box=None, increment_retry=True, select=True):
+    """Add new variant to month and increment retry count
 
-    for month in project.get('months', []):
-        if month['month_number'] == month_id:
-            # Initialize variants array if not exists
-            if 'image_variants' not in month:
-                month['image_variants'] = []
-
-            # Initialize retry count if not exists
-            if 'retry_count' not in month:
-                month['retry_count'] = 0
-
-            # If this is the first variant, migrate master_image_data
-            if len(month['image_variants']) == 0 and month.get('master_image_data'):
-                month['image_variants'].append({
-                    'data': month['master_image_data'],
-                    'generated_at': month.get('generated_at', datetime.utcnow().isoformat()),
-                    'variant_index': 0
-                })
-
-            # Add new variant
-            new_variant_index = len(month['image_variants'])
-            month['image_variants'].append({
-                'data': image_data,
-                'generated_at': datetime.utcnow().isoformat(),
-                'variant_index': new_variant_index
-            })
+    face_box: Optional face bounding box detected on image_data (stored with the variant)
+    increment_retry/select: False for the extra candidates of a multi-candidate
+                            regenerate (one click = one retry, first arrival shown)
+    """
+    from datetime import datetime
 
-            # Increment retry count
+    month = _get_active_project().month(month_id)
+    if month is not None:
+        # Initialize variants array if not exists
+        if 'image_variants' not in month:
+            month['image_variants'] = []
+
+        # Initialize retry count if not exists
+        if 'retry_count' not in month:
+            month['retry_count'] = 0
+
+        # If this is the first variant, migrate master_image_data
+        if len(month['image_variants']) == 0 and month.get('master_image_data'):
+            month['image_variants'].append(Variant({
+                'data': month['master_image_data'],
+                'digest': _image_digest(month['master_image_data']),
+                'face_box': month.get('face_box'),
+                'generated_at': month.get('generated_at', datetime.utcnow().isoformat()),
+                'variant_index': 0
+            }))
+
+        # Add new variant
+        new_variant_index = len(month['image_variants'])
+        month['image_variants'].append(Variant({
+            'data': image_data,
+            'digest': _image_digest(image_data),
+            'face_box': face_box,
+            'generated_at': datetime.utcnow().isoformat(),
+            'variant_index': new_variant_index
+        }))
+
+        # Increment retry count
+        if increment_retry:
             month['retry_count'] += 1
 
+        if select:
             # Select the new variant automatically
             month['selected_variant_index'] = new_variant_index
 
             # Update master_image_data for backwards compatibility
             month['master_image_data'] = image_data
+            month['face_box'] = face_box
 
-            _save_session(_get_session_id())
-            return new_variant_index
+        _refresh_month_summary(month)
+        _save_session(_get_session_id())
+        return new_variant_index
 
     return None
 
+@_transactional
 def update_project_status(status):
     """Update active project status"""
     project = _get_active_project()
@@ -522,14 +1077,14 @@ def update_project_status(status):
 
 def get_completion_count():
     """Get number of completed months for active project"""
-    project = _get_active_project()
-    return sum(1 for m in project.get('months', []) if m['generation_status'] == 'completed')
+    return sum(1 for m in get_month_summaries() if m['generation_status'] == 'completed')
 
 def get_preferences():
     """Get user customization preferences for active project"""
     project = _get_active_project()
     return project.get('preferences')
 
+@_transactional
 def set_preferences(preferences):
     """Set user customization preferences for active project"""
     project = _get_active_project()
@@ -537,16 +1092,78 @@ def set_preferences(preferences):
     _save_session(_get_session_id())  # Persist to disk
     return preferences
 
+def delete_session_by_session_id(session_id, archive_dir=None, idle_since=None):
+    """Delete (or archive) a session's file and image files (used by the session janitor)
+
+    archive_dir: Keep a gzip copy of the session file there instead of deleting outright
+    idle_since: Skip the session if it was written after this time (re-checked under its lock)
+    Returns bytes reclaimed on the volume (None if skipped)
+    """
+    with _session_lock(session_id):
+        session_file = session_path(session_id)
+        try:
+            stat = session_file.stat()
+        except FileNotFoundError:
+            return None
+        if idle_since is not None and stat.st_mtime > idle_since:
+            return None  # User came back since the janitor looked
+
+        image_dir = _image_dir(session_id)
+        derived_dir = image_dir / 'derived'
+        reclaimed = stat.st_size + _dir_size(image_dir) + _dir_size(derived_dir)
+        shutil.rmtree(derived_dir, ignore_errors=True)  # Re-renderable, never archived
+
+        if archive_dir is not None:
+            archive_dir.mkdir(exist_ok=True, parents=True)
+            archive_file = archive_dir / f'{session_id}.pkl.gz'
+            with open(session_file, 'rb') as src, gzip.open(archive_file, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            reclaimed -= archive_file.stat().st_size
+            # The pickle only references its images - keep them with the archive
+            if image_dir.exists():
+                reclaimed -= _dir_size(image_dir)
+                shutil.move(image_dir, archive_dir / session_id / 'images')
+
+        session_file.unlink()
+        shutil.rmtree(image_dir, ignore_errors=True)
+        session_index.remove(session_id)
+        _close_image_maps(session_id)
+        _storage.pop(session_id, None)
+        _disk_stamps.pop(session_id, None)
+        return reclaimed
+
+def evict_deleted_sessions():
+    """Drop sessions whose files were deleted by the janitor (in any worker) from this worker's memory
+
+    Returns number of sessions evicted
+    """
+    evicted = 0
+    for session_id in list(_disk_stamps):
+        if session_path(session_id).exists():
+            continue
+        with _session_thread_lock(session_id):
+            if session_id in _disk_stamps and not session_path(session_id).exists():
+                _close_image_maps(session_id)
+                _storage.pop(session_id, None)
+                _disk_stamps.pop(session_id, None)
+                evicted += 1
+    if evicted:
+        gc.collect()
+    return evicted
+
 def clear_session():
     """Clear all session data (for testing)"""
     session_id = _get_session_id()
     if session_id in _storage:
         del _storage[session_id]
 
-    # Delete session file from disk
-    session_file = STORAGE_DIR / f'{session_id}.pkl'
+    # Delete session file and image files from disk
+    session_file = session_path(session_id)
     if session_file.exists():
         session_file.unlink()
+    _close_image_maps(session_id)
+    shutil.rmtree(_image_dir(session_id), ignore_errors=True)
+    session_index.remove(session_id)
 
     session.clear()
 
@@ -560,6 +1177,7 @@ PRODUCT_PRICES = {
     'wall_calendar': 26.50
 }
 
+@_transactional
 def create_new_project():
     """Create a new project and make it active"""
     storage = _get_storage()
@@ -580,7 +1198,7 @@ def create_new_project():
         'generation_progress': 0  # 0-100 percentage for remaining months generation
     }
 
-    storage['projects'].append(new_project)
+    storage.add_project(new_project)
     storage['active_project_id'] = project_id
     _save_session(_get_session_id())
 
@@ -588,12 +1206,9 @@ def create_new_project():
 
 def get_project_by_id(project_id):
     """Get a specific project by ID"""
-    storage = _get_storage()
-    for project in storage['projects']:
-        if project['id'] == project_id:
-            return project
-    return None
+    return _get_storage().project(project_id)
 
+@_transactional
 def add_to_cart(project_id, product_type):
     """Add a project to the cart with specified product type"""
     storage = _get_storage()
@@ -662,15 +1277,14 @@ def add_to_cart(project_id, product_type):
         'added_at': datetime.utcnow().isoformat()
     }
 
-    storage['cart'].append(cart_item)
+    storage.add_cart_item(cart_item)
     _save_session(_get_session_id())
 
     return cart_item_id
 
 def get_cart_items():
     """Get all cart items with project details"""
-    # Force reload from disk to ensure we have latest cart data (fixes race condition)
-    _load_storage(force_reload=True)
+    # _get_storage() reloads the session if another worker changed the cart
     storage = _get_storage()
     cart_items_with_details = []
 
@@ -678,11 +1292,7 @@ def get_cart_items():
         project = get_project_by_id(cart_item['project_id'])
         if project:
             # Get cover image (month 0) for preview - fallback if no Printify mockup
-            cover_month = None
-            for month in project.get('months', []):
-                if month['month_number'] == 0:
-                    cover_month = month
-                    break
+            cover_month = project.month(0)
 
             cart_items_with_details.append({
                 'id': cart_item['id'],
@@ -708,6 +1318,7 @@ def get_cart_total():
     storage = _get_storage()
     return sum(item['price'] * item.get('quantity', 1) for item in storage['cart'])
 
+@_transactional
 def update_cart_quantity(cart_item_id, quantity):
     """Update the quantity of a cart item"""
     storage = _get_storage()
@@ -717,21 +1328,23 @@ def update_cart_quantity(cart_item_id, quantity):
         raise ValueError("Quantity must be between 1 and 99")
 
     # Find cart item and update quantity
-    for item in storage['cart']:
-        if item['id'] == cart_item_id:
-            item['quantity'] = quantity
-            _save_session(_get_session_id())
-            print(f"📦 Updated cart item {cart_item_id} quantity to {quantity}")
-            return True
+    item = storage.cart_item(cart_item_id)
+    if item is not None:
+        item['quantity'] = quantity
+        _save_session(_get_session_id())
+        print(f"📦 Updated cart item {cart_item_id} quantity to {quantity}")
+        return True
 
     raise ValueError(f"Cart item not found: {cart_item_id}")
 
+@_transactional
 def remove_from_cart(cart_item_id):
     """Remove an item from the cart"""
     storage = _get_storage()
-    storage['cart'] = [item for item in storage['cart'] if item['id'] != cart_item_id]
+    storage.remove_cart_item(cart_item_id)
     _save_session(_get_session_id())
 
+@_transactional
 def clear_cart():
     """Remove all items from cart"""
     storage = _get_storage()
@@ -740,12 +1353,12 @@ def clear_cart():
 
 def clear_cart_by_session_id(session_id):
     """Clear cart for a specific session ID (used by webhooks)"""
-    _load_storage()
-    if session_id in _storage:
-        _storage[session_id]['cart'] = []
-        _save_session(session_id)
-        return True
-    return False
+    with _session_transaction(session_id):
+        if session_id in _storage:
+            _storage[session_id]['cart'] = []
+            _save_session(session_id)
+            return True
+        return False
 
 # ============================================================================
 # WEBHOOK FUNCTIONS (Multi-Session Access)
@@ -759,66 +1372,60 @@ def get_months_by_session_id(session_id, project_id=None):
         project_id: Optional project ID. If None, returns active project's months.
     """
     _load_storage()
+    _refresh_if_stale(session_id)
     if session_id not in _storage:
         return []
 
     storage = _storage[session_id]
 
-    # Handle old format (backward compatibility)
-    if 'months' in storage and 'projects' not in storage:
-        return storage['months']
-
-    # New multi-project format
     if project_id:
         # Get specific project
-        for project in storage.get('projects', []):
-            if project['id'] == project_id:
-                return project.get('months', [])
-        return []
-    else:
-        # Get active project
-        active_id = storage.get('active_project_id')
-        if active_id:
-            for project in storage.get('projects', []):
-                if project['id'] == active_id:
-                    return project.get('months', [])
-        # Fallback: first project
-        if storage.get('projects'):
-            return storage['projects'][0].get('months', [])
-        return []
+        project = storage.project(project_id)
+        return project['months'] if project else []
+
+    # Get active project
+    project = storage.project(storage.get('active_project_id'))
+    if project:
+        return project['months']
+    # Fallback: first project
+    if storage['projects']:
+        return storage['projects'][0]['months']
+    return []
 
 def get_cart_by_session_id(session_id):
     """Get cart items for a specific session ID (used by webhooks)"""
-    # Force reload from disk to ensure we have latest cart data (fixes race condition)
-    _load_storage(force_reload=True)
+    # Reload from disk if another worker changed the cart
+    _load_storage()
+    _refresh_if_stale(session_id)
     if session_id in _storage:
         return _storage[session_id].get('cart', [])
     return []
 
 def save_order_info(session_id, order_data):
     """Save order information to a specific session (used by webhooks)"""
-    _load_storage()
-    if session_id in _storage:
-        _storage[session_id]['order'] = order_data
-        _save_session(session_id)
-        return True
-    return False
+    with _session_transaction(session_id):
+        if session_id in _storage:
+            _storage[session_id]['order'] = order_data
+            _save_session(session_id)
+            return True
+        return False
 
 def get_order_info_by_session_id(session_id):
     """Get order information for a specific session"""
     _load_storage()
+    _refresh_if_stale(session_id)
     if session_id in _storage:
         return _storage[session_id].get('order')
     return None
 
 def save_delivery_image(session_id, image_data):
     """Save delivery worker image to a specific session (used after order)"""
-    _load_storage()
-    if session_id in _storage:
-        _storage[session_id]['delivery_image'] = image_data
-        _save_session(session_id)
-        return True
-    return False
+    with _session_transaction(session_id):
+        if session_id in _storage:
+            _storage[session_id]['delivery_image'] = image_data
+            _save_session(session_id)
+            return True
+        return False
 
 def get_delivery_image():
     """Get delivery worker image for current session"""
@@ -828,10 +1435,12 @@ def get_delivery_image():
 def get_delivery_image_by_session_id(session_id):
     """Get delivery worker image for a specific session"""
     _load_storage()
+    _refresh_if_stale(session_id)
     if session_id in _storage:
         return _storage[session_id].get('delivery_image')
     return None
 
+@_transactional
 def save_preview_mockup_data(mockup_data, product_type='calendar_2026'):
     """
     Save Printify preview mockup data to session
@@ -874,6 +1483,7 @@ def get_preview_mockup_data(product_type=None):
 def get_preview_mockup_by_session_id(session_id):
     """Get preview mockup data for a specific session (used by webhooks)"""
     _load_storage()
+    _refresh_if_stale(session_id)
     if session_id in _storage:
         # Return all mockups (new format) or single mockup (legacy)
         mockups = _storage[session_id].get('preview_mockups', {})
@@ -889,6 +1499,7 @@ def get_preview_mockup_by_session_id(session_id):
 # 3-MONTH PREVIEW SYSTEM FUNCTIONS
 # ============================================================================
 
+@_transactional
 def set_preview_expiry():
     """Set preview expiry to 48 hours from now"""
     from datetime import timedelta
@@ -912,12 +1523,14 @@ def is_preview_expired():
         return False
     return datetime.utcnow() > expiry
 
+@_transactional
 def save_setup_intent(setup_intent_id):
     """Save Stripe Setup Intent ID"""
     project = _get_active_project()
     project['setup_intent_id'] = setup_intent_id
     _save_session(_get_session_id())
 
+@_transactional
 def save_payment_method(payment_method_id):
     """Save Stripe payment method ID"""
     project = _get_active_project()
@@ -931,17 +1544,55 @@ def get_payment_method_id():
 
 def save_payment_method_by_session_id(session_id, payment_method_id):
     """Save payment method for a specific session (used by webhooks)"""
+    with _session_transaction(session_id):
+        if session_id in _storage:
+            project = _storage[session_id].project(_storage[session_id].get('active_project_id'))
+            if project is not None:
+                project['payment_method_id'] = payment_method_id
+                _save_session(session_id)
+                return True
+        return False
+
+def get_project_by_session_id(session_id, project_id):
+    """Get a specific project from a specific session (used by background jobs)"""
     _load_storage()
-    if session_id in _storage:
-        active_id = _storage[session_id].get('active_project_id')
-        if active_id:
-            for project in _storage[session_id].get('projects', []):
-                if project['id'] == active_id:
-                    project['payment_method_id'] = payment_method_id
-                    _save_session(session_id)
-                    return True
-    return False
+    _refresh_if_stale(session_id)
+    if session_id not in _storage:
+        return None
+    return _storage[session_id].project(project_id)
+
+def save_speculative_generation_by_session_id(session_id, project_id, state):
+    """Save speculative pre-generation state for a project (used by background jobs)
+
+    state: {'status': 'running'|'completed'|'discarded', 'months': {month_num: cache_key}, ...}
+    """
+    with _session_transaction(session_id):
+        project = get_project_by_session_id(session_id, project_id)
+        if not project:
+            return False
+        project['speculative_generation'] = state
+        _save_session(session_id)
+        return True
+
+def recover_stuck_month_by_session_id(session_id, project_id, month_num, status, error=None):
+    """Reset a month left 'processing' by a dead worker (used by the generation lease reaper)
+
+    status: 'pending' to requeue the month, 'failed' to give up on it
+    Returns True if the month was still processing and has been reset
+    """
+    with _session_transaction(session_id):
+        project = get_project_by_session_id(session_id, project_id)
+        month = project.month(month_num) if project else None
+        if month is None or month.get('generation_status') != 'processing':
+            return False
+        month['generation_status'] = status
+        if error:
+            month['error_message'] = str(error)
+        _refresh_month_summary(month)
+        _save_session(session_id)
+        return True
 
+@_transactional
 def set_generation_stage(stage):
     """
     Set generation stage
@@ -956,6 +1607,7 @@ def get_generation_stage():
     project = _get_active_project()
     return project.get('generation_stage', 'not_started')
 
+@_transactional
 def update_generation_progress(progress):
     """Update generation progress (0-100)"""
     project = _get_active_project()
@@ -973,7 +1625,7 @@ def get_generation_status():
     Returns dict with stage, progress, and counts
     """
     project = _get_active_project()
-    months = project.get('months', [])
+    months = [get_month_summary(m) for m in project.get('months', [])]
 
     completed_count = sum(1 for m in months if m.get('generation_status') == 'completed')
 
@@ -0,0 +1,293 @@
+"""
+Fingerprinted, precompressed static assets
+Build time (Dockerfile, after app.image_assets):  python -m app.static_assets
+  Copies every CSS/JS/font/image file under static/ to
+  static/build/assets/<dir>/<name>.<content hash>.<ext>, rewrites url()
+  references inside CSS to the hashed names, writes .gz and .br siblings for
+  compressible files and a manifest to static/build/assets.json.
+
+Templates need no changes: url_for('static', filename='css/style.css')
+returns the hashed URL once the manifest exists (the original otherwise).
+
+Serving: wrap() is WSGI middleware in front of Flask. /static/build/ requests
+never reach Flask routing, sessions or CORS - the file (or its .br/.gz
+variant, per Accept-Encoding) is handed to the server's wsgi.file_wrapper
+(sendfile) with a one-year immutable Cache-Control.
+"""
+import os
+import re
+import gzip
+import json
+import hashlib
+import mimetypes
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # gzip variants only
+
+STATIC_DIR = Path(__file__).parent / 'static'
+BUILD_DIR = STATIC_DIR / 'build' / 'assets'
+MANIFEST_PATH = STATIC_DIR / 'build' / 'assets.json'
+
+# Everything under here is content-hashed (assets/ and images/ from app.image_assets)
+URL_PREFIX = '/static/build/'
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Fingerprinted file types; text types also get .gz/.br variants
+ASSET_SUFFIXES = {'.css', '.js', '.svg', '.woff2', '.woff', '.ttf', '.eot', '.png', '.jpg', '.jpeg', '.gif', '.ico', '.webp'}
+COMPRESSIBLE_SUFFIXES = {'.css', '.js', '.svg', '.ttf', '.eot', '.json'}
+SKIP_DIRS = {'build', 'scss'}
+
+# Only keep a compressed variant if it saves at least this fraction
+MIN_COMPRESSION_SAVING = 0.1
+
+CSS_URL_PATTERN = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+mimetypes.add_type('font/woff2', '.woff2')
+mimetypes.add_type('font/woff', '.woff')
+mimetypes.add_type('font/ttf', '.ttf')
+mimetypes.add_type('image/svg+xml', '.svg')
+
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+def _sources():
+    """Asset files under static/, relative paths (non-CSS first, so CSS can refer to their hashed names)"""
+    sources = []
+    for dirpath, dirnames, filenames in os.walk(STATIC_DIR):
+        dirnames[:] = [name for name in dirnames if name not in SKIP_DIRS and not name.startswith('.')]
+        for filename in filenames:
+            path = Path(dirpath) / filename
+            if path.suffix.lower() in ASSET_SUFFIXES:
+                sources.append(path.relative_to(STATIC_DIR).as_posix())
+    return sorted(sources, key=lambda rel_path: (rel_path.endswith('.css'), rel_path))
+
+
+def _hashed_path(rel_path, digest):
+    path = Path(rel_path)
+    return (Path('build/assets') / path.parent / f"{path.stem}.{digest}{path.suffix}").as_posix()
+
+
+def _rewrite_css(rel_path, css, manifest):
+    """
+    Point url() references at hashed files
+
+    The hashed CSS lives in another directory, so relative references to
+    files that weren't fingerprinted are rewritten to their original location.
+    """
+    source_dir = Path(rel_path).parent
+    output_dir = Path(_hashed_path(rel_path, 'x')).parent
+
+    def replace(match):
+        quote, url = match.groups()
+        if url.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+            return match.group(0)
+        target, sep, suffix = re.match(r'([^?#]*)([?#]?)(.*)', url).groups()  # e.g. font.eot?#iefix
+        target_rel = os.path.normpath(source_dir / target)
+        new_target = manifest.get(Path(target_rel).as_posix(), target_rel)
+        new_url = Path(os.path.relpath(new_target, output_dir)).as_posix() + sep + suffix
+        return f'url({quote}{new_url}{quote})'
+
+    return CSS_URL_PATTERN.sub(replace, css)
+
+
+def _write_compressed(output):
+    """Write .gz (and .br if brotli is installed) next to output when it pays off; returns the variants written"""
+    data = output.read_bytes()
+    variants = []
+    encoders = [('gz', lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encoders.append(('br', lambda raw: brotli.compress(raw, quality=11)))
+    for extension, compress in encoders:
+        variant = output.with_name(f"{output.name}.{extension}")
+        if not variant.exists():
+            compressed = compress(data)
+            if len(compressed) > len(data) * (1 - MIN_COMPRESSION_SAVING):
+                continue
+            variant.write_bytes(compressed)
+        variants.append(variant)
+    return variants
+
+
+def _link_or_copy(source, output):
+    """Hard link unchanged files (no extra space in the image), copy if linking isn't possible"""
+    output.parent.mkdir(exist_ok=True, parents=True)
+    tmp = output.with_name(f".{output.name}.tmp")
+    try:
+        os.link(source, tmp)
+    except OSError:
+        tmp.write_bytes(source.read_bytes())
+    os.replace(tmp, output)
+
+
+def build():
+    """Fingerprint and precompress every asset, prune old builds and write the manifest"""
+    manifest = {}
+    written = set()
+    original_bytes = compressed_bytes = 0
+
+    for rel_path in _sources():
+        source = STATIC_DIR / rel_path
+        if rel_path.endswith('.css'):
+            data = _rewrite_css(rel_path, source.read_text(encoding='utf-8'), manifest).encode('utf-8')
+        else:
+            data = source.read_bytes()
+
+        hashed = _hashed_path(rel_path, hashlib.sha256(data).hexdigest()[:10])
+        output = STATIC_DIR / hashed
+        if not output.exists():
+            if rel_path.endswith('.css'):
+                output.parent.mkdir(exist_ok=True, parents=True)
+                output.write_bytes(data)
+            else:
+                _link_or_copy(source, output)
+        manifest[rel_path] = hashed
+        written.add(output)
+
+        if source.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+            variants = _write_compressed(output)
+            written.update(variants)
+            original_bytes += len(data)
+            compressed_bytes += min([variant.stat().st_size for variant in variants] or [len(data)])
+
+    # Drop files from previous builds
+    for dirpath, _, filenames in os.walk(BUILD_DIR):
+        for filename in filenames:
+            path = Path(dirpath) / filename
+            if path not in written:
+                path.unlink()
+
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    print(f"✓ Fingerprinted {len(manifest)} static assets - text assets "
+          f"{original_bytes / 1024:.0f} KB -> {compressed_bytes / 1024:.0f} KB "
+          f"{'brotli' if brotli is not None else 'gzip (brotli not installed)'}")
+    return manifest
+
+
+# ============================================================================
+# URLS
+# ============================================================================
+
+_manifest = None
+
+
+def _get_manifest():
+    global _manifest
+    if _manifest is None:
+        try:
+            _manifest = json.loads(MANIFEST_PATH.read_text())
+        except (FileNotFoundError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def hashed_url_defaults(endpoint, values):
+    """Flask url_defaults hook: url_for('static', filename=...) -> the fingerprinted file"""
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = _get_manifest().get(values['filename'], values['filename'])
+
+
+# ============================================================================
+# SERVING
+# ============================================================================
+
+def _quality(params):
+    """q value of an Accept-Encoding entry's parameters (1 if absent, 0 if malformed)"""
+    for param in params.split(';'):
+        name, _, value = param.strip().partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                return float(value)
+            except ValueError:
+                return 0
+    return 1
+
+
+def _accepts(accept_encoding, coding):
+    """True if the Accept-Encoding header allows coding, by name or through * (q=0 refuses it)"""
+    wildcard = None
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if name == coding:
+            return _quality(params) > 0
+        if name == '*':
+            wildcard = _quality(params) > 0
+    return bool(wildcard)
+
+
+def _resolve(path_info):
+    """File under static/build/ for a request path, or None (traversal, missing, compressed variant)"""
+    build_root = (STATIC_DIR / 'build').resolve()
+    path = (STATIC_DIR / path_info[len('/static/'):]).resolve()
+    if build_root not in path.parents or path.suffix in ('.gz', '.br', '.json') or not path.is_file():
+        return None
+    return path
+
+
+def _read_chunks(f):
+    with f:
+        while chunk := f.read(64 * 1024):
+            yield chunk
+
+
+def wrap(wsgi_app):
+    """
+    WSGI middleware serving /static/build/ ahead of Flask
+
+    Args:
+        wsgi_app: The Flask app's wsgi_app
+
+    Returns:
+        A WSGI callable (requests outside /static/build/ go to wsgi_app)
+    """
+    def serve(environ, start_response):
+        path_info = environ.get('PATH_INFO', '')
+        method = environ.get('REQUEST_METHOD', 'GET')
+        if not path_info.startswith(URL_PREFIX) or method not in ('GET', 'HEAD'):
+            return wsgi_app(environ, start_response)
+
+        path = _resolve(path_info)
+        if path is None:
+            return wsgi_app(environ, start_response)  # Flask's 404
+
+        content_type, _ = mimetypes.guess_type(path.name)
+        headers = [
+            ('Content-Type', content_type or 'application/octet-stream'),
+            ('Cache-Control', CACHE_CONTROL),
+            ('Access-Control-Allow-Origin', '*'),  # Webfonts loaded from other origins
+        ]
+
+        accept_encoding = environ.get('HTTP_ACCEPT_ENCODING', '')
+        has_variants = False
+        for extension, coding in (('br', 'br'), ('gz', 'gzip')):
+            variant = path.with_name(f"{path.name}.{extension}")
+            if variant.exists():
+                has_variants = True
+                if _accepts(accept_encoding, coding):
+                    path = variant
+                    headers.append(('Content-Encoding', coding))
+                    break
+        if has_variants:
+            headers.append(('Vary', 'Accept-Encoding'))
+
+        f = open(path, 'rb')
+        headers.append(('Content-Length', str(os.fstat(f.fileno()).st_size)))
+        start_response('200 OK', headers)
+        if method == 'HEAD':
+            f.close()
+            return []
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None:
+            return file_wrapper(f, 64 * 1024)
+        return _read_chunks(f)
+
+    return serve
+
+
+if __name__ == '__main__':
+    build()
@@ -0,0 +1,11 @@
+"""
+Shared locations of on-disk state
+Everything lives under the persistent volume on Fly.io (/data), falling back
+to /tmp for local dev - decided here once so every store agrees.
+"""
+from pathlib import Path
+
+DATA_ROOT = Path('/data') if Path('/data').exists() else Path('/tmp')
+
+# Session files, image files and the session index
+SESSION_STORAGE_DIR = DATA_ROOT / 'session_storage'
@@ -15,24 +15,34 @@ Usage:
 
     # Custom reference directory
     python generate_multi_person_samples.py --month 6 --references-dir ./custom_faces/
+
+    # Generate every person × month combination concurrently (async Gemini client)
+    python generate_multi_person_samples.py --months 1 6 11 --concurrency 12
 """
 
 import os
 import sys
 import argparse
+import asyncio
 import time
 from pathlib import Path
 
-# Add app directory to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+# Repo root on the path: the services are imported as part of the app package
+# (gemini_service imports app.services.* itself - a second 'services' namespace would
+# load its dependencies twice)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from services.monthly_themes import MONTHLY_THEMES
+from app.services.monthly_themes import MONTHLY_THEMES
 
 # Import Gemini service only when needed
 def get_gemini_service():
-    from services.gemini_service import generate_calendar_image
+    from app.services.gemini_service import generate_calendar_image
     return generate_calendar_image
 
+def get_async_gemini_service():
+    from app.services.gemini_service import agenerate_batch
+    return agenerate_batch
+
 def get_person_folders(references_dir):
     """
     Find all person folders in the references directory
@@ -95,9 +105,19 @@ def generate_month_image_for_person(month_num, person_name, reference_images, ou
 
     try:
         generate_calendar_image = get_gemini_service()
-        image_data = generate_calendar_image(prompt, reference_images)
+        image_data = generate_calendar_image(prompt, reference_images, use_cache=False)  # Always fresh samples
         elapsed = time.time() - start_time
+        return save_person_month_image(month_num, person_name, image_data, elapsed, output_dir, with_mockup=with_mockup)
+
+    except Exception as e:
+        print(f"      ❌ Generation failed: {str(e)}")
+        return False
 
+def save_person_month_image(month_num, person_name, image_data, elapsed, output_dir, with_mockup=False):
+    """Save a generated image for one person and month (and optional Printify mockup)"""
+    month_name = MONTHLY_THEMES[month_num]['month']
+
+    try:
         # Save AI-generated image
         output_filename = f"{person_name}_month_{month_num:02d}_{month_name.lower().replace(' ', '_')}.jpg"
         output_path = os.path.join(output_dir, output_filename)
@@ -131,9 +151,54 @@ def generate_month_image_for_person(month_num, person_name, reference_images, ou
         return True
 
     except Exception as e:
-        print(f"      ❌ Generation failed: {str(e)}")
+        print(f"      ❌ Saving failed: {str(e)}")
         return False
 
+def generate_all_concurrently(months, person_folders, output_dir, concurrency, timeout, with_mockup=False):
+    """
+    Generate every person × month image at once on one event loop (async Gemini client)
+
+    Returns:
+        tuple: (successful count, failed count)
+    """
+    jobs = []
+    failed = 0
+    for person_name, folder_path, image_files in person_folders:
+        reference_images = load_reference_images(image_files)
+        if not reference_images:
+            print(f"   ❌ No valid images found for {person_name}")
+            failed += len(months)
+            continue
+        for month_num in months:
+            if month_num in MONTHLY_THEMES:
+                jobs.append((person_name, month_num, reference_images))
+
+    print(f"\n⚡ Generating {len(jobs)} image(s) concurrently (up to {concurrency} at a time)...")
+
+    agenerate_batch = get_async_gemini_service()
+    start_time = time.time()
+    results = asyncio.run(agenerate_batch(
+        [{'prompt': MONTHLY_THEMES[month_num]['prompt'], 'reference_image_data_list': refs, 'use_cache': False}
+         for _, month_num, refs in jobs],
+        max_concurrent=concurrency,
+        timeout=timeout
+    ))
+    elapsed = time.time() - start_time
+
+    successful = 0
+    for (person_name, month_num, _), result in zip(jobs, results):
+        print(f"\n   🎨 {person_name} - {MONTHLY_THEMES[month_num]['month']}")
+        if isinstance(result, BaseException):
+            print(f"      ❌ Generation failed: {str(result) or type(result).__name__}")
+            failed += 1
+        elif save_person_month_image(month_num, person_name, result, elapsed, output_dir, with_mockup=with_mockup):
+            successful += 1
+        else:
+            failed += 1
+
+    print(f"\n   ⏱️  Batch finished in {elapsed:.1f}s")
+    return successful, failed
+
 def main():
     parser = argparse.ArgumentParser(
         description='Generate sample calendar images for multiple people',
@@ -182,6 +247,12 @@ Structure your reference_faces directory like:
     parser.add_argument('--delay', type=int, default=3,
                        help='Delay in seconds between generations (default: 3)')
 
+    # Concurrent generation via the async Gemini client
+    parser.add_argument('--concurrency', type=int, default=1,
+                       help='Generate up to N images at once (async client, ignores --delay; default: 1)')
+    parser.add_argument('--timeout', type=float, default=180,
+                       help='Per-image timeout in seconds for --concurrency > 1 (default: 180)')
+
     # Mockup generation
     parser.add_argument('--with-mockup', action='store_true',
                        help='Also generate Printify calendar mockup')
@@ -238,48 +309,54 @@ Structure your reference_faces directory like:
     total_failed = 0
     generation_count = 0
 
-    for month_num in months_to_generate:
-        if month_num not in MONTHLY_THEMES:
-            print(f"\n❌ Error: Invalid month {month_num}. Must be 0-12.")
-            continue
-
-        theme = MONTHLY_THEMES[month_num]
-        print(f"\n{'='*80}")
-        print(f"📅 MONTH {month_num}: {theme['month']} - {theme['title']}")
-        print(f"{'='*80}")
-
-        for person_name, folder_path, image_files in person_folders:
-            # Add delay between generations (except first)
-            if generation_count > 0:
-                print(f"\n   ⏸️  Waiting {args.delay}s before next generation...")
-                time.sleep(args.delay)
-
-            generation_count += 1
-
-            # Load this person's reference images
-            print(f"\n   📸 Loading {len(image_files)} reference images for {person_name}...")
-            reference_images = load_reference_images(image_files)
-
-            if not reference_images:
-                print(f"   ❌ No valid images found for {person_name}")
-                total_failed += 1
+    if args.concurrency > 1:
+        total_successful, total_failed = generate_all_concurrently(
+            months_to_generate, person_folders, args.output,
+            args.concurrency, args.timeout, with_mockup=args.with_mockup
+        )
+    else:
+        for month_num in months_to_generate:
+            if month_num not in MONTHLY_THEMES:
+                print(f"\n❌ Error: Invalid month {month_num}. Must be 0-12.")
                 continue
 
-            print(f"   ✓ Loaded {len(reference_images)} images")
-
-            # Generate
-            success = generate_month_image_for_person(
-                month_num,
-                person_name,
-                reference_images,
-                args.output,
-                with_mockup=args.with_mockup
-            )
-
-            if success:
-                total_successful += 1
-            else:
-                total_failed += 1
+            theme = MONTHLY_THEMES[month_num]
+            print(f"\n{'='*80}")
+            print(f"📅 MONTH {month_num}: {theme['month']} - {theme['title']}")
+            print(f"{'='*80}")
+
+            for person_name, folder_path, image_files in person_folders:
+                # Add delay between generations (except first)
+                if generation_count > 0:
+                    print(f"\n   ⏸️  Waiting {args.delay}s before next generation...")
+                    time.sleep(args.delay)
+
+                generation_count += 1
+
+                # Load this person's reference images
+                print(f"\n   📸 Loading {len(image_files)} reference images for {person_name}...")
+                reference_images = load_reference_images(image_files)
+
+                if not reference_images:
+                    print(f"   ❌ No valid images found for {person_name}")
+                    total_failed += 1
+                    continue
+
+                print(f"   ✓ Loaded {len(reference_images)} images")
+
+                # Generate
+                success = generate_month_image_for_person(
+                    month_num,
+                    person_name,
+                    reference_images,
+                    args.output,
+                    with_mockup=args.with_mockup
+                )
+
+                if success:
+                    total_successful += 1
+                else:
+                    total_failed += 1
 
     # Summary
     print("\n" + "="*80)
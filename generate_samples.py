@@ -16,6 +16,9 @@ Usage:
     # Specify custom output directory
     python generate_samples.py --month 6 --references ref1.jpg ref2.jpg ref3.jpg --output ./samples/
 
+    # Generate all months concurrently (async Gemini client)
+    python generate_samples.py --all --references ref1.jpg ref2.jpg ref3.jpg --concurrency 13
+
     # Show available months
     python generate_samples.py --list
 """
@@ -23,19 +26,26 @@ Usage:
 import os
 import sys
 import argparse
+import asyncio
 import time
 from pathlib import Path
 
-# Add app directory to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+# Repo root on the path: the services are imported as part of the app package
+# (gemini_service imports app.services.* itself - a second 'services' namespace would
+# load its dependencies twice)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from services.monthly_themes import MONTHLY_THEMES
+from app.services.monthly_themes import MONTHLY_THEMES
 
 # Import Gemini service only when needed (avoid API key check for --list)
 def get_gemini_service():
-    from services.gemini_service import generate_calendar_image
+    from app.services.gemini_service import generate_calendar_image
     return generate_calendar_image
 
+def get_async_gemini_service():
+    from app.services.gemini_service import agenerate_batch
+    return agenerate_batch
+
 def load_reference_images(image_paths):
     """Load reference images from file paths"""
     reference_data = []
@@ -75,9 +85,19 @@ def generate_month_image(month_num, reference_images, output_dir, with_mockup=Fa
 
     try:
         generate_calendar_image = get_gemini_service()
-        image_data = generate_calendar_image(prompt, reference_images)
+        image_data = generate_calendar_image(prompt, reference_images, use_cache=False)  # Always fresh samples
         elapsed = time.time() - start_time
+        return save_month_image(month_num, image_data, elapsed, output_dir, with_mockup=with_mockup)
+
+    except Exception as e:
+        print(f"   ❌ Generation failed: {str(e)}")
+        return False
 
+def save_month_image(month_num, image_data, elapsed, output_dir, with_mockup=False):
+    """Save a generated month image (and optional Printify mockup)"""
+    month_name = MONTHLY_THEMES[month_num]['month']
+
+    try:
         # Save AI-generated image
         output_filename = f"sample_month_{month_num:02d}_{month_name.lower().replace(' ', '_')}.jpg"
         output_path = os.path.join(output_dir, output_filename)
@@ -111,9 +131,45 @@ def generate_month_image(month_num, reference_images, output_dir, with_mockup=Fa
         return True
 
     except Exception as e:
-        print(f"   ❌ Generation failed: {str(e)}")
+        print(f"   ❌ Saving failed: {str(e)}")
         return False
 
+def generate_months_concurrently(months, reference_images, output_dir, concurrency, timeout, with_mockup=False):
+    """
+    Generate several months at once on one event loop (async Gemini client)
+
+    Returns:
+        tuple: (successful count, failed count)
+    """
+    months = [m for m in months if m in MONTHLY_THEMES]
+    print(f"\n⚡ Generating {len(months)} image(s) concurrently (up to {concurrency} at a time)...")
+
+    agenerate_batch = get_async_gemini_service()
+    start_time = time.time()
+    results = asyncio.run(agenerate_batch(
+        [{'prompt': MONTHLY_THEMES[m]['prompt'], 'reference_image_data_list': reference_images, 'use_cache': False}
+         for m in months],
+        max_concurrent=concurrency,
+        timeout=timeout
+    ))
+    elapsed = time.time() - start_time
+
+    successful = 0
+    failed = 0
+    for month_num, result in zip(months, results):
+        theme = MONTHLY_THEMES[month_num]
+        print(f"\n🎨 {theme['month']} - {theme['title']}")
+        if isinstance(result, BaseException):
+            print(f"   ❌ Generation failed: {str(result) or type(result).__name__}")
+            failed += 1
+        elif save_month_image(month_num, result, elapsed, output_dir, with_mockup=with_mockup):
+            successful += 1
+        else:
+            failed += 1
+
+    print(f"\n   ⏱️  Batch finished in {elapsed:.1f}s")
+    return successful, failed
+
 def list_available_months():
     """Display all available months and their themes"""
     print("\n📅 Available Months:\n")
@@ -173,6 +229,12 @@ Examples:
     parser.add_argument('--delay', type=int, default=3,
                        help='Delay in seconds between generations (default: 3)')
 
+    # Concurrent generation via the async Gemini client
+    parser.add_argument('--concurrency', type=int, default=1,
+                       help='Generate up to N images at once (async client, ignores --delay; default: 1)')
+    parser.add_argument('--timeout', type=float, default=180,
+                       help='Per-image timeout in seconds for --concurrency > 1 (default: 180)')
+
     # Printify mockup generation
     parser.add_argument('--with-mockup', action='store_true',
                        help='Also generate Printify calendar mockup (requires PRINTIFY_API_TOKEN)')
@@ -227,18 +289,24 @@ Examples:
     successful = 0
     failed = 0
 
-    for i, month_num in enumerate(months_to_generate):
-        # Add delay between requests (except first)
-        if i > 0:
-            print(f"\n   ⏸️  Waiting {args.delay}s before next generation...")
-            time.sleep(args.delay)
+    if args.concurrency > 1:
+        successful, failed = generate_months_concurrently(
+            months_to_generate, reference_images, args.output,
+            args.concurrency, args.timeout, with_mockup=args.with_mockup
+        )
+    else:
+        for i, month_num in enumerate(months_to_generate):
+            # Add delay between requests (except first)
+            if i > 0:
+                print(f"\n   ⏸️  Waiting {args.delay}s before next generation...")
+                time.sleep(args.delay)
 
-        success = generate_month_image(month_num, reference_images, args.output, with_mockup=args.with_mockup)
+            success = generate_month_image(month_num, reference_images, args.output, with_mockup=args.with_mockup)
 
-        if success:
-            successful += 1
-        else:
-            failed += 1
+            if success:
+                successful += 1
+            else:
+                failed += 1
 
     # Summary
     print("\n" + "="*90)
@@ -11,8 +11,18 @@ backlog = 2048
 
 # Worker Processes - Memory-optimized for 2GB RAM
 # Each worker uses ~320MB RAM. 3 workers = ~960MB, leaves 1GB for OS/buffers/spikes
-workers = 3  # Conservative for 2GB RAM (supports ~12 concurrent requests)
-worker_class = 'sync'  # Use sync workers (better for long-running AI requests)
+workers = int(os.getenv('GUNICORN_WORKERS', 3))  # Conservative for 2GB RAM
+
+# Worker class profiles (GUNICORN_WORKER_CLASS):
+#   sync    - one request per worker (3 in-flight requests total)
+#   gthread - GUNICORN_THREADS threads per worker sharing its memory; requests
+#             spend nearly all their time waiting on Gemini/Printify, so one
+#             machine can hold dozens of in-flight generations
+#             (Gemini concurrency is still capped by GEMINI_MAX_CONCURRENT).
+#             Async generations of all threads share one event loop per worker
+#             (gemini_service.run_async)
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.getenv('GUNICORN_THREADS', 12)) if worker_class == 'gthread' else 1
 worker_connections = 1000
 max_requests = 1000  # Restart workers after 1000 requests (prevent memory leaks)
 max_requests_jitter = 100  # Add randomness to prevent all workers restarting at once
@@ -50,9 +60,18 @@ def on_starting(server):
     server.log.info("🚀 KevCal Production Server Starting")
     server.log.info(f"   Workers: {workers}")
     server.log.info(f"   Timeout: {timeout}s (AI generation support)")
-    server.log.info(f"   Concurrency: ~{workers * 4} simultaneous requests")
+    server.log.info(f"   Worker class: {worker_class} ({threads} threads/worker)")
+    server.log.info(f"   Concurrency: ~{workers * threads} simultaneous requests")
     server.log.info("=" * 70)
 
+    # Upgrade stored sessions to the current schema once, before any worker serves requests
+    from app.session_migrations import run_migrations
+    run_migrations()
+
+    # Encode shared static images (the cover) once - forked workers inherit them
+    from app.session_storage import prepare_shared_images
+    prepare_shared_images()
+
 def worker_int(worker):
     worker.log.info(f"Worker {worker.pid} received INT or QUIT signal")
 
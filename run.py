@@ -9,6 +9,10 @@ from app import create_app
 app = create_app()
 
 if __name__ == '__main__':
+    # Upgrade stored sessions to the current schema (gunicorn does this in on_starting)
+    from app.session_migrations import run_migrations
+    run_migrations()
+
     # Get host and port from environment variables
     host = os.getenv('HOST', '0.0.0.0')
     port = int(os.getenv('PORT', 5000))